@@ -1,26 +1,42 @@
-import sys
-import yaml
-from src.core.pipeline import Pipeline
-from src.models import HFLLM, GoogleLLM
-from src.tasks import MLMTask, DocumentRetrievalTask
-from src.core import AutoTask
-from dotenv import load_dotenv
-
-load_dotenv()
-
 def main():
-    import sys
+    import argparse
     import yaml
     from src.core.pipeline import Pipeline
+    from src.core.work_queue import WorkQueue
     from src.core import AutoTask
     from dotenv import load_dotenv
 
     load_dotenv()
 
-    config_path = sys.argv[1] if len(sys.argv) > 1 else "config.yaml"
-    with open(config_path, "r") as f:
+    parser = argparse.ArgumentParser(description="Generate synthetic datasets with LLMs.")
+    parser.add_argument("config", nargs="?", default="config.yaml", help="Path to the YAML config file.")
+    parser.add_argument("--resume", metavar="RUN", help="Run id or manifest path of an interrupted run to continue.")
+    parser.add_argument("--enqueue", action="store_true", help="Plan the run as units in the work queue instead of generating it.")
+    parser.add_argument("--worker", action="store_true", help="Generate queued units until the queue is drained.")
+    parser.add_argument("--run", metavar="RUN", help="With --worker: only work on this queued run.")
+    parser.add_argument("--merge", metavar="RUN", help="Combine the finished units of a queued run into its output file.")
+    parser.add_argument("--queue", metavar="PATH", help="Work queue file, overriding queue.path.")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
         config = yaml.safe_load(f)
 
+    queue_cfg = config.get("queue") or {}
+    if args.worker or args.merge:
+        queue = WorkQueue.from_config(queue_cfg, path=args.queue)
+        if args.worker:
+            # Workers use their own model settings (API keys, pools) for the queued task
+            Pipeline.work(queue, run_id=args.run, model_cfg=config.get("model"), concurrency=queue_cfg.get("concurrency", 1), poll_interval=queue_cfg.get("poll_interval", 5))
+        else:
+            Pipeline.merge(queue, args.merge, chunk_size=config.get("output", {}).get("chunk_size", 1000))
+        return
+
+    if args.resume:
+        # The manifest carries the original config, so the run continues exactly as started;
+        # only credentials, which are never stored, come from this config file
+        Pipeline.resume(args.resume, folder=config.get("output", {}).get("folder", "output"), live_config=config)
+        return
+
     # Build and run the pipeline using AutoTask and Pipeline class
     model_provider = config["model"]["provider"]
     model_name = config["model"]["model_name"]
@@ -29,6 +45,10 @@ def main():
         f"{config['task']['type']}:{model_provider}:{model_name}",
         config=config
     )
+    if args.enqueue:
+        queue = WorkQueue.from_config(queue_cfg, path=args.queue)
+        pipeline.enqueue(queue, output_cfg=config["output"], oversample=queue_cfg.get("oversample", 1.0))
+        return
     pipeline.run(output_cfg=config["output"])
 
 if __name__ == "__main__":
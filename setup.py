@@ -11,6 +11,7 @@ setup(
     install_requires=[
         "huggingface_hub",
         "pandas",
+        "numpy",
         "python-dotenv",
         "google-cloud-aiplatform",
         "google-auth",
@@ -24,8 +25,13 @@ setup(
         "beautifulsoup4",
         "requests",
     ],
+    extras_require={
+        "parquet": ["pyarrow"],
+        "zstd": ["zstandard"],
+        "fast": ["orjson", "lxml"],
+    },
     include_package_data=True,
-    python_requires=">=3.7",
+    python_requires=">=3.10",
     entry_points={
         "console_scripts": [
             "datagen=main:main"
@@ -0,0 +1,3 @@
+from src.bench.pipeline import main
+
+main()
@@ -0,0 +1,118 @@
+"""
+Benchmark of main-text extraction on a corpus of saved HTML pages.
+
+Compares the previous BeautifulSoup implementation of `extract_main_text` with the
+single-pass extractor on each available parser backend:
+
+    python -m src.bench.extraction path/to/html_pages/
+    python -m src.bench.extraction --synthetic 20 --depth 200
+"""
+import argparse
+import glob
+import os
+import time
+from typing import Callable, Dict, List
+
+from src.utils.text_extraction import extract_main_text, _lxml_etree
+
+
+def legacy_extract_main_text(content) -> str:
+    """The BeautifulSoup-based extractor used before the single-pass one, kept as the baseline."""
+    from bs4 import BeautifulSoup, Comment
+
+    def is_visible_text(element):
+        if element.parent.name in ['style', 'script', 'head', 'title', 'meta', '[document]']:
+            return False
+        if isinstance(element, Comment):
+            return False
+        return True
+
+    soup = BeautifulSoup(content, 'html.parser')
+    for tag in soup(['script', 'style', 'noscript', 'header', 'footer', 'nav', 'aside']):
+        tag.decompose()
+    for tag in ['article', 'main']:
+        section = soup.find(tag)
+        if section:
+            texts = section.find_all(string=True)
+            return '\n'.join(t.strip() for t in filter(is_visible_text, texts) if t.strip())
+    max_text = ''
+    for div in soup.find_all('div'):
+        texts = div.find_all(string=True)
+        combined = '\n'.join(t.strip() for t in filter(is_visible_text, texts) if t.strip())
+        if len(combined) > len(max_text):
+            max_text = combined
+    return max_text
+
+
+def synthetic_page(depth: int, paragraphs: int = 20) -> str:
+    """A page with a deep chain of nested <div>s, the worst case for the legacy extractor."""
+    body = "".join(f"<p>Paragraph {i} with some representative sentence text for the page.</p>" for i in range(paragraphs))
+    nav = "<nav>" + "".join(f"<a href='/{i}'>Link {i}</a>" for i in range(30)) + "</nav>"
+    nested = "<div class='wrapper'>" * depth + body + "</div>" * depth
+    return f"<html><head><title>Synthetic</title><script>var x = 1;</script></head><body>{nav}{nested}</body></html>"
+
+
+def load_corpus(folder: str) -> List[bytes]:
+    """Reads every .html/.htm file in `folder`."""
+    paths = sorted(glob.glob(os.path.join(folder, "*.html")) + glob.glob(os.path.join(folder, "*.htm")))
+    pages = []
+    for path in paths:
+        with open(path, "rb") as f:
+            pages.append(f.read())
+    return pages
+
+
+def time_extractor(func: Callable, pages: List, repeat: int) -> float:
+    """Best total wall time over `repeat` passes through the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            func(page)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(pages: List, repeat: int = 3) -> List[Dict]:
+    """Times every extractor on `pages` and compares outputs with the legacy one."""
+    extractors = {"legacy (bs4 html.parser)": legacy_extract_main_text}
+    extractors["single-pass (html.parser)"] = lambda page: extract_main_text(page, parser="html.parser")
+    if _lxml_etree is not None:
+        extractors["single-pass (lxml)"] = lambda page: extract_main_text(page, parser="lxml")
+
+    reference = [legacy_extract_main_text(page) for page in pages]
+    rows = []
+    for name, func in extractors.items():
+        seconds = time_extractor(func, pages, repeat)
+        same = sum(func(page) == ref for page, ref in zip(pages, reference))
+        rows.append({"extractor": name, "seconds": seconds, "same_output": same})
+    baseline = rows[0]["seconds"]
+    for row in rows:
+        row["speedup"] = baseline / row["seconds"] if row["seconds"] else float("inf")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark main-text extraction.")
+    parser.add_argument("folder", nargs="?", help="Folder of saved .html pages.")
+    parser.add_argument("--synthetic", type=int, default=0, help="Number of generated deeply nested pages to add.")
+    parser.add_argument("--depth", type=int, default=200, help="Nesting depth of generated pages.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per extractor; the best is reported.")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.folder) if args.folder else []
+    pages += [synthetic_page(args.depth).encode("utf-8") for _ in range(args.synthetic)]
+    if not pages:
+        parser.error("Provide a folder of HTML pages and/or --synthetic N.")
+
+    print(f"{len(pages)} pages, best of {args.repeat} passes")
+    print(f"{'extractor':<28}{'total s':>10}{'ms/page':>10}{'speedup':>10}{'same output':>14}")
+    for row in run(pages, args.repeat):
+        print(
+            f"{row['extractor']:<28}{row['seconds']:>10.3f}{row['seconds'] * 1000 / len(pages):>10.2f}"
+            f"{row['speedup']:>9.1f}x{row['same_output']:>10}/{len(pages)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+End-to-end benchmark of DataGen pipelines against the simulated `mock` provider.
+
+Runs every combination of task and concurrency through `Pipeline.build`/`Pipeline.run`
+with no network access (web search and page fetches are simulated too), and reports
+throughput, LLM call latency percentiles and peak traced memory:
+
+    python -m src.bench.pipeline
+    python -m src.bench.pipeline --tasks mlm --records 2000 --concurrency 1 4 16 --latency 0.2
+    python -m src.bench.pipeline --error-rate 0.05 --truncation-rate 0.1 --json results.json
+
+`python -m src.bench` runs the same benchmark.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from src.core.pipeline import Pipeline
+from src.utils.metrics import REGISTRY
+
+
+class MockSearcher:
+    """Stands in for `WebSearcher`: returns one synthetic result per query after a simulated latency."""
+
+    def __init__(self, latency: float = 0.0, concurrency: int = 4):
+        self.latency = latency
+        self.concurrency = concurrency
+        self.cache = None
+
+    def search(self, query: str) -> List[Dict]:
+        time.sleep(self.latency)
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
+        return [{"title": query, "href": f"https://bench.invalid/{digest}", "body": f"Summary of {query}"}]
+
+    def stats(self) -> None:
+        return None
+
+
+class MockFetcher:
+    """Stands in for `PageFetcher`: returns synthetic page text after a simulated latency."""
+
+    def __init__(self, latency: float = 0.0, concurrency: int = 8, failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.concurrency = concurrency
+        self.failure_rate = failure_rate
+        self.cache = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> Optional[str]:
+        time.sleep(self.latency)
+        with self._lock:
+            if self._rng.random() < self.failure_rate:
+                return None
+        return "\n".join(f"Paragraph {i} of {url} with representative page content." for i in range(20))
+
+    def close(self) -> None:
+        pass
+
+
+def build_config(task: str, records: int, concurrency: int, args: argparse.Namespace, folder: str) -> Dict[str, Any]:
+    """The pipeline config of one benchmark scenario."""
+    latency: Any = args.latency
+    if args.distribution != "constant":
+        latency = {"distribution": args.distribution, "mean": args.latency, "sigma": args.sigma, "min": 0.0, "max": 2 * args.latency}
+    task_cfg: Dict[str, Any] = {"type": task, "domain": "benchmarks", "num_records": records, "concurrency": concurrency}
+    if args.batch:
+        task_cfg["batch"] = args.batch
+    model_cfg: Dict[str, Any] = {
+        "provider": "mock",
+        "model_name": "mock",
+        "latency": latency,
+        "error_rate": args.error_rate,
+        "truncation_rate": args.truncation_rate,
+        "seed": args.seed,
+    }
+    if args.deadline:
+        model_cfg["deadline"] = args.deadline
+    if args.hedge:
+        model_cfg["hedge"] = {"budget": args.hedge}
+    return {
+        "model": model_cfg,
+        "task": task_cfg,
+        "output": {"folder": folder, "format": "jsonl"},
+    }
+
+
+def run_scenario(task: str, records: int, concurrency: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Builds and runs one pipeline and measures it.
+
+    Returns:
+        Dict[str, Any]: Scenario settings, records, wall time, records per second, LLM calls,
+        p50/p99 call latency in ms and peak traced memory in MB.
+    """
+    with tempfile.TemporaryDirectory(prefix="datagen-bench-") as folder:
+        config = build_config(task, records, concurrency, args, folder)
+        pipeline = Pipeline.build(f"{task}:mock:mock", config=config)
+        if task == "doc_retrieval":
+            pipeline.task.searcher = MockSearcher(args.web_latency)
+            pipeline.task.fetcher = MockFetcher(args.web_latency, seed=args.seed)
+        if args.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            pipeline.run()
+        finally:
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+            if args.trace_memory:
+                tracemalloc.stop()
+        written = REGISTRY.counter("datagen_records_total").total()
+        latency = REGISTRY.histogram("datagen_llm_latency_seconds")
+        calls = REGISTRY.counter("datagen_llm_requests_total").total()
+        p50 = latency.quantile(0.5, provider="mock")
+        p99 = latency.quantile(0.99, provider="mock")
+    return {
+        "task": task,
+        "concurrency": concurrency,
+        "records": int(written),
+        "seconds": elapsed,
+        "records_per_second": written / elapsed if elapsed else 0.0,
+        "llm_calls": int(calls),
+        "p50_ms": p50 * 1000 if p50 is not None else None,
+        "p99_ms": p99 * 1000 if p99 is not None else None,
+        "peak_mb": peak / 2 ** 20 if peak is not None else None,
+    }
+
+
+def _fmt(value: Optional[float], spec: str) -> str:
+    return "-" if value is None else format(value, spec)
+
+
+def main(argv: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description="Benchmark DataGen pipelines against the simulated mock provider.")
+    parser.add_argument("--tasks", nargs="+", default=["mlm", "doc_retrieval"], help="Tasks to benchmark.")
+    parser.add_argument("--records", type=int, default=500, help="Records generated per scenario.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Task concurrency settings to compare.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean simulated LLM latency in seconds.")
+    parser.add_argument("--distribution", choices=["constant", "uniform", "lognormal"], default="lognormal", help="Simulated latency distribution.")
+    parser.add_argument("--sigma", type=float, default=0.5, help="Shape of the lognormal latency distribution.")
+    parser.add_argument("--web-latency", type=float, default=0.02, help="Simulated search and page fetch latency in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of LLM calls that fail.")
+    parser.add_argument("--truncation-rate", type=float, default=0.0, help="Fraction of LLM responses that are cut off.")
+    parser.add_argument("--deadline", type=float, default=None, help="Per-call deadline in seconds.")
+    parser.add_argument("--hedge", type=float, default=None, metavar="BUDGET", help="Hedge calls slower than the p95, with this fraction of extra requests.")
+    parser.add_argument("--batch", type=int, default=None, help="Fixed batch size; adaptive by default.")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario; the fastest is reported.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the mock provider.")
+    parser.add_argument("--no-trace-memory", dest="trace_memory", action="store_false", help="Skip tracemalloc, which slows runs down.")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to a JSON file.")
+    args = parser.parse_args(argv)
+
+    # Progress logs and the retry warnings of injected failures would drown the results table
+    logging.disable(logging.WARNING)
+    results = []
+    print(f"{'task':<16}{'conc':>6}{'records':>9}{'seconds':>10}{'rec/s':>10}{'calls':>7}{'p50 ms':>9}{'p99 ms':>9}{'peak MB':>9}")
+    try:
+        for task in args.tasks:
+            for concurrency in args.concurrency:
+                runs = [run_scenario(task, args.records, concurrency, args) for _ in range(max(1, args.repeat))]
+                row = min(runs, key=lambda r: r["seconds"])
+                results.append(row)
+                print(
+                    f"{row['task']:<16}{row['concurrency']:>6}{row['records']:>9}{row['seconds']:>10.2f}"
+                    f"{row['records_per_second']:>10.1f}{row['llm_calls']:>7}{_fmt(row['p50_ms'], '.1f'):>9}"
+                    f"{_fmt(row['p99_ms'], '.1f'):>9}{_fmt(row['peak_mb'], '.1f'):>9}"
+                )
+    finally:
+        logging.disable(logging.NOTSET)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,151 @@
+import ast
 import importlib
+import json
+import os
 import pkgutil
-from typing import Any, Callable, Dict, Optional, Type
+import threading
+from importlib.metadata import entry_points
+from typing import Any, Callable, Dict, List, Optional, Type
+from src.utils.rate_limiter import RateLimiter
+
+
+class LazyRegistry:
+    """
+    Resolves registered names to the module that registers them, without importing every module.
+
+    Built-in modules are scanned with `ast` for `@<owner>.register("<name>")` class decorators,
+    and the result is cached in a manifest under the package's `__pycache__`, keyed by each
+    file's modification time and size, so later processes read one small JSON file instead of
+    parsing or importing anything. Third-party plugins can register classes through the
+    `entry_point_group` entry point group (e.g. `datagen.models = mine = pkg.module:MyLLM`).
+    """
+
+    def __init__(self, package: str, owner: str, entry_point_group: str):
+        """
+        Args:
+            package: Dotted name of the package holding the built-in modules.
+            owner: Name of the registering class, as used in the decorator.
+            entry_point_group: Entry point group searched for plugins.
+        """
+        self.package = package
+        self.owner = owner
+        self.entry_point_group = entry_point_group
+        self._manifest: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    def _scan_file(self, path: str) -> List[str]:
+        """Returns the names registered by the class decorators in the module at `path`."""
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        names = []
+        for node in ast.walk(tree):
+            if not isinstance(node, ast.ClassDef):
+                continue
+            for decorator in node.decorator_list:
+                if (
+                    isinstance(decorator, ast.Call)
+                    and isinstance(decorator.func, ast.Attribute)
+                    and decorator.func.attr == "register"
+                    and isinstance(decorator.func.value, ast.Name)
+                    and decorator.func.value.id == self.owner
+                    and decorator.args
+                    and isinstance(decorator.args[0], ast.Constant)
+                    and isinstance(decorator.args[0].value, str)
+                ):
+                    names.append(decorator.args[0].value)
+        return names
+
+    def manifest(self) -> Dict[str, str]:
+        """
+        Maps every built-in registered name to its module, rescanning only modules changed since the cached manifest.
+
+        Returns:
+            Dict[str, str]: Registered name -> dotted module name.
+        """
+        with self._lock:
+            if self._manifest is not None:
+                return self._manifest
+            package = importlib.import_module(self.package)
+            folder = package.__path__[0]
+            cache_path = os.path.join(folder, "__pycache__", f"{self.owner.lower()}_manifest.json")
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+            except (OSError, ValueError):
+                cached = {}
+            modules, changed = {}, False
+            for module_info in pkgutil.iter_modules(package.__path__):
+                path = os.path.join(folder, module_info.name, "__init__.py") if module_info.ispkg else os.path.join(folder, f"{module_info.name}.py")
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                signature = [stat.st_mtime_ns, stat.st_size]
+                entry = cached.get(module_info.name)
+                if entry is None or entry.get("signature") != signature:
+                    entry = {"signature": signature, "names": self._scan_file(path)}
+                    changed = True
+                modules[module_info.name] = entry
+            if changed or set(modules) != set(cached):
+                try:
+                    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(modules, f)
+                    os.replace(tmp_path, cache_path)
+                except OSError:
+                    pass  # Read-only install: scan again next time
+            self._manifest = {
+                name: f"{self.package}.{module_name}"
+                for module_name, entry in modules.items()
+                for name in entry["names"]
+            }
+            return self._manifest
+
+    def _entry_points(self) -> Dict[str, Any]:
+        return {ep.name: ep for ep in entry_points(group=self.entry_point_group)}
+
+    def resolve(self, name: str, registry: Dict[str, Type]) -> Optional[Type]:
+        """
+        Returns the class registered under `name`, importing only the module that defines it.
+
+        Args:
+            name: The registered name.
+            registry: The owner's registry, filled by its `register` decorator on import.
+
+        Returns:
+            Optional[Type]: The class, or None if no module or plugin registers `name`.
+        """
+        if name in registry:
+            return registry[name]
+        module_name = self.manifest().get(name)
+        if module_name is not None:
+            importlib.import_module(module_name)
+            if name in registry:
+                return registry[name]
+        entry_point = self._entry_points().get(name)
+        if entry_point is not None:
+            loaded = entry_point.load()
+            # Plugins that do not use the decorator are registered under their entry point name
+            registry.setdefault(name, loaded)
+            return registry[name]
+        return None
+
+    def names(self, registry: Dict[str, Type]) -> List[str]:
+        """All names that can be resolved, without importing any module."""
+        return list(dict.fromkeys([*registry, *self.manifest(), *self._entry_points()]))
+
 
 class AutoModel:
     """
     Handles registration and retrieval of model provider classes.
-    Dynamically imports all modules in the `src.models` package to ensure all models are registered.
+    Only the module that registers the requested provider is imported (see `LazyRegistry`).
+    Also owns the process-wide rate limiters shared by every instance of a provider.
     """
     _registry: Dict[str, Type] = {}
+    _lazy = LazyRegistry("src.models", "AutoModel", "datagen.models")
+    _rate_limiters: Dict[str, RateLimiter] = {}
+    _rate_limiters_lock = threading.Lock()
 
     @classmethod
     def register(cls, name: str) -> Callable[[Type], Type]:
@@ -27,24 +165,53 @@ class AutoModel:
         return decorator
 
     @classmethod
-    def _import_all_models(cls) -> None:
+    def get_model_class(cls, name: str) -> Type:
         """
-        Dynamically imports all modules in the `src.models` package to ensure all model providers are registered.
+        Returns the model provider class registered under `name`, importing only its module.
+
+        Raises:
+            ValueError: If the model provider is not found in the registry.
         """
-        import src.models
-        package = src.models
-        for loader, module_name, is_pkg in pkgutil.walk_packages(package.__path__):
-            full_module_name = f"{package.__name__}.{module_name}"
-            importlib.import_module(full_module_name)
+        model_class = cls._lazy.resolve(name, cls._registry)
+        if model_class is None:
+            raise ValueError(
+                f"Model Provider '{name}' not found in registry. Available: {cls.available_models()}\n"
+                "Try giving the model name in the format <model_provider>:<model_name>"
+            )
+        return model_class
 
     @classmethod
-    def get_model(cls, name: str, *args: Any, **kwargs: Any) -> Any:
+    def get_rate_limiter(cls, key: str, **limits: Any) -> RateLimiter:
+        """
+        Returns the shared rate limiter for `key`, creating it on first use.
+        Limits passed after the limiter exists are ignored, so every caller in the
+        process paces against the same quota.
+
+        Args:
+            key (str): Limiter key, usually the provider name.
+            **limits: `requests_per_minute`, `tokens_per_minute`, `request_burst`, `token_burst`.
+
+        Returns:
+            RateLimiter: The shared limiter.
+        """
+        with cls._rate_limiters_lock:
+            limiter = cls._rate_limiters.get(key)
+            if limiter is None:
+                limiter = RateLimiter(**limits)
+                cls._rate_limiters[key] = limiter
+            return limiter
+
+    @classmethod
+    def get_model(cls, name: str, *args: Any, rate_limit: Optional[Dict[str, Any]] = None, **kwargs: Any) -> Any:
         """
         Retrieves an instance of a registered model provider class by name.
 
         Args:
             name (str): The model provider name, optionally in the format '<provider>:<model_name>'.
             *args: Positional arguments to pass to the model class constructor.
+            rate_limit (Optional[Dict[str, Any]]): Quota for the provider, e.g.
+                `{"requests_per_minute": 60, "tokens_per_minute": 100000}`. The limiter is
+                shared by all instances of the provider; set `key` to give an instance its own quota.
             **kwargs: Keyword arguments to pass to the model class constructor.
 
         Returns:
@@ -53,33 +220,34 @@ class AutoModel:
         Raises:
             ValueError: If the model provider is not found in the registry.
         """
-        cls._import_all_models()  # Ensure all models are registered
         parts = name.strip().split(":")
-        model_class = cls._registry.get(parts[0])
-        if model_class is None:
-            print(cls._registry)
-            raise ValueError(f"Model Provider '{name}' not found in registry.\nTry giving the model name in the format <model_provider>:<model_name>")
+        model_class = cls.get_model_class(parts[0])
         if len(parts) > 1:
             kwargs["model_name"] = parts[1]
-        return model_class(*args, **kwargs)
+        model = model_class(*args, **kwargs)
+        if rate_limit:
+            limits = dict(rate_limit)
+            key = limits.pop("key", parts[0])
+            model.rate_limiter = cls.get_rate_limiter(key, **limits)
+        return model
 
     @classmethod
     def available_models(cls) -> list[str]:
         """
-        Returns a list of all registered model provider names.
+        Returns a list of all registered model provider names, without importing any provider.
 
         Returns:
             list[str]: List of registered model provider names.
         """
-        cls._import_all_models()
-        return list(cls._registry.keys())
+        return cls._lazy.names(cls._registry)
 
 class AutoTask:
     """
     Handles registration and retrieval of task classes.
-    Dynamically imports all modules in the `src.tasks` package to ensure all tasks are registered.
+    Only the module that registers the requested task is imported (see `LazyRegistry`).
     """
     _registry: Dict[str, Type] = {}
+    _lazy = LazyRegistry("src.tasks", "AutoTask", "datagen.tasks")
 
     @classmethod
     def register(cls, name: str) -> Callable[[Type], Type]:
@@ -99,15 +267,17 @@ class AutoTask:
         return decorator
 
     @classmethod
-    def _import_all_tasks(cls) -> None:
+    def get_task_class(cls, name: str) -> Type:
         """
-        Dynamically imports all modules in the `src.tasks` package to ensure all tasks are registered.
+        Returns the task class registered under `name`, importing only its module.
+
+        Raises:
+            ValueError: If the task is not found in the registry.
         """
-        import src.tasks
-        package = src.tasks
-        for loader, module_name, is_pkg in pkgutil.walk_packages(package.__path__):
-            full_module_name = f"{package.__name__}.{module_name}"
-            importlib.import_module(full_module_name)
+        task_class = cls._lazy.resolve(name, cls._registry)
+        if task_class is None:
+            raise ValueError(f"Task '{name}' not found in registry. Available: {cls.available_tasks()}")
+        return task_class
 
     @classmethod
     def get_task(cls, name: str, *args: Any, **kwargs: Any) -> Any:
@@ -125,20 +295,15 @@ class AutoTask:
         Raises:
             ValueError: If the task is not found in the registry.
         """
-        cls._import_all_tasks()  # Ensure all tasks are registered
-        task_class = cls._registry.get(name)
-        if task_class is None:
-            raise ValueError(f"Task '{name}' not found in registry.")
-        return task_class(*args, **kwargs)
+        return cls.get_task_class(name)(*args, **kwargs)
 
     @classmethod
     def available_tasks(cls) -> list[str]:
         """
-        Returns a list of all registered task names.
+        Returns a list of all registered task names, without importing any task.
 
         Returns:
             list[str]: List of registered task names.
         """
-        cls._import_all_tasks()
-        return list(cls._registry.keys())
+        return cls._lazy.names(cls._registry)
 
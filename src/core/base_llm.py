@@ -1,20 +1,142 @@
+import asyncio
+import functools
+import time
 from abc import ABC, abstractmethod
 from typing import Any
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from src.utils.rate_limiter import RateLimiter, estimate_tokens
+from src.utils.metrics import REGISTRY
+from src.utils.retry import classify_error
+
+
+def _provider(model) -> str:
+    return getattr(model, "provider_name", type(model).__name__)
+
+
+def _record_wait(model, started: float) -> None:
+    REGISTRY.histogram("datagen_llm_rate_limit_wait_seconds", "Time spent waiting on the client-side rate limiter.").observe(
+        time.perf_counter() - started, provider=_provider(model)
+    )
+
+
+def _record_call(model, messages, started: float, response: Optional[str] = None, error: Optional[BaseException] = None) -> None:
+    """Records latency, outcome and estimated token usage of one provider call."""
+    provider = _provider(model)
+    REGISTRY.histogram("datagen_llm_latency_seconds", "Latency of LLM provider calls.").observe(time.perf_counter() - started, provider=provider)
+    outcome = "success" if error is None else type(error).__name__
+    REGISTRY.counter("datagen_llm_requests_total", "LLM provider calls by outcome.").inc(provider=provider, outcome=outcome)
+    REGISTRY.counter("datagen_llm_prompt_tokens_total", "Estimated prompt tokens sent (4 characters per token).").inc(estimate_tokens(messages), provider=provider)
+    if response:
+        REGISTRY.counter("datagen_llm_completion_tokens_total", "Estimated completion tokens received (4 characters per token).").inc(len(response) // 4, provider=provider)
+
+
+def _throttled(func):
+    """
+    Wraps a provider's `generate_response` so every call waits on the provider's rate limiter
+    and is recorded in the metrics registry.
+    """
+    @functools.wraps(func)
+    def wrapper(self, messages, **kwargs):
+        if not self.record_metrics:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimate_tokens(messages, **kwargs))
+            return func(self, messages, **kwargs)
+        kwargs.pop("cache", None)  # Consumed by CachedLLM; providers never see it
+        if self.rate_limiter is not None:
+            started = time.perf_counter()
+            self.rate_limiter.acquire(estimate_tokens(messages, **kwargs))
+            _record_wait(self, started)
+        started = time.perf_counter()
+        try:
+            response = func(self, messages, **kwargs)
+        except Exception as e:
+            _record_call(self, messages, started, error=e)
+            raise
+        _record_call(self, messages, started, response=response)
+        return response
+    return wrapper
+
+
+def _athrottled(func):
+    """Async counterpart of `_throttled` for `agenerate_response`."""
+    @functools.wraps(func)
+    async def wrapper(self, messages, **kwargs):
+        if not self.record_metrics:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire(estimate_tokens(messages, **kwargs))
+            return await func(self, messages, **kwargs)
+        kwargs.pop("cache", None)
+        if self.rate_limiter is not None:
+            started = time.perf_counter()
+            await self.rate_limiter.aacquire(estimate_tokens(messages, **kwargs))
+            _record_wait(self, started)
+        started = time.perf_counter()
+        try:
+            response = await func(self, messages, **kwargs)
+        except Exception as e:
+            _record_call(self, messages, started, error=e)
+            raise
+        _record_call(self, messages, started, response=response)
+        return response
+    return wrapper
+
 
 class BaseLLM(ABC):
     """
     Abstract base class for all LLM model providers.
+
+    Subclass implementations of `generate_response` and `agenerate_response` are
+    wrapped automatically so that they honour `rate_limiter` when one is attached
+    (see `AutoModel.get_model`) and report latency, outcome and token usage to the
+    metrics registry. Wrappers around another model subclass `WrappedLLM`, which sets
+    `record_metrics = False` so each provider call is only counted once.
+
+    Callers may pass `cache=False` to keep a call out of the response cache, e.g. for
+    sampling prompts that are sent unchanged many times. Wrappers forward the option and
+    it is dropped before a provider's own `generate_response` runs.
     """
 
+    rate_limiter: Optional[RateLimiter] = None
+    record_metrics: bool = True
+    stats_label: Optional[str] = None  # Set by models whose `stats()` is logged after a run
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "generate_response" in cls.__dict__:
+            cls.generate_response = _throttled(cls.__dict__["generate_response"])
+        if "agenerate_response" in cls.__dict__:
+            cls.agenerate_response = _athrottled(cls.__dict__["agenerate_response"])
+
     @abstractmethod
     def generate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
         """
         Abstract method to generate a response based on the given prompt.
         Must be implemented by subclasses.
-        
+
         :param messages: The input prompt for the model.
         :param kwargs: Additional arguments for the model.
         :return: The generated response as a string.
         """
         pass
+
+    async def agenerate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Asynchronously generate a response based on the given prompt.
+        Providers with a native async client should override this; the default
+        runs `generate_response` in a worker thread so the event loop is not blocked.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model.
+        :return: The generated response as a string.
+        """
+        return await asyncio.to_thread(self.generate_response, messages, **kwargs)
+
+    def classify_error(self, error: BaseException) -> Tuple[bool, Optional[float]]:
+        """
+        Decide whether a failed call should be retried. Providers whose SDK reports
+        transient or fatal errors in their own way can override this.
+
+        :param error: The exception raised by `generate_response`.
+        :return: Whether the call is worth retrying, and the server-requested delay in seconds, if any.
+        """
+        return classify_error(error)
@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List
 from .base_llm import BaseLLM
 class BaseTask(ABC):
     """
     Abstract base class for tasks responsible for dataset generation.
     """
 
+    # Column name to Arrow type name of the records, fixing the Parquet schema and CSV columns
+    output_schema = None
+    # Record field that distributed runs deduplicate on when merging worker outputs
+    dedup_field = None
+
     def __init__(self, model: BaseLLM, domain: str, num_records: int):
         """
         Initialize the task with a model, domain, and number of records.
@@ -23,3 +29,70 @@ class BaseTask(ABC):
         Abstract method to generate data. Must be implemented by subclasses.
         """
         pass
+
+    def iter_data(self) -> Iterator[Dict]:
+        """
+        Yield generated records one at a time.
+        The default wraps `generate_data`; tasks that can produce records incrementally
+        should override this and implement `generate_data` as `list(self.iter_data())`.
+        """
+        yield from self.generate_data()
+
+    def build_requests(self, oversample: float = 1.0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every LLM request of the run up front, for batch execution.
+        Each request is a `{"custom_id", "messages", "metadata"}` dict; `metadata` is handed
+        back with the response to `parse_responses`. Requests whose prompt repeats unchanged
+        (sampling prompts) set `"cache": False` so they are not answered from the response cache.
+
+        :param oversample: Factor by which to over-request, to make up for responses that
+            yield fewer records than asked (duplicates, unparseable output).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batch execution.")
+
+    def parse_responses(self, results: Iterable[Dict[str, Any]]) -> Iterator[Dict]:
+        """
+        Turn the results of a batch job into records, up to `num_records`.
+
+        :param results: `{"custom_id", "metadata", "response", "error"}` dicts, in any order.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support batch execution.")
+
+    def plan_units(self, oversample: float = 1.0) -> List[Dict[str, Any]]:
+        """
+        Split the run into independent units of work for the distributed work queue.
+        Each unit is a JSON-serializable dict that `run_unit` turns into records on any worker.
+
+        :param oversample: Factor by which to over-plan, to make up for units that yield
+            fewer records than asked (duplicates across workers, failed units).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support distributed runs.")
+
+    def run_unit(self, unit: Dict[str, Any]) -> List[Dict]:
+        """
+        Generate the records of one unit planned by `plan_units`.
+
+        :param unit: The unit payload.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support distributed runs.")
+
+    def state_dict(self) -> Dict:
+        """
+        Return JSON-serializable progress to store in the run manifest.
+        Tasks with intermediate stages should override this so a resumed run can skip finished work.
+        """
+        return {}
+
+    def load_state_dict(self, state: Dict) -> None:
+        """
+        Restore progress captured by `state_dict` before resuming a run.
+        """
+        pass
+
+    def load_output(self, records: Iterable[Dict]) -> None:
+        """
+        Receive the records an interrupted run already wrote, before it is resumed.
+        Tasks that deduplicate their records should refill their index here, so a resumed
+        run does not write them again.
+        """
+        pass
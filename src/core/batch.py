@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from src.core.base_llm import BaseLLM
+from src.utils.color_logger import get_color_logger
+from src.utils.utils import backoff_retry
+
+logger = get_color_logger(name=__name__)
+
+
+def write_requests(path: str, requests: Iterable[Dict[str, Any]]) -> int:
+    """
+    Writes batch requests as JSONL, one `{"custom_id", "messages", "metadata"}` object per line,
+    plus `"cache": false` for sampling prompts that must not be answered from the response cache.
+
+    Args:
+        path: Destination file.
+        requests: The requests emitted by a task's `build_requests`.
+
+    Returns:
+        int: Number of requests written.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Yields the objects of a JSONL file, skipping blank lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class BatchSubmitter(ABC):
+    """
+    Runs a file of requests as one bulk job and writes a results file with one
+    `{"custom_id", "metadata", "response", "error"}` object per request, in any order.
+    """
+
+    @abstractmethod
+    def run(self, requests_path: str, results_path: str) -> None:
+        """
+        Runs every request of `requests_path` and writes the results to `results_path`.
+
+        :param requests_path: JSONL file written by `write_requests`.
+        :param results_path: Destination JSONL file of results.
+        """
+        pass
+
+
+class LocalBatchSubmitter(BatchSubmitter):
+    """
+    File-based stand-in for a provider batch job: sends every request of the file to the
+    model on a thread pool, with the usual retries, and writes the results in request order.
+    Works with any provider, e.g. `mock` for tests.
+    """
+
+    def __init__(self, model: BaseLLM, concurrency: int = 8, max_retries: int = 3):
+        """
+        :param model: The model that answers the requests.
+        :param concurrency: Requests in flight at once.
+        :param max_retries: Attempts per request.
+        """
+        self.model = model
+        self.concurrency = max(1, int(concurrency))
+        self.max_retries = max_retries
+
+    def _answer(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        result = {"custom_id": request["custom_id"], "metadata": request.get("metadata", {}), "response": None, "error": None}
+        try:
+            result["response"] = backoff_retry(
+                self.model.generate_response,
+                max_retries=self.max_retries,
+                base_delay=1,
+                max_delay=8,
+                exceptions=(Exception,),
+                logger=logger,
+                messages=request["messages"],
+                cache=request.get("cache", True),
+            )
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    def run(self, requests_path: str, results_path: str) -> None:
+        done = 0
+        with open(results_path, "w", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for result in executor.map(self._answer, read_jsonl(requests_path)):
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                done += 1
+        logger.info(f"Local batch job answered {done} requests.")
+
+    def __repr__(self):
+        return f"LocalBatchSubmitter(model={self.model!r}, concurrency={self.concurrency})"
+
+
+def _request_key(request: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class VertexBatchSubmitter(BatchSubmitter):
+    """
+    Runs the requests as a Vertex AI batch prediction job for a Gemini model.
+
+    The request file is converted to Vertex's format and uploaded to Cloud Storage, the job
+    is submitted and polled until it ends, and its predictions are downloaded and matched
+    back to the requests. Vertex AI must be initialised, as `GoogleLLM` does with a service account.
+    """
+
+    def __init__(self, model: BaseLLM, bucket: str, prefix: str = "datagen-batch", poll_interval: float = 30.0, generation_config: Optional[Dict[str, Any]] = None):
+        """
+        :param model: The `GoogleLLM` whose model runs the job.
+        :param bucket: Cloud Storage bucket for the job input and output.
+        :param prefix: Folder inside the bucket.
+        :param poll_interval: Seconds between job status checks.
+        :param generation_config: Optional Gemini generation settings added to every request.
+        """
+        if not bucket:
+            raise ValueError("The vertex batch submitter needs execution.bucket (a Cloud Storage bucket).")
+        self.model = model
+        self.bucket = bucket.removeprefix("gs://").rstrip("/")
+        self.prefix = prefix.strip("/")
+        self.poll_interval = poll_interval
+        self.generation_config = generation_config
+
+    def _vertex_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        # Same flattening as GoogleLLM._build_prompt
+        prompt = "\n".join(msg.get("content", "") for msg in request["messages"])
+        body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if self.generation_config:
+            body["generationConfig"] = self.generation_config
+        return body
+
+    @staticmethod
+    def _response_text(response: Dict[str, Any]) -> Optional[str]:
+        for candidate in response.get("candidates", []):
+            parts = candidate.get("content", {}).get("parts", [])
+            text = "".join(part.get("text", "") for part in parts)
+            if text:
+                return text
+        return None
+
+    def run(self, requests_path: str, results_path: str) -> None:
+        from google.cloud import storage
+        from vertexai.batch_prediction import BatchPredictionJob
+
+        # Requests are matched back by their content; identical prompts are interchangeable
+        pending: Dict[str, List[Dict[str, Any]]] = {}
+        lines = []
+        for request in read_jsonl(requests_path):
+            body = self._vertex_request(request)
+            pending.setdefault(_request_key(body), []).append(request)
+            lines.append(json.dumps({"request": body}, ensure_ascii=False))
+
+        run_name = os.path.splitext(os.path.basename(requests_path))[0]
+        client = storage.Client()
+        bucket = client.bucket(self.bucket)
+        input_blob = f"{self.prefix}/{run_name}/input.jsonl"
+        bucket.blob(input_blob).upload_from_string("\n".join(lines) + "\n", content_type="application/jsonl")
+        output_prefix = f"gs://{self.bucket}/{self.prefix}/{run_name}/output"
+
+        job = BatchPredictionJob.submit(
+            source_model=self.model.model_name,
+            input_dataset=f"gs://{self.bucket}/{input_blob}",
+            output_uri_prefix=output_prefix,
+        )
+        logger.info(f"Submitted Vertex AI batch job {job.resource_name} with {len(lines)} requests.")
+        while not job.has_ended:
+            time.sleep(self.poll_interval)
+            job.refresh()
+        if not job.has_succeeded:
+            raise RuntimeError(f"Vertex AI batch job {job.resource_name} failed: {job.error}")
+
+        output_path = job.output_location.removeprefix(f"gs://{self.bucket}/")
+        answered = 0
+        with open(results_path, "w", encoding="utf-8") as out:
+            for blob in client.list_blobs(self.bucket, prefix=output_path):
+                if not blob.name.endswith(".jsonl"):
+                    continue
+                for line in blob.download_as_text().splitlines():
+                    if not line.strip():
+                        continue
+                    prediction = json.loads(line)
+                    candidates = pending.get(_request_key(prediction.get("request", {})))
+                    if not candidates:
+                        continue
+                    request = candidates.pop()
+                    text = self._response_text(prediction.get("response") or {})
+                    error = prediction.get("status") or (None if text else "Empty response")
+                    out.write(json.dumps({
+                        "custom_id": request["custom_id"],
+                        "metadata": request.get("metadata", {}),
+                        "response": text,
+                        "error": error or None,
+                    }, ensure_ascii=False) + "\n")
+                    answered += 1
+        logger.info(f"Vertex AI batch job answered {answered} of {len(lines)} requests.")
+
+    def __repr__(self):
+        return f"VertexBatchSubmitter(model={self.model!r}, bucket={self.bucket}, prefix={self.prefix})"
+
+
+SUBMITTERS = {
+    "local": LocalBatchSubmitter,
+    "vertex": VertexBatchSubmitter,
+}
+
+
+def get_submitter(model: BaseLLM, execution_cfg: Dict[str, Any]) -> BatchSubmitter:
+    """
+    Builds the submitter named by `execution.submitter`. Defaults to `vertex` for Google
+    models authenticated with a service account, and to `local` otherwise.
+
+    :param model: The pipeline's model.
+    :param execution_cfg: The `execution` config section; keys other than `mode`, `submitter`,
+        `oversample` and `results` are passed to the submitter.
+    :return: The submitter.
+    """
+    cfg = dict(execution_cfg)
+    for key in ("mode", "oversample", "results"):
+        cfg.pop(key, None)
+    default = "vertex" if getattr(model, "_mode", None) == "service_account" else "local"
+    name = cfg.pop("submitter", default)
+    if name not in SUBMITTERS:
+        raise ValueError(f"Unknown batch submitter: {name}. Available: {sorted(SUBMITTERS)}")
+    return SUBMITTERS[name](model, **cfg)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+from src.core.base_llm import BaseLLM
+from src.core.wrapped_llm import WrappedLLM
+from src.utils.disk_cache import DiskCache
+from src.utils.metrics import REGISTRY
+
+
+class CachedLLM(WrappedLLM):
+    """
+    Wraps any BaseLLM and serves repeated requests from a persistent on-disk cache.
+    Responses are keyed on provider, model name, messages and generation kwargs.
+    Calls made with `cache=False` go straight to the wrapped model: sampling prompts are
+    identical on every call, and caching them would return the same answer each time.
+    """
+
+    stats_label = "LLM response cache"
+
+    def __init__(self, model: BaseLLM, cache: DiskCache, bypass: bool = False):
+        """
+        Initialize the cache wrapper.
+
+        :param model: The model whose responses are cached.
+        :param cache: The store used for responses.
+        :param bypass: If True, the cache is neither read nor written (e.g. for sampling runs).
+        """
+        super().__init__(model)
+        self.cache = cache
+        self.bypass = bypass
+
+    @classmethod
+    def from_config(cls, model: BaseLLM, cache_cfg: Dict[str, Any]) -> "CachedLLM":
+        """
+        Builds the wrapper from the `model.cache` section of the config.
+
+        :param model: The model to wrap.
+        :param cache_cfg: Dict with optional `path`, `max_size_mb` and `bypass` keys.
+        :return: The cached model.
+        """
+        max_size_mb = cache_cfg.get("max_size_mb")
+        cache = DiskCache(
+            cache_cfg.get("path", ".cache/llm_responses.sqlite"),
+            max_size_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else None,
+        )
+        return cls(model, cache, bypass=cache_cfg.get("bypass", False))
+
+    def cache_key(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Computes the content address of a request.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Generation arguments for the model.
+        :return: A hex digest identifying the request.
+        """
+        payload = {
+            "provider": getattr(self.model, "provider_name", type(self.model).__name__),
+            "model_name": getattr(self.model, "model_name", None),
+            "messages": messages,
+            "kwargs": kwargs,
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def generate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Return the cached response for the request, calling the wrapped model on a miss.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model; `cache=False` skips the cache.
+        :return: The generated response as a string.
+        """
+        if self.bypass or not kwargs.pop("cache", True):
+            return self.model.generate_response(messages, **kwargs)
+        key = self.cache_key(messages, **kwargs)
+        cached = self.cache.get(key)
+        self._record_lookup(cached)
+        if cached is not None:
+            return cached
+        response = self.model.generate_response(messages, **kwargs)
+        self.cache.set(key, response)
+        return response
+
+    async def agenerate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Async counterpart of `generate_response`.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model.
+        :return: The generated response as a string.
+        """
+        if self.bypass or not kwargs.pop("cache", True):
+            return await self.model.agenerate_response(messages, **kwargs)
+        key = self.cache_key(messages, **kwargs)
+        cached = self.cache.get(key)
+        self._record_lookup(cached)
+        if cached is not None:
+            return cached
+        response = await self.model.agenerate_response(messages, **kwargs)
+        self.cache.set(key, response)
+        return response
+
+    def _record_lookup(self, cached: Optional[str]) -> None:
+        REGISTRY.counter("datagen_llm_cache_requests_total", "LLM response cache lookups by outcome.").inc(
+            provider=getattr(self.model, "provider_name", type(self.model).__name__),
+            outcome="hit" if cached is not None else "miss",
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        :return: Hit/miss counters and size of the underlying cache.
+        """
+        return self.cache.stats()
+
+    def __repr__(self):
+        return f"CachedLLM(model={self.model!r}, cache={self.cache!r}, bypass={self.bypass})"
@@ -0,0 +1,122 @@
+import json
+import os
+import random
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Config keys holding secrets; they are never written to manifests or the work queue
+CREDENTIAL_KEYS = {"api_key", "service_account_json", "token", "access_token", "password", "secret"}
+
+
+def strip_credentials(config: Any) -> Any:
+    """
+    Returns a copy of `config` without credential keys, at any depth (e.g. a pool's
+    `backends[*].api_key`), so it can be stored next to the output or in a shared queue.
+    """
+    if isinstance(config, dict):
+        return {key: strip_credentials(value) for key, value in config.items() if key not in CREDENTIAL_KEYS}
+    if isinstance(config, list):
+        return [strip_credentials(value) for value in config]
+    return config
+
+
+def restore_credentials(config: Any, live_config: Any) -> Any:
+    """
+    Returns a copy of a stored `config` with the credential keys of `live_config` (the config
+    file of the resuming process) put back at the same places. List entries, such as pool
+    backends, are matched by position. Providers without a credential in either config fall
+    back to their environment variables.
+    """
+    if isinstance(config, dict) and isinstance(live_config, dict):
+        restored = {key: restore_credentials(value, live_config.get(key)) for key, value in config.items()}
+        restored.update({key: value for key, value in live_config.items() if key in CREDENTIAL_KEYS and key not in restored})
+        return restored
+    if isinstance(config, list) and isinstance(live_config, list):
+        return [restore_credentials(value, live) for value, live in zip(config, live_config)] + config[len(live_config):]
+    return config
+
+
+class RunManifest:
+    """
+    Progress record of a pipeline run, stored next to the output as `<run_id>.manifest.json`.
+    It is rewritten after every chunk flushed to disk so an interrupted run can be resumed.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        pipeline_str: str,
+        config: Dict[str, Any],
+        output_path: str,
+        output_format: str,
+        target_records: int,
+    ):
+        self.run_id = run_id
+        self.pipeline_str = pipeline_str
+        self.config = config
+        self.output_path = output_path
+        self.output_format = output_format
+        self.target_records = target_records
+        self.records_written = 0
+        self.output_bytes = 0
+        self.status = "running"
+        self.task_state: Dict[str, Any] = {}
+        self.rng_state: Optional[list] = None
+        self.created_at = datetime.now().isoformat(timespec="seconds")
+        self.updated_at = self.created_at
+
+    @property
+    def path(self) -> str:
+        """Location of the manifest file."""
+        return os.path.join(os.path.dirname(self.output_path), f"{self.run_id}.manifest.json")
+
+    @property
+    def remaining(self) -> int:
+        """Number of records still to be generated."""
+        return max(0, self.target_records - self.records_written)
+
+    def capture_rng(self) -> None:
+        """Stores the state of Python's global random generator."""
+        version, state, gauss = random.getstate()
+        self.rng_state = [version, list(state), gauss]
+
+    def restore_rng(self) -> None:
+        """Restores the random generator state captured by `capture_rng`, if any."""
+        if self.rng_state:
+            version, state, gauss = self.rng_state
+            random.setstate((version, tuple(state), gauss))
+
+    def save(self) -> None:
+        """Atomically writes the manifest to disk."""
+        self.updated_at = datetime.now().isoformat(timespec="seconds")
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.__dict__, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def load(cls, run: str, folder: str = "output") -> "RunManifest":
+        """
+        Loads a manifest from a path or a run id.
+
+        Args:
+            run: Path to a manifest file, or a run id looked up in `folder`.
+            folder: Output folder searched when `run` is a run id.
+
+        Returns:
+            RunManifest: The loaded manifest.
+
+        Raises:
+            FileNotFoundError: If no manifest exists for `run`.
+        """
+        path = run if os.path.isfile(run) else os.path.join(folder, f"{run}.manifest.json")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"No run manifest found for '{run}' (looked for {path}).")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        manifest = cls.__new__(cls)
+        manifest.__dict__.update(data)
+        return manifest
+
+    def __repr__(self):
+        return f"RunManifest(run_id={self.run_id}, records_written={self.records_written}/{self.target_records}, status={self.status})"
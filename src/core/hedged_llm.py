@@ -0,0 +1,311 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional, Union
+from src.core.base_llm import BaseLLM
+from src.core.wrapped_llm import WrappedLLM
+from src.utils.metrics import REGISTRY
+
+
+def _spawn(release, func, *args, **kwargs) -> Future:
+    """
+    Runs `func` in a daemon thread and returns its future; `release` is called once `func`
+    returns, even if its caller stopped waiting. Unlike an executor's workers, a call that
+    never returns cannot keep the process from exiting.
+    """
+    future = Future()
+
+    def run():
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        finally:
+            release()
+
+    threading.Thread(target=run, name="llm-request", daemon=True).start()
+    return future
+
+
+class HedgedLLM(WrappedLLM):
+    """
+    Wraps any BaseLLM with a per-call deadline and optional hedged requests.
+
+    A call that has not answered after the `quantile` (default p95) of recently observed
+    latencies gets a duplicate request, and whichever succeeds first is returned. Hedges
+    are capped at `budget` (a fraction of all requests), so the extra cost stays bounded.
+    A call without an answer by `deadline` seconds raises `TimeoutError`, which the
+    callers' retry logic treats like any other failed call. Losing async requests are
+    cancelled. Threaded requests cannot be cancelled: a losing or abandoned one is left to
+    finish and its answer is dropped. At most `max_in_flight` of them run at once, abandoned
+    ones included, so retries after missed deadlines cannot pile up threads on a hung
+    provider. With `native_timeout` the provider aborts its own requests at the deadline,
+    so calls that are not hedged run on the caller's thread.
+    """
+
+    stats_label = "Deadlines and hedging"
+
+    def __init__(
+        self,
+        model: BaseLLM,
+        deadline: Optional[float] = None,
+        hedge: bool = False,
+        quantile: float = 0.95,
+        budget: float = 0.05,
+        delay: Optional[float] = None,
+        min_samples: int = 20,
+        window: int = 500,
+        max_in_flight: int = 32,
+        native_timeout: bool = False,
+    ):
+        """
+        Initialize the wrapper.
+
+        :param model: The model whose calls are bounded and hedged.
+        :param deadline: Seconds after which a call fails with `TimeoutError`. None for no limit.
+        :param hedge: Whether slow calls get a duplicate request.
+        :param quantile: Latency quantile after which a call is hedged.
+        :param budget: Largest fraction of requests that may be hedges.
+        :param delay: Fixed hedge delay in seconds, instead of the observed quantile.
+        :param min_samples: Latencies observed before hedging on the quantile starts.
+        :param window: Number of recent latencies the quantile is computed over.
+        :param max_in_flight: Threaded requests running at once, abandoned ones included.
+            A call waits for a free slot within its deadline; a hedge is skipped without one.
+        :param native_timeout: Whether the wrapped model was given `deadline` as its own
+            client timeout, so it gives up on slow requests itself.
+        """
+        if not 0 < quantile < 1:
+            raise ValueError(f"quantile must be in (0, 1), got {quantile}")
+        super().__init__(model)
+        self.deadline = deadline
+        self.hedge = hedge
+        self.quantile = quantile
+        self.budget = budget
+        self.delay = delay
+        self.min_samples = min_samples
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.native_timeout = native_timeout
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._latencies = deque(maxlen=max(1, int(window)))
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        model: BaseLLM,
+        deadline: Optional[float] = None,
+        hedge_cfg: Union[bool, Dict[str, Any], None] = None,
+        concurrency: int = 8,
+        native_timeout: bool = False,
+    ) -> "HedgedLLM":
+        """
+        Builds the wrapper from the `model.deadline` and `model.hedge` config options.
+
+        :param model: The model to wrap.
+        :param deadline: Seconds per call, or None.
+        :param hedge_cfg: True for the default hedging settings, or a dict with `quantile`,
+            `budget`, `delay`, `min_samples`, `window` and `max_in_flight`; False or None to
+            disable hedging.
+        :param concurrency: Calls the task keeps in flight. Unless `max_in_flight` is set, four
+            threads are allowed per call: the call, its hedge and room for abandoned ones.
+        :param native_timeout: Whether `deadline` is also the model's own client timeout.
+        :return: The wrapped model.
+        """
+        hedge_cfg = dict(hedge_cfg) if isinstance(hedge_cfg, dict) else {"enabled": bool(hedge_cfg)}
+        hedge = hedge_cfg.pop("enabled", True)
+        hedge_cfg.setdefault("max_in_flight", 4 * max(1, int(concurrency)))
+        return cls(model, deadline=deadline, hedge=hedge, native_timeout=native_timeout, **hedge_cfg)
+
+    def _observe(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def hedge_delay(self) -> Optional[float]:
+        """
+        :return: Seconds after which a call is hedged, or None while hedging is off or the
+            quantile is not known yet.
+        """
+        if not self.hedge:
+            return None
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)]
+
+    def _start_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def _take_hedge(self) -> bool:
+        """Counts a hedge if the budget allows one."""
+        with self._lock:
+            if self.hedges + 1 > self.budget * self.requests:
+                return False
+            self.hedges += 1
+            self.requests += 1
+            return True
+
+    def _record_hedge(self, won: bool) -> None:
+        with self._lock:
+            self.hedge_wins += won
+        REGISTRY.counter("datagen_llm_hedges_total", "Hedged LLM requests, by whether the hedge answered first.").inc(
+            provider=getattr(self.model, "provider_name", type(self.model).__name__), outcome="won" if won else "lost"
+        )
+
+    def _timeout(self) -> TimeoutError:
+        with self._lock:
+            self.deadline_exceeded += 1
+        provider = getattr(self.model, "provider_name", type(self.model).__name__)
+        REGISTRY.counter("datagen_llm_deadline_exceeded_total", "LLM calls that missed their deadline.").inc(provider=provider)
+        return TimeoutError(f"No response from {provider} within the {self.deadline}s deadline.")
+
+    def _start(self, wait: Optional[float], messages: List[Dict[Any, Any]], **kwargs) -> Optional[Future]:
+        """
+        Starts a threaded request once a slot is free, waiting up to `wait` seconds
+        (None: until one is). Returns None if no slot freed up in time.
+        """
+        if not self._slots.acquire(timeout=wait):
+            return None
+        return _spawn(self._slots.release, self._timed, messages, **kwargs)
+
+    def _start_hedge(self, messages: List[Dict[Any, Any]], **kwargs) -> Optional[Future]:
+        """Starts a hedge if a slot is free right now and the budget allows one."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        if not self._take_hedge():
+            self._slots.release()
+            return None
+        return _spawn(self._slots.release, self._timed, messages, **kwargs)
+
+    def _timed(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        started = time.monotonic()
+        response = self.model.generate_response(messages, **kwargs)
+        self._observe(time.monotonic() - started)
+        return response
+
+    async def _atimed(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        started = time.monotonic()
+        response = await self.model.agenerate_response(messages, **kwargs)
+        self._observe(time.monotonic() - started)
+        return response
+
+    def _wait_timeout(self, started: float, hedged: bool, delay: Optional[float]) -> Optional[float]:
+        """Seconds until the next event: the hedge point if no hedge was sent yet, else the deadline."""
+        now = time.monotonic()
+        ends = []
+        if self.deadline is not None:
+            ends.append(started + self.deadline)
+        if not hedged and delay is not None:
+            ends.append(started + delay)
+        return max(0.0, min(ends) - now) if ends else None
+
+    def generate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Generate a response within the deadline, hedging slow calls.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model.
+        :return: The generated response as a string.
+        """
+        delay = self.hedge_delay()
+        self._start_request()
+        if delay is None and (self.deadline is None or self.native_timeout):
+            return self._timed(messages, **kwargs)
+        started = time.monotonic()
+        primary = self._start(self.deadline, messages, **kwargs)
+        if primary is None:
+            raise self._timeout()
+        pending = {primary}
+        hedge = None
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=self._wait_timeout(started, hedge is not None, delay), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if hedge is not None:
+                        self._record_hedge(future is hedge)
+                    return future.result()
+                error = future.exception()
+            if self.deadline is not None and time.monotonic() - started >= self.deadline:
+                raise self._timeout()
+            # A failed primary is left to the caller's retry logic rather than hedged
+            if not done and hedge is None and error is None:
+                hedge = self._start_hedge(messages, **kwargs)
+                if hedge is not None:
+                    pending.add(hedge)
+                else:
+                    delay = None  # Over budget or out of slots: wait for the primary until the deadline
+        if hedge is not None:
+            self._record_hedge(False)
+        raise error
+
+    async def agenerate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Async counterpart of `generate_response`; the losing request is cancelled.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model.
+        :return: The generated response as a string.
+        """
+        delay = self.hedge_delay()
+        self._start_request()
+        if delay is None and self.deadline is None:
+            return await self._atimed(messages, **kwargs)
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self._atimed(messages, **kwargs))
+        pending = {primary}
+        hedge = None
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=self._wait_timeout(started, hedge is not None, delay), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if hedge is not None:
+                            self._record_hedge(task is hedge)
+                        return task.result()
+                    error = task.exception()
+                if self.deadline is not None and time.monotonic() - started >= self.deadline:
+                    raise self._timeout()
+                if not done and hedge is None and error is None and self._take_hedge():
+                    hedge = asyncio.ensure_future(self._atimed(messages, **kwargs))
+                    pending.add(hedge)
+                elif not done and hedge is None:
+                    delay = None
+        finally:
+            for task in pending:
+                task.cancel()
+        if hedge is not None:
+            self._record_hedge(False)
+        raise error
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        :return: Requests sent (hedges included), hedges, hedges that answered first, calls
+            that missed the deadline and the current hedge delay.
+        """
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "deadline_exceeded": self.deadline_exceeded,
+                "hedge_delay": round(delay, 3) if delay is not None else None,
+            }
+
+    def __repr__(self):
+        return f"HedgedLLM(model={self.model!r}, deadline={self.deadline}, hedge={self.hedge}, quantile={self.quantile}, budget={self.budget})"
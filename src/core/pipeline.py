@@ -1,14 +1,33 @@
 from src.core import AutoTask, AutoModel
-from src.utils.data_saver import save_data
+from src.core.cached_llm import CachedLLM
+from src.core.hedged_llm import HedgedLLM
+from src.core.wrapped_llm import WrappedLLM
+from src.core.batch import get_submitter, read_jsonl, write_requests
+from src.core.checkpoint import RunManifest, restore_credentials, strip_credentials
+from src.core.work_queue import WorkQueue
+from src.utils.data_saver import DataWriter, JsonlWriter
+from src.utils.dedup import DedupIndex
 from src.utils.color_logger import get_color_logger
+from src.utils.metrics import REGISTRY, PrometheusFileExporter, write_json_summary
+from src.utils.retry import RETRY_BUDGET, configure_retries
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import inspect
+import json
 import os
+import signal
+import socket
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 class Pipeline:
     def __init__(self, task=None):
         self.model = None
         self.task = task
         self.config = None
+        self.pipeline_str = None
         self.logger = get_color_logger(level="INFO")
 
     @classmethod
@@ -22,20 +41,290 @@ class Pipeline:
             raise ValueError("Pipeline string must be in the format 'task:provider:model'.")
 
         task_type, provider, model_name = parts
-        model = AutoModel.get_model(f"{provider}:{model_name}")
-        if config:
-            cls.config = config
-        domain = config.get("task", {}).get("domain", "general")
-        num_records = config.get("task", {}).get("num_records", 10)
-        task = AutoTask.get_task(task_type, model, domain=domain, num_records=num_records)
+        configure_retries(config.get("retry"))
+        model_cfg = dict(config.get("model", {}))
+        for key in ("provider", "model_name", "cache"):
+            model_cfg.pop(key, None)
+        rate_limit = model_cfg.pop("rate_limit", None)
+        deadline = model_cfg.pop("deadline", None)
+        hedge_cfg = model_cfg.pop("hedge", None)
+        cache_cfg = config.get("model", {}).get("cache")
+        native_timeout = bool(deadline) and "timeout" in inspect.signature(AutoModel.get_model_class(provider)).parameters
+        if native_timeout:
+            # Providers with a native client timeout also abort the underlying HTTP request
+            model_cfg.setdefault("timeout", deadline)
+        # Any remaining model settings (e.g. api_key) are passed to the provider constructor
+        model = AutoModel.get_model(f"{provider}:{model_name}", rate_limit=rate_limit, **model_cfg)
+        if deadline or hedge_cfg:
+            concurrency = (config.get("task") or {}).get("concurrency", 4)
+            model = HedgedLLM.from_config(model, deadline=deadline, hedge_cfg=hedge_cfg, concurrency=concurrency, native_timeout=native_timeout)
+        if cache_cfg and cache_cfg.get("enabled", True):
+            model = CachedLLM.from_config(model, cache_cfg)
+        task_cfg = dict(config.get("task", {}))
+        task_cfg.pop("type", None)
+        domain = task_cfg.pop("domain", "general")
+        num_records = task_cfg.pop("num_records", 10)
+        # Any remaining task settings (e.g. concurrency) are passed to the task constructor
+        task = AutoTask.get_task(task_type, model, domain=domain, num_records=num_records, **task_cfg)
         c = cls(task=task)
         c.model = model
+        c.config = config
+        c.pipeline_str = pipeline_str
         return c
 
-    def run(self, output_cfg=None):
+    @classmethod
+    def resume(cls, run: str, folder: str = "output", live_config=None):
+        """
+        Resume an interrupted run from its manifest and generate the remaining records.
+        Manifests are stored without credentials; they are taken from `live_config`, or from
+        the providers' environment variables.
+
+        Args:
+            run: Run id or path to a `<run_id>.manifest.json` file.
+            folder: Output folder searched when `run` is a run id.
+            live_config: Config of the resuming process, whose API keys and service accounts are used.
+        """
+        manifest = RunManifest.load(run, folder)
+        reason = cls._not_resumable(manifest.config)
+        if reason:
+            raise ValueError(f"Run {manifest.run_id} cannot be resumed: {reason}")
+        pipeline = cls.build(manifest.pipeline_str, config=restore_credentials(manifest.config, live_config or {}))
+        pipeline.run(resume=manifest)
+        return pipeline
+
+    @staticmethod
+    def _not_resumable(config) -> Optional[str]:
+        """Returns why a run with this config cannot be resumed, or None if it can."""
+        config = config or {}
+        output_cfg = config.get("output") or {}
+        if ((config.get("execution") or {}).get("mode", "online")) == "batch":
+            return "batch runs cannot be resumed; set execution.results to the results file of the job to ingest it again."
+        output_format = output_cfg.get("format", "jsonl")
+        if not DataWriter.can_append(output_format, output_cfg.get("jsonl")):
+            kind = "compressed or sharded JSONL" if output_format == "jsonl" else f"{output_format} output"
+            return f"{kind} cannot be appended to."
+        return None
+
+    def enqueue(self, queue: WorkQueue, output_cfg=None, oversample: float = 1.0) -> str:
+        """
+        Plan the run as independent units and add them to a work queue, for workers to generate
+        with `Pipeline.work` and `Pipeline.merge` to combine. Returns the run id.
+
+        Args:
+            queue: The shared work queue.
+            output_cfg: Output settings of the merged file; defaults to self.config['output'].
+            oversample: Factor by which the task over-plans units, to cover duplicates across
+                workers and failed units.
+        """
+        if output_cfg is None:
+            output_cfg = (self.config or {}).get("output") or {}
+        manifest = self._new_manifest(output_cfg)
+        count = queue.add_run(
+            manifest.run_id,
+            manifest.pipeline_str,
+            manifest.config,
+            manifest.output_path,
+            manifest.output_format,
+            manifest.target_records,
+            self.task.plan_units(oversample=oversample),
+        )
+        manifest.status = "queued"
+        manifest.save()
+        self.logger.info(f"Queued run {manifest.run_id} as {count} units in {queue.path}.")
+        return manifest.run_id
+
+    @classmethod
+    def work(cls, queue: WorkQueue, run_id: Optional[str] = None, model_cfg: Optional[Dict[str, Any]] = None, concurrency: int = 1, poll_interval: float = 5.0, worker_id: Optional[str] = None) -> int:
+        """
+        Work on queued units until none is pending or leased: lease a unit, generate its records,
+        write them to `<run_id>.units/<unit_id>.jsonl` next to the run's output and ack it.
+        Start as many workers as wanted, on any machine that sees the queue and output folder.
+
+        Args:
+            queue: The shared work queue.
+            run_id: Only work on this run. By default units of every queued run are taken.
+            model_cfg: Model settings replacing the run's own, e.g. this machine's API keys or pool.
+            concurrency: Units worked on at once by this process.
+            poll_interval: Seconds to wait while the remaining units are leased by other workers.
+            worker_id: Name of this worker in the queue; defaults to `<hostname>-<pid>`.
+
+        Returns:
+            int: Number of units this worker completed.
+        """
+        worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        logger = get_color_logger(level="INFO")
+        runs: Dict[str, Tuple[Any, str]] = {}  # run id -> (task, output path)
+        lock = threading.Lock()
+        stop = threading.Event()
+        units = REGISTRY.counter("datagen_queue_units_total", "Work queue units finished by this worker, by outcome.")
+
+        def task_for(unit_run_id: str) -> Tuple[Any, str]:
+            with lock:
+                if unit_run_id not in runs:
+                    run = queue.get_run(unit_run_id)
+                    config = dict(run["config"])
+                    pipeline_str = run["pipeline_str"]
+                    if model_cfg:
+                        config["model"] = model_cfg
+                        pipeline_str = f"{pipeline_str.split(':')[0]}:{model_cfg['provider']}:{model_cfg['model_name']}"
+                    runs[unit_run_id] = (cls.build(pipeline_str, config=config).task, run["output_path"])
+                return runs[unit_run_id]
+
+        def work_slot(slot: int) -> int:
+            owner = f"{worker_id}/{slot}"
+            completed = 0
+            while not stop.is_set():
+                unit = queue.lease(owner, run_id)
+                if unit is None:
+                    counts = queue.counts(run_id)
+                    if not counts["pending"] and not counts["leased"]:
+                        break
+                    stop.wait(poll_interval)
+                    continue
+                task, output_path = task_for(unit["run_id"])
+                heartbeat = threading.Event()
+                extender = threading.Thread(target=cls._extend_lease, args=(queue, unit["unit_id"], owner, heartbeat), daemon=True)
+                extender.start()
+                try:
+                    records = task.run_unit(unit["payload"])
+                    cls._write_unit(output_path, unit["unit_id"], records)
+                except Exception as e:
+                    logger.warning(f"Unit {unit['unit_id']} failed on attempt {unit['attempts']}: {e}")
+                    queue.nack(unit["unit_id"], owner, f"{type(e).__name__}: {e}")
+                    units.inc(outcome="failed")
+                    continue
+                finally:
+                    heartbeat.set()
+                if not queue.ack(unit["unit_id"], owner, len(records)):
+                    logger.warning(f"Unit {unit['unit_id']} finished after its lease expired.")
+                units.inc(outcome="done")
+                completed += 1
+                logger.info(f"Unit {unit['unit_id']}: {len(records)} records.")
+            return completed
+
+        logger.info(f"Worker {worker_id} started on {queue.path}" + (f" for run {run_id}." if run_id else "."))
+        with ThreadPoolExecutor(max_workers=max(1, int(concurrency))) as executor:
+            futures = [executor.submit(work_slot, slot) for slot in range(max(1, int(concurrency)))]
+            try:
+                completed = sum(future.result() for future in futures)
+            except KeyboardInterrupt:
+                logger.warning("Interrupted: finishing the units in progress before exiting.")
+                stop.set()
+                raise
+        logger.info(f"Worker {worker_id} completed {completed} units. Queue: {queue.counts(run_id)}")
+        return completed
+
+    @staticmethod
+    def _extend_lease(queue: WorkQueue, unit_id: str, owner: str, done: threading.Event) -> None:
+        """Keeps renewing a unit's lease until `done` is set."""
+        while not done.wait(queue.lease_seconds / 3):
+            if not queue.extend(unit_id, owner):
+                return
+
+    @staticmethod
+    def _unit_folder(output_path: str) -> str:
+        return f"{os.path.splitext(output_path)[0]}.units"
+
+    @classmethod
+    def _write_unit(cls, output_path: str, unit_id: str, records: List[Dict]) -> None:
+        """Atomically writes a unit's records, so a unit done twice leaves one complete file."""
+        folder = cls._unit_folder(output_path)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{unit_id}.jsonl")
+        tmp_path = f"{path}.{socket.gethostname()}-{os.getpid()}-{threading.get_ident()}.tmp"
+        writer = JsonlWriter(tmp_path)
+        writer.write(records)
+        writer.close()
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def merge(cls, queue: WorkQueue, run_id: str, chunk_size: int = 1000) -> str:
+        """
+        Combine the records of a queued run's finished units into its single output file,
+        in planned order, dropping duplicates across units and stopping at `num_records`.
+        Duplicates are found on the task's `dedup_field` with the run's `task.dedup` settings
+        (exact duplicates only when dedup is disabled). Returns the path of the written output.
+
+        Args:
+            queue: The shared work queue.
+            run_id: The queued run.
+            chunk_size: Records buffered before each write to the output file.
+        """
+        logger = get_color_logger(level="INFO")
+        run = queue.get_run(run_id)
+        counts = queue.counts(run_id)
+        if counts["pending"] or counts["leased"] or counts["failed"]:
+            logger.warning(f"Merging run {run_id} with unfinished units: {counts}")
+        task_cfg = run["config"].get("task", {})
+        task_class = AutoTask.get_task_class(task_cfg.get("type", run["pipeline_str"].split(":")[0]))
+        field = task_class.dedup_field
+        index = DedupIndex.from_config(task_cfg.get("dedup")) or DedupIndex(near=False)
+        target = run["target_records"]
+        unit_folder = cls._unit_folder(run["output_path"])
+        output_folder, filename = os.path.split(run["output_path"])
+
+        written = 0
+        run_output_cfg = run["config"].get("output", {})
+        with DataWriter(
+            output_folder,
+            filename,
+            format=run["output_format"],
+            chunk_size=chunk_size,
+            schema=task_class.output_schema,
+            parquet=run_output_cfg.get("parquet"),
+            jsonl=run_output_cfg.get("jsonl"),
+        ) as writer:
+            for unit_id in queue.done_units(run_id):
+                if written >= target:
+                    break
+                path = os.path.join(unit_folder, f"{unit_id}.jsonl")
+                if not os.path.exists(path):
+                    logger.warning(f"Output of unit {unit_id} is missing at {path}; skipping it.")
+                    continue
+                records = list(read_jsonl(path))
+                # A key is decided once per unit, so the variants of one MLM sentence stay together
+                keys = [cls._dedup_key(record, field) for record in records]
+                accepted = {key for key in dict.fromkeys(keys) if index.add(key)}
+                for record, key in zip(records, keys):
+                    if key in accepted and written < target:
+                        writer.write(record)
+                        written += 1
+
+        logger.info(f"Merged {written} records of run {run_id} into {writer.path}. Dedup: {index.stats()}")
+        if written < target:
+            logger.warning(f"The merged output has {written} records out of {target}. Enqueue the run with a higher queue.oversample to plan more units.")
+        try:
+            manifest = RunManifest.load(run_id, output_folder)
+        except FileNotFoundError:
+            return writer.path
+        manifest.records_written = written
+        manifest.output_bytes = os.path.getsize(writer.path) if os.path.exists(writer.path) else 0
+        manifest.status = "completed" if not counts["pending"] and not counts["leased"] else "partial"
+        manifest.save()
+        return writer.path
+
+    @staticmethod
+    def _dedup_key(record: Dict, field: Optional[str]) -> str:
+        value = record.get(field) if field and isinstance(record, dict) else None
+        return value if isinstance(value, str) else json.dumps(record, sort_keys=True, ensure_ascii=False)
+
+    def run(self, output_cfg=None, resume: RunManifest = None):
         """
         Run the pipeline: generate data and save it.
+        Records are streamed from `task.iter_data()` and written to disk in chunks of
+        `output_cfg['chunk_size']` (default 1000) as they arrive.
         Uses output_cfg if provided, else falls back to self.config['output'].
+
+        After every flushed chunk a run manifest (`<run_id>.manifest.json`) is written next to
+        the output with the record count, the task's stage progress and the RNG state.
+        On SIGINT/SIGTERM the buffered records are flushed before exiting, and the run can be
+        continued with `Pipeline.resume(run_id)` if its output can be appended to (CSV, or plain
+        unsharded JSONL) and it is not a batch run.
+
+        When the run ends, a metrics summary (LLM latency and tokens, retries, parse and fetch
+        outcomes, records per second) is written to `<run_id>.metrics.json`. With
+        `output_cfg['metrics']['prometheus']` set, the metrics are also written periodically
+        to that file in Prometheus text format.
         """
         if not self.task:
             raise RuntimeError("Pipeline not built. Call build(model, task, config) first.")
@@ -46,24 +335,187 @@ class Pipeline:
             else:
                 raise ValueError("No output config provided.")
 
+        chunk_size = output_cfg.get("chunk_size", 1000)
+        execution_cfg = (self.config or {}).get("execution") or {}
+        batch_mode = execution_cfg.get("mode", "online") == "batch"
+        reason = self._not_resumable({**(self.config or {}), "output": output_cfg})
+        if resume is not None and reason:
+            raise ValueError(f"Run {resume.run_id} cannot be resumed: {reason}")
+        if resume is not None:
+            manifest = resume
+            self._restore(manifest)
+            if manifest.remaining == 0:
+                self.logger.info(f"Run {manifest.run_id} already has {manifest.records_written} records. Nothing to do.")
+                return
+            self.logger.info(f"Resuming run {manifest.run_id}: {manifest.records_written}/{manifest.target_records} records already written.")
+        else:
+            manifest = self._new_manifest(output_cfg)
+        self.task.num_records = manifest.remaining
+
+        output_folder, filename = os.path.split(manifest.output_path)
+        task_type = getattr(self.task, "task_name", type(self.task).__name__.lower())
+        self.logger.info(f"Generating data for task: {task_type}, streaming to {manifest.output_path} ...")
+
+        # Metrics cover this invocation only; a resumed run starts from zero
+        REGISTRY.reset()
+        RETRY_BUDGET.reset()
+        records = REGISTRY.counter("datagen_records_total", "Records written to the output.")
+        exporter = self._start_exporter(output_cfg.get("metrics"))
+        started = time.time()
+
+        previous_sigterm = self._install_sigterm_handler()
+        writer = DataWriter(
+            output_folder,
+            filename,
+            format=manifest.output_format,
+            chunk_size=chunk_size,
+            append=resume is not None,
+            schema=getattr(self.task, "output_schema", None),
+            parquet=output_cfg.get("parquet"),
+            jsonl=output_cfg.get("jsonl"),
+        )
+        written_before = manifest.records_written
+        try:
+            source = self._iter_batch(manifest, output_folder, execution_cfg) if batch_mode else self.task.iter_data()
+            for record in source:
+                writer.write(record)
+                records.inc(task=task_type)
+                if written_before + writer.records_written != manifest.records_written:
+                    self._checkpoint(manifest, written_before + writer.records_written, writer.path)
+            writer.close()
+            manifest.status = "completed"
+        except BaseException as e:
+            writer.close()
+            manifest.status = "interrupted" if isinstance(e, KeyboardInterrupt) else "failed"
+            raise
+        finally:
+            self._checkpoint(manifest, written_before + writer.records_written, writer.path)
+            self._write_metrics(manifest, output_folder, writer.records_written, time.time() - started)
+            if exporter is not None:
+                exporter.stop()
+            if previous_sigterm is not None:
+                signal.signal(signal.SIGTERM, previous_sigterm)
+            if manifest.status != "completed":
+                self.logger.warning(
+                    f"Run {manifest.run_id} {manifest.status} after {manifest.records_written} records. "
+                    + (f"It cannot be resumed: {reason}" if reason else f"Continue it with: --resume {manifest.run_id}")
+                )
+
+        self.logger.info(f"Generated {writer.records_written} records.")
+        self.logger.info(f"Data saved successfully at {writer.path}.")
+        if RETRY_BUDGET.retries or RETRY_BUDGET.denied:
+            self.logger.info(f"Retries: {RETRY_BUDGET.stats()}")
+        llm = self.task.model
+        while llm is not None:
+            if llm.stats_label:
+                self.logger.info(f"{llm.stats_label}: {llm.stats()}")
+            llm = llm.model if isinstance(llm, WrappedLLM) else None
+
+    def _new_manifest(self, output_cfg) -> RunManifest:
+        """Creates the manifest for a fresh run; the run id is the output file name without extension."""
         # Try to infer task/model/num_records for filename
         task_type = getattr(self.task, "task_name", type(self.task).__name__.lower())
-        llm_short = type(self.task.model).__name__.replace("LLM", "").lower()
+        llm_short = getattr(self.task.model, "provider_name", type(self.task.model).__name__.replace("LLM", "").lower())
         num_records = getattr(self.task, "num_records", "N")
 
-        self.logger.info(f"Generating data for task: {task_type}...")
-        data = self.task.generate_data()
-        self.logger.info(f"Generated {len(data)} records.")
-
         output_folder = output_cfg.get("folder", "output")
         output_format = output_cfg.get("format", "jsonl")
         dt_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{task_type}_{llm_short}_{num_records}_{dt_str}.{output_format}"
-        self.logger.info(f"Saving data to {output_folder}/{filename} ...")
-        save_data(
-            data,
-            folder=output_folder,
-            filename=filename,
-            format=output_format
+        run_id = f"{task_type}_{llm_short}_{num_records}_{dt_str}"
+        os.makedirs(output_folder, exist_ok=True)
+        config = dict(self.config or {})
+        config["output"] = output_cfg
+        manifest = RunManifest(
+            run_id=run_id,
+            pipeline_str=self.pipeline_str or f"{task_type}:{llm_short}:{getattr(self.task.model, 'model_name', '')}",
+            config=strip_credentials(config),
+            output_path=os.path.join(output_folder, f"{run_id}.{output_format}"),
+            output_format=output_format,
+            target_records=self.task.num_records,
         )
-        self.logger.info(f"Data saved successfully at {os.path.join(output_folder, filename)}.")
+        manifest.capture_rng()
+        manifest.save()
+        return manifest
+
+    def _restore(self, manifest: RunManifest) -> None:
+        """
+        Restores task progress and RNG state, drops output written after the last checkpoint,
+        and hands the kept records to the task so it does not write them again.
+        """
+        resumable = self._not_resumable(manifest.config) is None
+        if resumable and os.path.exists(manifest.output_path) and os.path.getsize(manifest.output_path) > manifest.output_bytes:
+            with open(manifest.output_path, "r+b") as f:
+                f.truncate(manifest.output_bytes)
+        self.task.load_state_dict(manifest.task_state)
+        if resumable and os.path.exists(manifest.output_path):
+            self.task.load_output(self._read_output(manifest.output_path, manifest.output_format))
+        manifest.restore_rng()
+        manifest.status = "running"
+
+    @staticmethod
+    def _read_output(path: str, format: str) -> Iterator[Dict]:
+        """Reads back the records of an appendable (plain JSONL or CSV) output file."""
+        if format == "csv":
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                yield from csv.DictReader(f)
+        else:
+            yield from read_jsonl(path)
+
+    def _checkpoint(self, manifest: RunManifest, records_written: int, output_path: str) -> None:
+        """
+        Records progress that has reached the disk in the run manifest. `output_bytes` is only
+        recorded for runs that can be resumed; a Parquet or compressed file is not valid at an
+        arbitrary byte offset and is never truncated by `_restore`.
+        """
+        manifest.records_written = records_written
+        resumable = self._not_resumable(manifest.config) is None
+        manifest.output_bytes = os.path.getsize(output_path) if resumable and os.path.exists(output_path) else 0
+        manifest.task_state = self.task.state_dict()
+        manifest.capture_rng()
+        manifest.save()
+
+    def _iter_batch(self, manifest: RunManifest, output_folder: str, execution_cfg) -> Iterator[Dict]:
+        """
+        Batch execution: the task emits all its requests to `<run_id>.requests.jsonl`, a submitter
+        runs them as one job into `<run_id>.results.jsonl`, and the task parses the results into
+        records. With `execution.results` set, that file is ingested without running a job.
+        """
+        results_path = execution_cfg.get("results")
+        if not results_path:
+            requests_path = os.path.join(output_folder, f"{manifest.run_id}.requests.jsonl")
+            results_path = os.path.join(output_folder, f"{manifest.run_id}.results.jsonl")
+            count = write_requests(requests_path, self.task.build_requests(oversample=execution_cfg.get("oversample", 1.0)))
+            submitter = get_submitter(self.task.model, execution_cfg)
+            self.logger.info(f"Running {count} requests from {requests_path} as a batch job with {submitter!r} ...")
+            submitter.run(requests_path, results_path)
+        self.logger.info(f"Ingesting batch results from {results_path} ...")
+        yield from self.task.parse_responses(read_jsonl(results_path))
+
+    def _start_exporter(self, metrics_cfg):
+        """Starts the periodic Prometheus file writer if `output.metrics.prometheus` is set."""
+        if not metrics_cfg or not metrics_cfg.get("prometheus"):
+            return None
+        return PrometheusFileExporter(metrics_cfg["prometheus"], interval=metrics_cfg.get("interval", 15)).start()
+
+    def _write_metrics(self, manifest: RunManifest, output_folder: str, records_written: int, duration: float) -> None:
+        """Writes `<run_id>.metrics.json` with run totals and every collected metric."""
+        path = os.path.join(output_folder, f"{manifest.run_id}.metrics.json")
+        write_json_summary(path, extra={
+            "run_id": manifest.run_id,
+            "status": manifest.status,
+            "records_written": records_written,
+            "total_records_written": manifest.records_written,
+            "duration_seconds": duration,
+            "records_per_second": records_written / duration if duration > 0 else 0.0,
+        })
+        self.logger.info(f"Metrics saved at {path}.")
+
+    def _install_sigterm_handler(self):
+        """Makes SIGTERM unwind like Ctrl-C so partial output is flushed. Returns the previous handler."""
+        if threading.current_thread() is not threading.main_thread():
+            return None
+
+        def handler(signum, frame):
+            raise KeyboardInterrupt(f"Received signal {signum}")
+
+        return signal.signal(signal.SIGTERM, handler)
@@ -0,0 +1,135 @@
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a `StagePipeline`.
+    `func` takes an item from the previous stage and returns an iterable of items for the next one,
+    so a stage can drop (empty iterable), transform (one item) or fan out (several items).
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Iterable[Any]], workers: int = 1):
+        """
+        Args:
+            name: Stage name, used for thread names and errors.
+            func: Function applied to every item.
+            workers: Number of threads running `func` concurrently.
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+
+    def __repr__(self):
+        return f"Stage(name={self.name}, workers={self.workers})"
+
+
+class StagePipeline:
+    """
+    Producer/consumer engine that runs stages concurrently, connected by bounded queues.
+
+    Items flow to the next stage as soon as they are ready, so later stages start while earlier
+    ones are still working. Bounded queues apply backpressure: a stage whose output queue is full
+    waits, which keeps memory bounded. Iterating the pipeline yields the outputs of the last stage
+    in completion order. Closing the iterator early (e.g. once enough records were produced) stops
+    all workers, and an exception raised in any stage is re-raised to the consumer.
+    """
+
+    def __init__(self, source: Iterable[Any], stages: List[Stage], queue_size: int = 16):
+        """
+        Args:
+            source: Items fed into the first stage; consumed on a separate thread.
+            stages: The stages, in order.
+            queue_size: Capacity of each queue between stages.
+        """
+        self.source = source
+        self.stages = stages
+        self.queue_size = max(1, int(queue_size))
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        """Puts `item` on `q`, giving up if the pipeline is stopping. Returns False when stopped."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        """Gets the next item from `q`, returning `_DONE` if the pipeline is stopping."""
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: BaseException) -> None:
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    def _feed(self, out_q: queue.Queue, consumers: int) -> None:
+        try:
+            for item in self.source:
+                if not self._put(out_q, item):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            for _ in range(consumers):
+                self._put(out_q, _DONE)
+
+    def _work(self, stage: Stage, in_q: queue.Queue, out_q: queue.Queue, remaining: List[int], lock: threading.Lock, consumers: int) -> None:
+        try:
+            while True:
+                item = self._get(in_q)
+                if item is _DONE:
+                    break
+                for output in stage.func(item):
+                    if not self._put(out_q, output):
+                        return
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            # The last worker of a stage tells every worker of the next stage to finish
+            if last:
+                for _ in range(consumers):
+                    self._put(out_q, _DONE)
+
+    def __iter__(self) -> Iterator[Any]:
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(queues[0], self.stages[0].workers), name="stage-source", daemon=True)]
+        for i, stage in enumerate(self.stages):
+            consumers = self.stages[i + 1].workers if i + 1 < len(self.stages) else 1
+            remaining, lock = [stage.workers], threading.Lock()
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[i], queues[i + 1], remaining, lock, consumers),
+                    name=f"stage-{stage.name}-{n}",
+                    daemon=True,
+                ))
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=1)
+        if self._error is not None:
+            raise self._error
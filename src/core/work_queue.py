@@ -0,0 +1,249 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from src.core.checkpoint import strip_credentials
+
+
+class WorkQueue:
+    """
+    Durable queue of generation units shared by several worker processes or machines,
+    backed by a single SQLite file.
+
+    A run is enqueued once with its config and the units its task planned (an MLM batch,
+    a doc-retrieval query, ...). A worker leases a unit for `lease_seconds`, extends the lease
+    while it works, and acks the unit when its records are on disk. A unit whose lease ran
+    out, because its worker died or hung, goes back to other workers; after `max_attempts`
+    leases it is marked failed. Every worker needs the file on a filesystem with working
+    locks (a local disk or a share that supports them).
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 600.0, max_attempts: int = 3):
+        """
+        Args:
+            path: Path of the SQLite database file. Parent folders are created if needed.
+            lease_seconds: How long a leased unit stays with its worker without an extension.
+            max_attempts: Leases of a unit before it is marked failed.
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, int(max_attempts))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "run_id TEXT PRIMARY KEY, pipeline_str TEXT NOT NULL, config TEXT NOT NULL, "
+            "output_path TEXT NOT NULL, output_format TEXT NOT NULL, target_records INTEGER NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS units ("
+            "unit_id TEXT PRIMARY KEY, run_id TEXT NOT NULL, seq INTEGER NOT NULL, payload TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, owner TEXT, "
+            "lease_expires REAL, records INTEGER, error TEXT, updated REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS units_status ON units (run_id, status, seq)")
+
+    @classmethod
+    def from_config(cls, queue_cfg: Optional[Dict[str, Any]], path: Optional[str] = None) -> "WorkQueue":
+        """
+        Opens the queue described by the `queue` config section.
+
+        Args:
+            queue_cfg: The section, with `path`, `lease_seconds` and `max_attempts`.
+            path: Queue file overriding `queue.path`.
+
+        Returns:
+            WorkQueue: The opened queue.
+        """
+        queue_cfg = queue_cfg or {}
+        return cls(
+            path or queue_cfg.get("path", "output/queue.sqlite"),
+            lease_seconds=queue_cfg.get("lease_seconds", 600),
+            max_attempts=queue_cfg.get("max_attempts", 3),
+        )
+
+    def _transaction(self, statements):
+        """
+        Runs `statements(conn)` in an immediate transaction, so no other process can lease
+        between its reads and writes. Must be called with the lock held.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(self._conn)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return result
+
+    def add_run(self, run_id: str, pipeline_str: str, config: Dict[str, Any], output_path: str, output_format: str, target_records: int, units: Iterable[Dict[str, Any]]) -> int:
+        """
+        Enqueues a run and its units.
+
+        Args:
+            run_id: Id of the run; unit ids are `<run_id>-<seq>`.
+            pipeline_str: The 'task:provider:model' string the run was built from.
+            config: The run's config, which workers build their task from. It is stored
+                without credentials; workers bring their own.
+            output_path: Where the merged output is written.
+            output_format: Format of the merged output.
+            target_records: Records the merged output is capped at.
+            units: JSON-serializable unit payloads, in the order they should be worked on.
+
+        Returns:
+            int: Number of units enqueued.
+        """
+        now = time.time()
+        rows = [(f"{run_id}-{seq:06d}", run_id, seq, json.dumps(unit, ensure_ascii=False), now) for seq, unit in enumerate(units)]
+
+        def statements(conn):
+            conn.execute(
+                "INSERT INTO runs (run_id, pipeline_str, config, output_path, output_format, target_records, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, pipeline_str, json.dumps(strip_credentials(config), ensure_ascii=False), output_path, output_format, target_records, now),
+            )
+            conn.executemany("INSERT INTO units (unit_id, run_id, seq, payload, updated) VALUES (?, ?, ?, ?, ?)", rows)
+
+        with self._lock:
+            self._transaction(statements)
+        return len(rows)
+
+    def get_run(self, run_id: str) -> Dict[str, Any]:
+        """
+        Returns the stored run: `run_id`, `pipeline_str`, `config`, `output_path`, `output_format`
+        and `target_records`.
+
+        Raises:
+            KeyError: If the run was never enqueued.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, pipeline_str, config, output_path, output_format, target_records FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Run '{run_id}' is not in the queue at {self.path}.")
+        return {
+            "run_id": row[0],
+            "pipeline_str": row[1],
+            "config": json.loads(row[2]),
+            "output_path": row[3],
+            "output_format": row[4],
+            "target_records": row[5],
+        }
+
+    def lease(self, owner: str, run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Leases the next pending unit, or one whose lease expired, to `owner`.
+        Expired units that used up their attempts are marked failed instead.
+
+        Args:
+            owner: Id of the leasing worker.
+            run_id: Only lease units of this run.
+
+        Returns:
+            Optional[Dict[str, Any]]: The unit (`unit_id`, `run_id`, `payload`, `attempts`), or None
+                if no unit is available right now.
+        """
+        run_filter = "AND run_id = ?" if run_id else ""
+        run_args = (run_id,) if run_id else ()
+
+        def statements(conn):
+            now = time.time()
+            conn.execute(
+                f"UPDATE units SET status = 'failed', owner = NULL, error = 'lease expired', updated = ? "
+                f"WHERE status = 'leased' AND lease_expires < ? AND attempts >= ? {run_filter}",
+                (now, now, self.max_attempts, *run_args),
+            )
+            row = conn.execute(
+                f"SELECT unit_id, run_id, payload, attempts FROM units "
+                f"WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) {run_filter} "
+                f"ORDER BY run_id, seq LIMIT 1",
+                (now, *run_args),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE units SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1, updated = ? WHERE unit_id = ?",
+                (owner, now + self.lease_seconds, now, row[0]),
+            )
+            return {"unit_id": row[0], "run_id": row[1], "payload": json.loads(row[2]), "attempts": row[3] + 1}
+
+        with self._lock:
+            return self._transaction(statements)
+
+    def extend(self, unit_id: str, owner: str) -> bool:
+        """
+        Renews the lease of a unit that `owner` is still working on.
+
+        Returns:
+            bool: False if the lease was lost, i.e. the unit expired and was leased again.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE units SET lease_expires = ?, updated = ? WHERE unit_id = ? AND owner = ? AND status = 'leased'",
+                (now + self.lease_seconds, now, unit_id, owner),
+            )
+            return cursor.rowcount > 0
+
+    def ack(self, unit_id: str, owner: str, records: int) -> bool:
+        """
+        Marks a unit done once its records were written.
+        A unit finished after its lease was lost is still accepted; whichever worker writes its
+        output last wins, and both outputs are equivalent.
+
+        Returns:
+            bool: False if the unit was leased to another worker in the meantime.
+        """
+        now = time.time()
+        with self._lock:
+            owned = self._conn.execute("SELECT owner = ? FROM units WHERE unit_id = ?", (owner, unit_id)).fetchone()
+            self._conn.execute(
+                "UPDATE units SET status = 'done', owner = NULL, lease_expires = NULL, records = ?, error = NULL, updated = ? WHERE unit_id = ?",
+                (records, now, unit_id),
+            )
+        return bool(owned and owned[0])
+
+    def nack(self, unit_id: str, owner: str, error: str) -> None:
+        """
+        Returns a unit that failed to the queue, or marks it failed after `max_attempts` leases.
+        Ignored if the unit is no longer leased to `owner`.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, lease_expires = NULL, error = ?, updated = ? WHERE unit_id = ? AND owner = ? AND status = 'leased'",
+                (self.max_attempts, error, now, unit_id, owner),
+            )
+
+    def counts(self, run_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Returns the number of units per status (`pending`, `leased`, `done`, `failed`).
+        """
+        query = "SELECT status, COUNT(*) FROM units" + (" WHERE run_id = ?" if run_id else "") + " GROUP BY status"
+        with self._lock:
+            rows = self._conn.execute(query, (run_id,) if run_id else ()).fetchall()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def done_units(self, run_id: str) -> List[str]:
+        """Returns the ids of the run's finished units, in planned order."""
+        with self._lock:
+            rows = self._conn.execute("SELECT unit_id FROM units WHERE run_id = ? AND status = 'done' ORDER BY seq", (run_id,)).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __repr__(self):
+        return f"WorkQueue(path={self.path}, lease_seconds={self.lease_seconds}, max_attempts={self.max_attempts})"
@@ -0,0 +1,28 @@
+from typing import Any, Optional, Tuple
+from src.core.base_llm import BaseLLM
+
+
+class WrappedLLM(BaseLLM):
+    """
+    Base class for wrappers that add behaviour around another BaseLLM, such as caching
+    or deadlines. Attributes not defined by the wrapper are delegated to the wrapped model,
+    and so is deciding which errors are retryable.
+    """
+
+    record_metrics = False  # Calls that reach the wrapped model are recorded there
+
+    def __init__(self, model: BaseLLM):
+        """
+        :param model: The wrapped model.
+        """
+        self.model = model
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when normal lookup fails, e.g. provider_name or model_name
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def classify_error(self, error: BaseException) -> Tuple[bool, Optional[float]]:
+        """Errors come from the wrapped model, so it decides which ones are retryable."""
+        return self.model.classify_error(error)
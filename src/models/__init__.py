@@ -1,2 +1,19 @@
-from .hf_llm import HFLLM
-from .google_llm import GoogleLLM
\ No newline at end of file
+import importlib
+
+# Providers are imported on first access, so importing the package does not load every provider SDK
+_LAZY_IMPORTS = {
+    "HFLLM": ".hf_llm",
+    "GoogleLLM": ".google_llm",
+    "MockLLM": ".mock_llm",
+    "PoolLLM": ".pool_llm",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_IMPORTS])
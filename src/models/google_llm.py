@@ -1,5 +1,6 @@
 from src.core import BaseLLM, AutoModel
-from typing import Optional, List, Dict, Any
+from src.utils.retry import parse_delay
+from typing import Optional, List, Dict, Any, Tuple
 import os
 
 @AutoModel.register("google")
@@ -8,15 +9,18 @@ class GoogleLLM(BaseLLM):
     A class to interact with Google LLMs (Vertex AI Gemini) using either service account or API key.
     """
 
-    def __init__(self, model_name: str, api_key: Optional[str] = None, service_account_json: Optional[str] = None):
+    def __init__(self, model_name: str, api_key: Optional[str] = None, service_account_json: Optional[str] = None, timeout: Optional[float] = None):
         """
         Initialize the GoogleLLM with a model name and either an API key or a service account JSON key.
 
         :param model_name: The name of the Google model.
         :param api_key: Optional API key for authentication.
         :param service_account_json: Optional path to service account JSON key.
+        :param timeout: Optional seconds after which a request is aborted. Only the API key client
+            supports it; with a service account, use `model.deadline` to bound calls.
         """
         self.model_name = model_name
+        self.timeout = timeout
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         self.service_account_json = service_account_json or os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
@@ -34,11 +38,20 @@ class GoogleLLM(BaseLLM):
         elif self.api_key:
             # API key authentication
             from google import genai
-            self.client = genai.Client(api_key=self.api_key)
+            http_options = {"timeout": int(timeout * 1000)} if timeout else None  # milliseconds
+            self.client = genai.Client(api_key=self.api_key, http_options=http_options)
             self._mode = "api_key"
         else:
             raise ValueError("Either service_account_json or api_key must be provided.")
 
+    @staticmethod
+    def _build_prompt(messages: List[Dict[Any, Any]]) -> str:
+        """
+        Flatten chat messages into a single prompt string.
+        Assume messages is a list of dicts with 'content' keys.
+        """
+        return "\n".join([msg.get("content", "") for msg in messages])
+
     def generate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
         """
         Generate a response from the model based on the given prompt.
@@ -47,19 +60,59 @@ class GoogleLLM(BaseLLM):
         :param kwargs: Additional arguments for the model.
         :return: The generated response as a string.
         """
+        prompt = self._build_prompt(messages)
         if self._mode == "service_account":
             # For Vertex AI GenerativeModel
-            # Assume messages is a list of dicts with 'content' keys
-            prompt = "\n".join([msg.get("content", "") for msg in messages])
             response = self.client.generate_content(prompt, **kwargs)
-            return response.text if hasattr(response, "text") else str(response)
         elif self._mode == "api_key":
             # For genai.Client
-            prompt = "\n".join([msg.get("content", "") for msg in messages])
-            response = self.client.generate_content(model=self.model_name, prompt=prompt, **kwargs)
-            return response.text if hasattr(response, "text") else str(response)
+            response = self.client.models.generate_content(model=self.model_name, contents=prompt, **kwargs)
         else:
             raise RuntimeError("Client not initialized properly.")
+        return response.text if hasattr(response, "text") else str(response)
+
+    async def agenerate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Asynchronously generate a response using the native async API of the active client.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model.
+        :return: The generated response as a string.
+        """
+        prompt = self._build_prompt(messages)
+        if self._mode == "service_account":
+            response = await self.client.generate_content_async(prompt, **kwargs)
+        elif self._mode == "api_key":
+            response = await self.client.aio.models.generate_content(model=self.model_name, contents=prompt, **kwargs)
+        else:
+            raise RuntimeError("Client not initialized properly.")
+        return response.text if hasattr(response, "text") else str(response)
+
+    def classify_error(self, error: BaseException) -> Tuple[bool, Optional[float]]:
+        """
+        Like `BaseLLM.classify_error`, but also reads the `retryDelay` Google puts in the
+        RetryInfo details of quota errors, as they carry no Retry-After header.
+
+        :param error: The exception raised by `generate_response`.
+        :return: Whether the call is worth retrying, and the server-requested delay in seconds, if any.
+        """
+        retryable, delay = super().classify_error(error)
+        if retryable and delay is None:
+            delay = parse_delay(self._find_retry_delay(getattr(error, "details", None)))
+        return retryable, delay
+
+    @classmethod
+    def _find_retry_delay(cls, details: Any) -> Optional[str]:
+        if isinstance(details, dict):
+            if "retryDelay" in details:
+                return details["retryDelay"]
+            details = list(details.values())
+        if isinstance(details, list):
+            for item in details:
+                found = cls._find_retry_delay(item)
+                if found is not None:
+                    return found
+        return None
 
     def __repr__(self):
         return f"GoogleLLM(model_name={self.model_name}, mode={self._mode})"
@@ -1,6 +1,6 @@
 from src.core import BaseLLM, AutoModel
 from typing import Optional, List, Dict, Any
-from huggingface_hub import InferenceClient
+from huggingface_hub import InferenceClient, AsyncInferenceClient
 import os
 
 @AutoModel.register("hf")
@@ -9,16 +9,19 @@ class HFLLM(BaseLLM):
     A class to interact with Hugging Face models using the Inference API.
     """
 
-    def __init__(self, model_name: str, api_key: Optional[str] = None):
+    def __init__(self, model_name: str, api_key: Optional[str] = None, timeout: Optional[float] = None):
         """
         Initialize the HFLLM with a model name and optional API key.
 
         :param model_name: The name of the Hugging Face model.
         :param api_key: Optional API key for authentication.
+        :param timeout: Optional seconds after which a request is aborted.
         """
         self.model_name = model_name
         self.api_key = api_key or os.getenv("HUGGINGFACEHUB_API_TOKEN")
-        self.client = InferenceClient(model=model_name, token=self.api_key)
+        self.timeout = timeout
+        self.client = InferenceClient(model=model_name, token=self.api_key, timeout=timeout)
+        self.async_client = AsyncInferenceClient(model=model_name, token=self.api_key, timeout=timeout)
 
     def generate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
         """
@@ -36,6 +39,22 @@ class HFLLM(BaseLLM):
         )
         
         return completion.choices[0].message.content
+
+    async def agenerate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Asynchronously generate a response using the async Inference API client.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model.
+        :return: The generated response as a string.
+        """
+        completion = await self.async_client.chat_completion(
+            messages = messages,
+            model = self.model_name,
+            **kwargs
+        )
+
+        return completion.choices[0].message.content
     
     def __repr__(self):
         return f"HFLLM(model_name={self.model_name})"
\ No newline at end of file
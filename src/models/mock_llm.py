@@ -0,0 +1,142 @@
+from src.core import BaseLLM, AutoModel
+from src.prompts.mlm_prompts import MLM_SYS_PROMPT
+from src.prompts.doc_retrieval_prompts import DOC_RET_SYS_PROMPT_Q, DOC_RET_SYS_PROMPT_D
+from typing import Optional, List, Dict, Any, Union
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+
+_WORDS = (
+    "market policy energy climate health research network system model data customer service "
+    "product design quality security finance budget growth risk strategy software hardware cloud "
+    "platform storage analysis report study science method process team project planning supply "
+    "chain logistics retail banking insurance travel education student teacher hospital patient "
+    "treatment vaccine engine vehicle battery solar wind water city transport housing law court"
+).split()
+
+
+@AutoModel.register("mock")
+class MockLLM(BaseLLM):
+    """
+    Simulated provider for offline benchmarks and tests.
+
+    Answers the MLM and document retrieval prompts with well-formed JSON after a simulated
+    latency, and can inject errors and truncated responses at configurable rates.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "mock",
+        latency: Union[float, Dict[str, Any]] = 0.0,
+        error_rate: float = 0.0,
+        truncation_rate: float = 0.0,
+        documents_per_page: int = 3,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the mock provider.
+
+        :param model_name: Reported model name.
+        :param latency: Seconds per call, or a distribution: `{"distribution": "constant", "mean": s}`,
+            `{"distribution": "uniform", "min": s, "max": s}` or `{"distribution": "lognormal", "mean": s, "sigma": x}`.
+        :param error_rate: Probability that a call raises `RuntimeError`.
+        :param truncation_rate: Probability that a response is cut off mid-way.
+        :param documents_per_page: Query-document pairs returned per document retrieval prompt.
+        :param seed: Seed for latencies, errors, truncation and generated text.
+        """
+        self.model_name = model_name
+        self.latency = latency if isinstance(latency, dict) else {"distribution": "constant", "mean": float(latency)}
+        self.error_rate = error_rate
+        self.truncation_rate = truncation_rate
+        self.documents_per_page = documents_per_page
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def sample_latency(self) -> float:
+        """Draws the simulated latency of one call, in seconds."""
+        distribution = self.latency.get("distribution", "constant")
+        with self._lock:
+            if distribution == "constant":
+                return float(self.latency.get("mean", 0.0))
+            if distribution == "uniform":
+                return self._rng.uniform(self.latency.get("min", 0.0), self.latency.get("max", 0.0))
+            if distribution == "lognormal":
+                mean = self.latency.get("mean", 0.0)
+                if mean <= 0:
+                    return 0.0
+                sigma = self.latency.get("sigma", 0.5)
+                # Parameterised so that the distribution's mean is `mean`
+                return self._rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        raise ValueError(f"Unsupported latency distribution: {distribution}")
+
+    def _sentence(self) -> str:
+        with self._lock:
+            self._counter += 1
+            words = self._rng.sample(_WORDS, 10)
+            n = self._counter
+        return f"Item {n} explains how {' '.join(words[:5])} affects {' '.join(words[5:])} today."
+
+    def respond(self, messages: List[Dict[Any, Any]]) -> str:
+        """
+        Builds the response for a prompt without any latency or failure injection.
+
+        :param messages: The input prompt.
+        :return: A JSON response in the format the prompt asks for.
+        """
+        system = next((m.get("content", "") for m in messages if m.get("role") == "system"), "")
+        user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        if system == DOC_RET_SYS_PROMPT_D:
+            items = [
+                {"query": f"What does {self._sentence().lower().rstrip('.')} mean?", "document": f"{self._sentence()} {self._sentence()}"}
+                for _ in range(self.documents_per_page)
+            ]
+            return f"```json\n{json.dumps(items, indent=2)}\n```"
+        match = re.search(r"Generate (\d+)", user)
+        count = int(match.group(1)) if match else 10
+        if system in (MLM_SYS_PROMPT, DOC_RET_SYS_PROMPT_Q):
+            return json.dumps([self._sentence() for _ in range(count)], indent=2)
+        return f"Mock response to: {user[:200]}"
+
+    def _outcome(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"error": self._rng.random() < self.error_rate, "truncate": self._rng.random() < self.truncation_rate, "cut": self._rng.random()}
+
+    def _finish(self, messages: List[Dict[Any, Any]], outcome: Dict[str, Any]) -> str:
+        if outcome["error"]:
+            raise RuntimeError("Simulated provider error")
+        response = self.respond(messages)
+        if outcome["truncate"]:
+            response = response[: max(1, int(len(response) * outcome["cut"]))]
+        return response
+
+    def generate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Return a simulated response after the simulated latency.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Ignored.
+        :return: The generated response as a string.
+        """
+        outcome = self._outcome()
+        time.sleep(self.sample_latency())
+        return self._finish(messages, outcome)
+
+    async def agenerate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Async counterpart of `generate_response`; waits without blocking the event loop.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Ignored.
+        :return: The generated response as a string.
+        """
+        outcome = self._outcome()
+        await asyncio.sleep(self.sample_latency())
+        return self._finish(messages, outcome)
+
+    def __repr__(self):
+        return f"MockLLM(model_name={self.model_name}, latency={self.latency}, error_rate={self.error_rate}, truncation_rate={self.truncation_rate})"
@@ -0,0 +1,215 @@
+from src.core import BaseLLM, AutoModel
+from src.utils.color_logger import get_color_logger
+from src.utils.metrics import REGISTRY
+from typing import Optional, List, Dict, Any
+import random
+import threading
+import time
+
+logger = get_color_logger()
+
+
+class Backend:
+    """One endpoint of a `PoolLLM`: the model plus its weight, load and health."""
+
+    def __init__(self, name: str, model: BaseLLM, weight: float = 1.0):
+        if weight <= 0:
+            raise ValueError(f"Backend '{name}' weight must be positive, got {weight}")
+        self.name = name
+        self.model = model
+        self.weight = float(weight)
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+    def __repr__(self):
+        return f"Backend(name={self.name}, model={self.model!r}, weight={self.weight})"
+
+
+@AutoModel.register("pool")
+class PoolLLM(BaseLLM):
+    """
+    Spreads requests over several backends (API keys, regions or providers) configured
+    under `model.backends`.
+
+    Each request goes to the healthy backend with the fewest outstanding requests relative
+    to its weight. A backend that fails `max_failures` times in a row is taken out of
+    rotation for `cooldown` seconds, doubling on every further failure up to `max_cooldown`.
+    A failed request is retried on the next best backend it has not tried yet, so one
+    failing endpoint does not fail the request. Every backend keeps its own rate limiter.
+    """
+
+    record_metrics = False  # Calls are recorded by the backend that serves them
+    stats_label = "Provider pool"
+
+    def __init__(
+        self,
+        model_name: str = "pool",
+        backends: Optional[List[Dict[str, Any]]] = None,
+        max_failures: int = 3,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0,
+        max_attempts: Optional[int] = None,
+    ):
+        """
+        Initialize the pool and its backends.
+
+        :param model_name: Name of the pool, used in logs and as the default limiter key prefix.
+        :param backends: One dict per backend with `provider`, `model_name` and optional `name`,
+            `weight` (default 1), `rate_limit` and provider arguments such as `api_key`.
+            A backend's `rate_limit` is its own unless it sets a shared `key`.
+        :param max_failures: Consecutive failures after which a backend is taken out of rotation.
+        :param cooldown: Seconds an unhealthy backend is skipped for.
+        :param max_cooldown: Upper bound of the doubling cooldown.
+        :param max_attempts: Backends tried per request before giving up. Defaults to all of them.
+        """
+        if not backends:
+            raise ValueError("The pool provider needs at least one entry in model.backends.")
+        self.model_name = model_name
+        self.max_failures = max(1, int(max_failures))
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.backends = [self._build_backend(i, dict(cfg)) for i, cfg in enumerate(backends)]
+        names = [backend.name for backend in self.backends]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Backend names must be unique, got {names}")
+        self.max_attempts = min(len(self.backends), max_attempts or len(self.backends))
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+
+    def _build_backend(self, index: int, cfg: Dict[str, Any]) -> Backend:
+        provider = cfg.pop("provider", None)
+        model_name = cfg.pop("model_name", None)
+        if not provider or not model_name:
+            raise ValueError(f"Backend {index} of pool '{self.model_name}' needs a provider and a model_name.")
+        name = cfg.pop("name", f"{provider}-{index}")
+        weight = cfg.pop("weight", 1.0)
+        rate_limit = cfg.pop("rate_limit", None)
+        if rate_limit:
+            # Without an explicit key every backend gets its own quota, even for the same provider
+            rate_limit = dict(rate_limit)
+            rate_limit.setdefault("key", f"{self.model_name}:{name}")
+        model = AutoModel.get_model(f"{provider}:{model_name}", rate_limit=rate_limit, **cfg)
+        return Backend(name, model, weight)
+
+    def _acquire(self, tried: set) -> Optional[Backend]:
+        """Picks the backend for the next attempt and counts the request as outstanding on it."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends if b.name not in tried]
+            if not candidates:
+                return None
+            healthy = [b for b in candidates if b.healthy(now)]
+            if healthy:
+                best = min((b.outstanding + 1) / b.weight for b in healthy)
+                backend = self._rng.choice([b for b in healthy if (b.outstanding + 1) / b.weight == best])
+            else:
+                # Everything is cooling down: use the backend that recovers first rather than fail
+                backend = min(candidates, key=lambda b: b.unhealthy_until)
+            backend.outstanding += 1
+            backend.requests += 1
+            return backend
+
+    def _release(self, backend: Backend, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            backend.outstanding -= 1
+            if error is None:
+                backend.consecutive_failures = 0
+                backend.unhealthy_until = 0.0
+                outcome = "success"
+            else:
+                backend.failures += 1
+                backend.consecutive_failures += 1
+                excess = backend.consecutive_failures - self.max_failures
+                if excess >= 0:
+                    backoff = min(self.max_cooldown, self.cooldown * 2 ** excess)
+                    backend.unhealthy_until = time.monotonic() + backoff
+                    logger.warning(f"Backend '{backend.name}' failed {backend.consecutive_failures} times in a row; pausing it for {backoff:.0f}s.")
+                outcome = "failure"
+        REGISTRY.counter("datagen_pool_requests_total", "Requests served by each pool backend, by outcome.").inc(
+            pool=self.model_name, backend=backend.name, outcome=outcome
+        )
+
+    def _failover(self, backend: Backend, error: Exception, attempt: int) -> None:
+        if attempt + 1 < self.max_attempts:
+            logger.warning(f"Backend '{backend.name}' failed: {error}. Failing over.")
+            REGISTRY.counter("datagen_pool_failovers_total", "Requests retried on another pool backend.").inc(
+                pool=self.model_name, backend=backend.name
+            )
+
+    def generate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Generate a response on the least loaded healthy backend, failing over on errors.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model.
+        :return: The generated response as a string.
+        """
+        tried = set()
+        last_error = None
+        for attempt in range(self.max_attempts):
+            backend = self._acquire(tried)
+            if backend is None:
+                break
+            tried.add(backend.name)
+            try:
+                response = backend.model.generate_response(messages, **kwargs)
+            except Exception as e:
+                self._release(backend, e)
+                self._failover(backend, e, attempt)
+                last_error = e
+                continue
+            self._release(backend)
+            return response
+        raise last_error
+
+    async def agenerate_response(self, messages: List[Dict[Any, Any]], **kwargs) -> str:
+        """
+        Async counterpart of `generate_response`.
+
+        :param messages: The input prompt for the model.
+        :param kwargs: Additional arguments for the model.
+        :return: The generated response as a string.
+        """
+        tried = set()
+        last_error = None
+        for attempt in range(self.max_attempts):
+            backend = self._acquire(tried)
+            if backend is None:
+                break
+            tried.add(backend.name)
+            try:
+                response = await backend.model.agenerate_response(messages, **kwargs)
+            except Exception as e:
+                self._release(backend, e)
+                self._failover(backend, e, attempt)
+                last_error = e
+                continue
+            self._release(backend)
+            return response
+        raise last_error
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: Per backend: weight, outstanding requests, totals and whether it is in rotation.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                b.name: {
+                    "weight": b.weight,
+                    "outstanding": b.outstanding,
+                    "requests": b.requests,
+                    "failures": b.failures,
+                    "healthy": b.healthy(now),
+                }
+                for b in self.backends
+            }
+
+    def __repr__(self):
+        return f"PoolLLM(model_name={self.model_name}, backends={[b.name for b in self.backends]})"
@@ -1,2 +1,17 @@
-from .mlm_task import MLMTask
-from .doc_retrieval_task import DocumentRetrievalTask
\ No newline at end of file
+import importlib
+
+# Tasks are imported on first access, so importing the package only loads the task that is used
+_LAZY_IMPORTS = {
+    "MLMTask": ".mlm_task",
+    "DocumentRetrievalTask": ".doc_retrieval_task",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_IMPORTS])
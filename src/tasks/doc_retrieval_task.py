@@ -5,9 +5,10 @@ if TYPE_CHECKING:
 
 import random
 import json
+import threading
+import time
 from math import ceil
-from typing import List, Dict
-from duckduckgo_search import DDGS
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple, Union
 from src.prompts.doc_retrieval_prompts import (
     DOC_RET_SYS_PROMPT_Q, 
     DOC_RET_USER_PROMPT_Q,
@@ -15,9 +16,15 @@ from src.prompts.doc_retrieval_prompts import (
     DOC_RET_USER_PROMPT_D
     )
 from src.core import BaseTask, AutoTask
+from src.core.stages import Stage, StagePipeline
 from src.utils.color_logger import get_color_logger
-from src.utils.utils import backoff_retry, fetch_and_parse, extract_json_from_markdown
+from src.utils.utils import backoff_retry
+from src.utils.parsing import parse_json_array
+from src.utils.fetcher import PageFetcher
+from src.utils.web_search import WebSearcher, deduplicate_urls
 from src.utils.data_saver import save_data
+from src.utils.dedup import DedupIndex
+from src.utils.batch_sizer import AdaptiveBatchSizer
 
 logger = get_color_logger(name=__name__, level="DEBUG")
 
@@ -25,43 +32,103 @@ logger = get_color_logger(name=__name__, level="DEBUG")
 class DocumentRetrievalTask(BaseTask):
     """
     Task for generating Document Retrieval data.
+
+    Query generation, web search, page fetching and document generation run as overlapping
+    stages connected by bounded queues: each query is searched as soon as it is generated,
+    each page is fetched as soon as it is found, and each page is sent to the LLM as soon as it is fetched.
     """
 
-    def __init__(self, model: "BaseLLM", domain: str, num_records: int, save_intermediate_results: bool = False):
+    output_schema = {"query": "string", "document": "string"}
+    dedup_field = "document"
+
+    def __init__(
+        self,
+        model: "BaseLLM",
+        domain: str,
+        num_records: int,
+        save_intermediate_results: bool = False,
+        concurrency: int = 4,
+        queue_size: int = 16,
+        fetch: Optional[Dict] = None,
+        search: Optional[Dict] = None,
+        dedup: Union[bool, Dict, None] = None,
+        batch: Union[int, Dict, None] = None,
+    ):
+        """
+        Args:
+            model (BaseLLM): The LLM used for query and document generation.
+            domain (str): The domain for which data is to be generated.
+            num_records (int): The number of records to generate.
+            save_intermediate_results (bool): Save generated queries and web results to disk.
+            concurrency (int): Number of document-generation LLM requests in flight.
+            queue_size (int): Capacity of the queues between stages.
+            fetch (Optional[Dict]): Page fetcher settings (`concurrency`, `per_host`, `timeout`, `user_agent`, `cache`).
+            search (Optional[Dict]): Web search settings (`concurrency`, `max_results`, `cache`).
+            dedup (Union[bool, Dict, None]): Settings of the query dedup index, or False to keep duplicate queries.
+            batch (Union[int, Dict, None]): Fixed number of queries per request, or adaptive batch size settings.
+        """
         super().__init__(model, domain, num_records)
         self.save_intermediate_results = save_intermediate_results
         self.max_retries = 3
-        self.batch_size = 50
-        self.web_search_engine = DDGS()
+        self.batch_sizer = AdaptiveBatchSizer.from_config(batch)
+        self.concurrency = max(1, int(concurrency))
+        self.queue_size = queue_size
+        self.searcher = WebSearcher(**{"max_retries": self.max_retries, **(search or {})}, logger=logger)
+        self.fetcher = PageFetcher(**(fetch or {}))
+        self.dedup: Optional[DedupIndex] = DedupIndex.from_config(dedup)
+        # Maximum consecutive query batches without a single new query before giving up
+        self.max_stale_batches = 5
+        # Set once every query has been generated / searched
+        self.intermediate_queries = None
+        self.intermediate_queries_web = None
+        # Progress of every stage, kept for checkpoint/resume
+        self._queries: List[str] = []
+        self._web_results: Dict[str, List[Dict]] = {}
+        self._seen_urls = set()
+        self._outer_loop = 0
+        self._processed_queries = set()
+        self._lock = threading.Lock()
 
-    def _generate_search_queries(self) -> List[Dict]:
+    def _iter_search_queries(self) -> Iterator[str]:
         """
         Generates intermediate search queries for Document Retrieval data using the provided LLM model.
+        Queries restored from a checkpoint are yielded first, and each new batch is yielded as soon as it is parsed.
+        Duplicate and near-duplicate queries are dropped and replaced by further requests.
 
-        Returns:
-            List[Dict]: List of structured data samples, each as a dictionary.
+        Yields:
+            str: A search query.
+
+        Raises:
+            RuntimeError: If an LLM call still fails after its retries.
         """
-        results = []
+        with self._lock:
+            results = list(self._queries)
+        if self.dedup is not None:
+            self.dedup.filter(results)
+        yield from results
         total = ceil(self.num_records / 2)
-        generated = 0
+        generated = len(results)
+        stale_batches = 0
+        batch_no = 0
 
-        while generated < total:
-            current_batch_size = min(self.batch_size, total - generated)
+        while generated < total and stale_batches < self.max_stale_batches:
+            current_batch_size = min(self.batch_sizer.size(), total - generated)
+            batch_no += 1
             sentences = []
+            prompt = [
+                {
+                    "role": "system",
+                    "content": DOC_RET_SYS_PROMPT_Q,
+                },
+                {
+                    "role": "user",
+                    "content": DOC_RET_USER_PROMPT_Q.replace("{{num_records}}", str(current_batch_size)).replace("{{domain}}", self.domain),
+                }
+            ]
+            # Failed calls are retried by backoff_retry; this loop only re-asks after unusable responses
             for attempt in range(self.max_retries):
-                prompt = [
-                    {
-                        "role": "system",
-                        "content": DOC_RET_SYS_PROMPT_Q,
-                    },
-                    {
-                        "role": "user",
-                        "content": DOC_RET_USER_PROMPT_Q.replace("{{num_records}}", str(current_batch_size)).replace("{{domain}}", self.domain),
-                    }
-                ]
-                logger.debug(f"Prompt (batch {generated // self.batch_size + 1}, attempt {attempt+1}):\n{json.dumps(prompt, indent=2)}")
-                def call_llm():
-                    return self.model.generate_response(prompt)
+                logger.debug(f"Prompt (batch {batch_no}, attempt {attempt+1}):\n{json.dumps(prompt, indent=2)}")
+                start = time.monotonic()
                 try:
                     response = backoff_retry(
                         self.model.generate_response,
@@ -71,17 +138,34 @@ class DocumentRetrievalTask(BaseTask):
                         exceptions=(Exception,),
                         logger=logger,
                         messages=prompt,
+                        cache=False,  # The prompt is the same for every batch
                     )
-                    logger.debug(f"Raw LLM response (batch {generated // self.batch_size + 1}, attempt {attempt+1}):\n{response}")
-                    batch_sentences = eval(response)
-                    if isinstance(batch_sentences, list) and all(isinstance(s, str) for s in batch_sentences):
-                        sentences = batch_sentences
-                        generated += len(sentences)
-                        results.extend(sentences)
-                        break
                 except Exception as e:
-                    logger.warning(f"Batch {generated // self.batch_size + 1}, attempt {attempt+1} failed: {e}")
-                    sentences = []
+                    # A provider outage fails the run, so it can be resumed, instead of counting as a stale batch
+                    raise RuntimeError(f"Query batch {batch_no} failed: {e}") from e
+                logger.debug(f"Raw LLM response (batch {batch_no}, attempt {attempt+1}):\n{response}")
+                result = parse_json_array(response, item_type=str)
+                self.batch_sizer.record(current_batch_size, len(result.items), result.complete, time.monotonic() - start)
+                if not result:
+                    logger.warning(f"Batch {batch_no}, attempt {attempt+1} failed: No JSON array of queries found in the response.")
+                    continue
+                if not result.complete:
+                    logger.info(f"Batch {batch_no}: salvaged {result.salvaged} queries from an incomplete response.")
+                sentences = result.items
+                if self.dedup is not None:
+                    sentences = self.dedup.filter(sentences)
+                generated += len(sentences)
+                results.extend(sentences)
+                with self._lock:
+                    self._queries.extend(sentences)
+                yield from sentences
+                break
+            stale_batches = 0 if sentences else stale_batches + 1
+        if generated < total:
+            logger.warning(f"{stale_batches} consecutive batches produced no new queries. Generated {generated} queries out of {total}.")
+        if self.dedup is not None:
+            logger.info(f"Query dedup: {self.dedup.stats()}")
+        logger.info(f"Query batch size: {self.batch_sizer.stats()}")
         self.intermediate_queries = results
         if self.save_intermediate_results:
             save_data(
@@ -93,41 +177,130 @@ class DocumentRetrievalTask(BaseTask):
             logger.info(f"Saved intermediate queries to intermediate_queries/intermediate_queries_{self.domain}.json")
         else:
             logger.info("Intermediate queries not saved.")
-        return results
-    
-    def _get_search_queries_web(self, intermediate_queries: List[Dict]) -> List[Dict]:
+        logger.info(f"Generated {len(results)} search queries.")
+
+    def _generate_search_queries(self) -> List[str]:
+        """
+        Generates all intermediate search queries before returning them.
+
+        Returns:
+            List[str]: The generated search queries.
+        """
+        return list(self._iter_search_queries())
+
+    def _search(self, query: str) -> List[Dict]:
         """
-        This method does web search for inter mediate queries.
+        Search stage: looks up a query on the web, keeping only URLs not already found for another query.
+
         Args:
-            intermediate_queries (List[Dict]): List of intermediate queries.
+            query (str): The search query.
+
         Returns:
-            List[Dict]: List of structured data samples, each as a dictionary.
+            List[Dict]: A single `{"query", "results"}` item for the fetch stage.
+        """
+        with self._lock:
+            cached = self._web_results.get(query)
+        if cached is not None:
+            return [{"query": query, "results": cached}]
+        try:
+            search_results = self.searcher.search(query)
+        except Exception as e:
+            logger.error(f"Error during web search for query '{query}': {e}")
+            search_results = []
+        with self._lock:
+            web_rel = deduplicate_urls([{"query": query, "results": search_results}], seen=self._seen_urls)[0]
+            self._web_results[query] = web_rel["results"]
+        return [web_rel]
+
+    def _fetch(self, web_rel: Dict) -> List[Tuple[Dict, str]]:
         """
-        results = []
-        for query in intermediate_queries:
+        Fetch stage: downloads the search results of a query in order and extracts the main text
+        of the first page that yields any, so a blocked or empty page falls back to the next result.
+
+        Args:
+            web_rel (Dict): A `{"query", "results"}` item from the search stage.
+
+        Returns:
+            List[Tuple[Dict, str]]: The item, narrowed to the result that was used, with its page text,
+            or nothing if no page is usable.
+        """
+        query = web_rel.get("query")
+        web_content = web_rel.get("results", [])
+        if not web_content:
+            logger.warning(f"No content found for query '{query}'.")
+            return []
+        for result in web_content:
+            url = result.get("href", "")
+            if not url:
+                continue
+            main_text = self.fetcher.fetch(url)
+            if main_text:
+                return [({**web_rel, "results": [result]}, main_text)]
+            logger.warning(f"No main text found for URL '{url}' in query '{query}'.")
+        logger.warning(f"None of the {len(web_content)} search results of query '{query}' gave usable text.")
+        return []
+
+    def _document_prompt(self, page: Tuple[Dict, str]) -> List[Dict[str, str]]:
+        web_rel, main_text = page
+        body = web_rel["results"][0].get("body", "")
+        bodymain_text = f"{body}\n\n{main_text}"
+        return [
+            {
+                "role": "system",
+                "content": DOC_RET_SYS_PROMPT_D,
+            },
+            {
+                "role": "user",
+                "content": DOC_RET_USER_PROMPT_D.replace("{{WEB_CONTENT}}", bodymain_text),
+            }
+        ]
+
+    def _generate_documents(self, page: Tuple[Dict, str]) -> List[Tuple[str, List[Dict]]]:
+        """
+        Generation stage: turns a fetched page into query-document pairs with the LLM.
+
+        Args:
+            page (Tuple[Dict, str]): A search item and its page text from the fetch stage.
+
+        Returns:
+            List[Tuple[str, List[Dict]]]: The query and its generated records, or nothing if every attempt failed.
+        """
+        web_rel, _ = page
+        prompt = self._document_prompt(page)
+        logger.debug(f"Prompt for document retrieval:\n{json.dumps(prompt, indent=2)}")
+        # Failed calls are retried by backoff_retry; this loop only re-asks after unusable responses
+        for attempt in range(self.max_retries):
             try:
-                search_results=backoff_retry(
-                        self.web_search_engine.text,
-                        max_retries=self.max_retries,
-                        base_delay=1,
-                        max_delay=8,
-                        exceptions=(Exception,),
-                        logger=logger,
-                        keywords=query,
-                        max_results=1
-                    )
-                
-                results.append({
-                    "query": query,
-                    "results": search_results
-                })
+                response = backoff_retry(
+                    self.model.generate_response,
+                    max_retries=self.max_retries,
+                    base_delay=1,
+                    max_delay=8,
+                    exceptions=(Exception,),
+                    logger=logger,
+                    messages=prompt,
+                )
             except Exception as e:
-                logger.error(f"Error during web search for query '{query}': {e}")
-                results.append({
-                    "query": query,
-                    "results": []
-                })
+                logger.warning(f"Document retrieval failed for query '{web_rel.get('query')}': {e}")
+                return []
+            logger.debug(f"Raw LLM response (attempt {attempt+1}):\n{response}")
+            result = parse_json_array(response, item_type=dict)
+            if not result:
+                logger.warning(f"Attempt {attempt+1} failed for document retrieval for query '{web_rel.get('query')}': No JSON array of records found in the response.")
+                continue
+            if not result.complete:
+                logger.info(f"Salvaged {result.salvaged} records from an incomplete response for query '{web_rel.get('query')}'.")
+            return [(web_rel.get("query"), result.items)]
+        return []
+
+    def _save_web_results(self) -> None:
+        """Marks web search as complete once every query has been searched."""
+        with self._lock:
+            results = [{"query": query, "results": self._web_results.get(query, [])} for query in self.intermediate_queries]
         self.intermediate_queries_web = results
+        logger.info(f"Generated {len(results)} search queries with web search.")
+        if self.searcher.cache is not None:
+            logger.info(f"Search cache: {self.searcher.stats()}")
         if self.save_intermediate_results:
             save_data(
                 data=results,
@@ -138,90 +311,180 @@ class DocumentRetrievalTask(BaseTask):
             logger.info(f"Saved intermediate queries to intermediate_queries_web/intermediate_queries_web_{self.domain}.json")
         else:
             logger.info("Intermediate queries not saved.")
-        return results
-    
-    def _generate_document_retrieval_data(self, intermediate_web_results: List[Dict]) -> List[Dict]:
+
+    def iter_data(self) -> Iterator[Dict]:
         """
-        Generates Document Retrieval data using the provided LLM model.
+        Yields Document Retrieval records as soon as each page has been turned into query-document pairs.
 
-        Args:
-            intermediate_web_results (List[Dict]): List of intermediate web results.
+        The first pass streams queries through the search, fetch and generation stages. If it yields
+        fewer than `num_records` records, later passes prompt the already-searched pages again,
+        up to `max_outer_loops` passes in total.
 
-        Returns:
-            List[Dict]: List of structured data samples, each as a dictionary.
+        Yields:
+            Dict: A record with ``query`` and ``document`` keys.
         """
-        results = []
         generated = 0
         total = self.num_records
         max_outer_loops = 5  # Prevent infinite loop
-        outer_loops = 0
-        while generated < total and outer_loops < max_outer_loops:
-            for web_rel in intermediate_web_results:
-                if generated >= total:
-                    break
-                try:
-                    web_content = web_rel.get("results", [])
-                    if web_content:
-                        body = web_content[0].get("body", "")
-                        url = web_content[0].get("href", "")
-                        if not url:
-                            logger.warning(f"No URL found for query '{web_rel.get('query')}'.")
-                            continue
-                        main_text = fetch_and_parse(url)
-                        if main_text:
-                            bodymain_text = f"{body}\n\n{main_text}"
-                            prompt = [
-                                {
-                                    "role": "system",
-                                    "content": DOC_RET_SYS_PROMPT_D,
-                                },
-                                {
-                                    "role": "user",
-                                    "content": DOC_RET_USER_PROMPT_D.replace("{{WEB_CONTENT}}", bodymain_text),
-                                }
-                            ]
-                            logger.debug(f"Prompt for document retrieval:\n{json.dumps(prompt, indent=2)}")
-                            for attempt in range(self.max_retries):
-                                try:
-                                    def call_llm():
-                                        return self.model.generate_response(prompt)
-                                    response = backoff_retry(
-                                        self.model.generate_response,
-                                        max_retries=self.max_retries,
-                                        base_delay=1,
-                                        max_delay=8,
-                                        exceptions=(Exception,),
-                                        logger=logger,
-                                        messages=prompt,
-                                    )
-                                    logger.debug(f"Raw LLM response (attempt {attempt+1}):\n{response}")
-                                    response = extract_json_from_markdown(response)
-                                    if not response:
-                                        raise ValueError("No JSON found in the response.")
-                                    batch_results = response
-                                    if isinstance(batch_results, list):
-                                        results.extend(batch_results)
-                                        generated += len(batch_results)
-                                        break
-                                except Exception as e:
-                                    logger.warning(f"Attempt {attempt+1} failed for document retrieval for query '{web_rel.get('query')}': {e}")
-                                    continue
-                        else:
-                            logger.warning(f"No main text found for URL '{url}' in query '{web_rel.get('query')}'.")
-                            continue
-                    else:
-                        logger.warning(f"No content found for query '{web_rel.get('query')}'.")
-                        continue
-                except Exception as e:
-                    logger.error(f"Error during document retrieval for query '{web_rel.get('query')}': {e}")
-            outer_loops += 1
+        while generated < total and self._outer_loop < max_outer_loops:
+            stages = [
+                Stage("fetch", self._fetch, self.fetcher.concurrency),
+                Stage("generate", self._generate_documents, self.concurrency),
+            ]
+            first_pass = self.intermediate_queries_web is None
+            if first_pass:
+                queries = self._iter_search_queries() if self.intermediate_queries is None else self.intermediate_queries
+                source = (query for query in queries if query not in self._processed_queries)
+                stages.insert(0, Stage("search", self._search, self.searcher.concurrency))
+            else:
+                source = [web_rel for web_rel in self.intermediate_queries_web if web_rel.get("query") not in self._processed_queries]
+
+            stream = iter(StagePipeline(source, stages, queue_size=self.queue_size))
+            try:
+                for query, batch_results in stream:
+                    self._processed_queries.add(query)
+                    for record in batch_results:
+                        if generated >= total:
+                            break
+                        generated += 1
+                        yield record
+                    if generated >= total:
+                        break
+            finally:
+                stream.close()
+
             if generated >= total:
                 break
-            if outer_loops >= max_outer_loops:
-                logger.warning(f"Reached max outer loop retries ({max_outer_loops}) in _generate_document_retrieval_data. Generated {generated} records out of {total}.")
+            if first_pass:
+                self._save_web_results()
+            self._outer_loop += 1
+            self._processed_queries = set()
+            if self._outer_loop >= max_outer_loops:
+                logger.warning(f"Reached max outer loop retries ({max_outer_loops}) in iter_data. Generated {generated} records out of {total}.")
+                break
+        if self.fetcher.cache is not None:
+            logger.info(f"Page cache: {self.fetcher.cache.stats()}")
+
+    def build_requests(self, oversample: float = 1.0) -> Iterator[Dict]:
+        """
+        Yields the document-generation requests of the whole run for batch execution.
+
+        Search queries are still generated, searched and fetched interactively; only the
+        prompts over the fetched pages, which make up most of the LLM calls, go into the batch.
+        With `oversample` above 1, some pages are prompted more than once.
+
+        Args:
+            oversample (float): Number of requests per fetched page, on average.
+
+        Yields:
+            Dict: A request with ``custom_id``, ``messages`` and ``metadata`` keys.
+        """
+        queries = self._iter_search_queries() if self.intermediate_queries is None else self.intermediate_queries
+        stages = [
+            Stage("search", self._search, self.searcher.concurrency),
+            Stage("fetch", self._fetch, self.fetcher.concurrency),
+        ]
+        pages = list(StagePipeline(queries, stages, queue_size=self.queue_size))
+        self._save_web_results()
+        for i in range(max(len(pages), ceil(len(pages) * oversample))):
+            page = pages[i % len(pages)]
+            yield {
+                "custom_id": f"doc-{i + 1}",
+                "messages": self._document_prompt(page),
+                "metadata": {"query": page[0].get("query")},
+            }
+
+    def parse_responses(self, results: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Yields Document Retrieval records from the results of a batch job, until ``num_records``.
+
+        Args:
+            results (Iterable[Dict]): Batch results with ``custom_id``, ``metadata``, ``response`` and ``error`` keys.
+
+        Yields:
+            Dict: A record with ``query`` and ``document`` keys.
+        """
+        generated = 0
+        failed = 0
+        for result in results:
+            if generated >= self.num_records:
                 break
-        # Truncate results if more than needed
-        return results[:total]
+            query = (result.get("metadata") or {}).get("query")
+            parsed = parse_json_array(result.get("response") or "", item_type=dict)
+            if not parsed:
+                failed += 1
+                logger.warning(f"Request {result.get('custom_id')} for query '{query}' gave no records: {result.get('error') or 'no JSON array of records in the response'}")
+                continue
+            for record in parsed.items[: self.num_records - generated]:
+                generated += 1
+                yield record
+        if generated < self.num_records:
+            logger.warning(f"The batch results gave {generated} records out of {self.num_records} ({failed} requests failed). Raise execution.oversample to request more.")
+
+    def plan_units(self, oversample: float = 1.0) -> List[Dict]:
+        """
+        Generates the search queries and makes each one a unit for the distributed work queue.
+        Workers search, fetch and prompt the page of their query. With `oversample` above 1,
+        some queries are planned more than once and their page is prompted again.
+
+        Args:
+            oversample (float): Number of units per query, on average.
+
+        Returns:
+            List[Dict]: Units with a ``query`` key.
+        """
+        queries = self._generate_search_queries() if self.intermediate_queries is None else self.intermediate_queries
+        if not queries:
+            return []
+        return [{"query": queries[i % len(queries)]} for i in range(max(len(queries), ceil(len(queries) * oversample)))]
+
+    def run_unit(self, unit: Dict) -> List[Dict]:
+        """
+        Searches the query of one unit, fetches its top page and turns it into records.
+
+        Args:
+            unit (Dict): A unit with a ``query`` key.
+
+        Returns:
+            List[Dict]: Records with ``query`` and ``document`` keys.
+        """
+        records = []
+        for web_rel in self._search(unit["query"]):
+            for page in self._fetch(web_rel):
+                for _, items in self._generate_documents(page):
+                    records.extend(items)
+        return records
+
+    def state_dict(self) -> Dict:
+        """
+        Returns the progress of every stage: generated queries, web search results,
+        and which pages the document stage has already turned into records.
+        """
+        with self._lock:
+            return {
+                "queries": list(self._queries),
+                "queries_complete": self.intermediate_queries is not None,
+                "web_results": dict(self._web_results),
+                "web_complete": self.intermediate_queries_web is not None,
+                "outer_loop": self._outer_loop,
+                "processed_queries": sorted(self._processed_queries),
+                "batch": self.batch_sizer.state_dict(),
+            }
+
+    def load_state_dict(self, state: Dict) -> None:
+        """
+        Restores stage progress so finished queries, searches and pages are not redone.
+        """
+        self._queries = list(state.get("queries", []))
+        self._web_results = dict(state.get("web_results", {}))
+        self._seen_urls = {result.get("href", "") for results in self._web_results.values() for result in results}
+        if state.get("queries_complete"):
+            self.intermediate_queries = list(self._queries)
+        if state.get("web_complete"):
+            self.intermediate_queries_web = [{"query": query, "results": self._web_results.get(query, [])} for query in self._queries]
+        self._outer_loop = state.get("outer_loop", 0)
+        self._processed_queries = set(state.get("processed_queries", []))
+        self.batch_sizer.load_state_dict(state.get("batch", {}))
 
     def generate_data(self) -> List[Dict]:
         """
@@ -230,9 +493,4 @@ class DocumentRetrievalTask(BaseTask):
         Returns:
             List[Dict]: List of structured data samples, each as a dictionary.
         """
-        queries = self._generate_search_queries()
-        logger.info(f"Generated {len(queries)} search queries.")
-        queries_web = self._get_search_queries_web(queries)
-        logger.info(f"Generated {len(queries_web)} search queries with web search.")
-        doc_retrieval_data = self._generate_document_retrieval_data(queries_web)
-        return doc_retrieval_data
+        return list(self.iter_data())
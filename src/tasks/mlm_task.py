@@ -3,39 +3,62 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from src.core import BaseLLM
 
-import random
 import json
-from typing import List, Dict
+import time
+from collections import deque
+from math import ceil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Dict, Optional, Union
 from src.prompts.mlm_prompts import MLM_SYS_PROMPT, MLM_USER_PROMPT
 from src.core import BaseTask, AutoTask
 from src.utils.color_logger import get_color_logger
 from src.utils.utils import backoff_retry
+from src.utils.dedup import DedupIndex
+from src.utils.parsing import parse_json_array
+from src.utils.batch_sizer import AdaptiveBatchSizer
+from src.utils.masking import BatchMasker, STOPWORDS  # noqa: F401 (STOPWORDS kept importable from here)
 
 logger = get_color_logger(name="mlm_task")
 
-# List of common stopwords to avoid masking
-STOPWORDS = {
-    "is", "am", "are", "was", "were", "be", "been", "being",
-    "the", "a", "an", "and", "or", "but", "if", "then", "else",
-    "for", "nor", "so", "yet", "to", "of", "in", "on", "at", "by",
-    "with", "about", "against", "between", "into", "through", "during",
-    "before", "after", "above", "below", "from", "up", "down", "out",
-    "off", "over", "under", "again", "further", "once", "here", "there",
-    "when", "where", "why", "how", "all", "any", "both", "each", "few",
-    "more", "most", "other", "some", "such", "no", "nor", "not", "only",
-    "own", "same", "so", "than", "too", "very", "can", "will", "just",
-    "don't", "should", "now"
-}
-
 @AutoTask.register("mlm")
 class MLMTask(BaseTask):
     """
     Task for generating Masked Language Modeling (MLM) data.
     """
 
-    def __init__(self, model: 'BaseLLM', domain: str, num_records: int, mask_pct: float = 0.15):
+    output_schema = {"text": "string", "masked_text": "string"}
+    dedup_field = "text"
+
+    def __init__(
+        self,
+        model: 'BaseLLM',
+        domain: str,
+        num_records: int,
+        mask_pct: float = 0.15,
+        concurrency: int = 1,
+        dedup: Union[bool, Dict, None] = None,
+        batch: Union[int, Dict, None] = None,
+        num_variants: int = 1,
+        mask_strategy: str = "whole_word",
+        span_length: int = 3,
+        seed: Optional[int] = None,
+    ):
         super().__init__(model, domain, num_records)
         self.mask_pct = mask_pct
+        # Each generated sentence yields up to `num_variants` records with different masks
+        self.masker = BatchMasker(
+            mask_pct=mask_pct,
+            num_variants=num_variants,
+            strategy=mask_strategy,
+            span_length=span_length,
+            seed=seed,
+        )
+        self.concurrency = max(1, int(concurrency))
+        self.max_retries = 3
+        self.batch_sizer = AdaptiveBatchSizer.from_config(batch)
+        # Maximum consecutive batches without a single new sentence before giving up
+        self.max_stale_batches = 5
+        self.dedup: Optional[DedupIndex] = DedupIndex.from_config(dedup)
 
     def mask_text(self, text: str, mask_pct: float = None):
         """
@@ -48,80 +71,258 @@ class MLMTask(BaseTask):
         Returns:
             Tuple[str, str]: (masked_text, original_text)
         """
-        if mask_pct is None:
-            mask_pct = self.mask_pct
-        words = text.split()
-        # Identify eligible words (not stopwords, alphabetic, length > 2)
-        eligible_indices = [
-            i for i, w in enumerate(words)
-            if w.lower() not in STOPWORDS and w.isalpha() and len(w) > 2
-        ]
-        if not eligible_indices:
+        variants = self.masker.mask_batch([text], num_variants=1, mask_pct=mask_pct)[0]
+        if not variants:
             return None, None
-        num_to_mask = max(1, int(len(eligible_indices) * mask_pct))
-        mask_indices = random.sample(eligible_indices, min(num_to_mask, len(eligible_indices)))
-        masked_words = words[:]
-        for idx in mask_indices:
-            masked_words[idx] = "[MASK]"
-        masked = " ".join(masked_words)
-        return masked, text
+        return variants[0], text
 
-    def generate_data(self) -> List[Dict]:
+    def _prompt(self, batch_size: int) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system",
+                "content": MLM_SYS_PROMPT,
+            },
+            {
+                "role": "user",
+                "content": MLM_USER_PROMPT.replace("{{num_records}}", str(batch_size)).replace("{{domain}}", self.domain),
+            }
+        ]
+
+    def _request_sentences(self, batch_size: int, batch_no: int) -> List[str]:
         """
-        Generates MLM data using the provided LLM model.
+        Requests one batch of sentences from the LLM, retrying on responses without a single usable sentence.
+        Complete sentences of a truncated response are kept instead of discarding the batch.
+
+        Args:
+            batch_size (int): Number of sentences to ask for.
+            batch_no (int): Batch number, used for logging only.
 
         Returns:
-            List[Dict]: List of structured data samples, each as a dictionary.
+            List[str]: The generated sentences, or an empty list if no response had a usable sentence.
+
+        Raises:
+            RuntimeError: If the LLM call still fails after its retries. A provider outage must
+                fail the run (so it can be resumed) rather than count as a batch without new sentences.
+        """
+        prompt = self._prompt(batch_size)
+        # Failed calls are retried by backoff_retry; this loop only re-asks after unusable responses
+        for attempt in range(self.max_retries):
+            logger.debug(f"Prompt (batch {batch_no}, attempt {attempt+1}):\n{json.dumps(prompt, indent=2)}")
+            start = time.monotonic()
+            try:
+                response = backoff_retry(
+                    self.model.generate_response,
+                    max_retries=self.max_retries,
+                    base_delay=1,
+                    max_delay=8,
+                    exceptions=(Exception,),
+                    logger=logger,
+                    messages=prompt,
+                    cache=False,  # The prompt is the same for every batch
+                )
+            except Exception as e:
+                raise RuntimeError(f"Batch {batch_no} failed: {e}") from e
+            logger.debug(f"Raw LLM response (batch {batch_no}, attempt {attempt+1}):\n{response}")
+            result = parse_json_array(response, item_type=str)
+            self.batch_sizer.record(batch_size, len(result.items), result.complete, time.monotonic() - start)
+            if not result:
+                logger.warning(f"Batch {batch_no}, attempt {attempt+1} failed: No JSON array of sentences found in the response.")
+                continue
+            if not result.complete:
+                logger.info(f"Batch {batch_no}: salvaged {result.salvaged} sentences from an incomplete response.")
+            return result.items
+        return []
+
+    def iter_data(self) -> Iterator[Dict]:
+        """
+        Yields MLM records as soon as their batch has been generated.
+
+        Up to ``self.concurrency`` batch requests are kept in flight on a thread pool.
+        Batches are merged in the order they were dispatched, and no new batch is
+        dispatched once the outstanding requests cover ``num_records``. Sentences
+        rejected by the dedup index do not count, so further batches are requested
+        until ``num_records`` records were produced. Each batch is masked at once, with
+        up to ``num_variants`` records per sentence.
+
+        Yields:
+            Dict: A record with ``text`` and ``masked_text`` keys.
         """
-        results = []
-        max_retries = 3
-        batch_size = 50
         total = self.num_records
         generated = 0
+        pending = deque()  # (future, batch_size) in dispatch order
+        requested = 0  # sentences asked for by in-flight batches
+        batch_no = 0
+        stale_batches = 0
 
-        while generated < total:
-            current_batch_size = min(batch_size, total - generated)
-            sentences = []
-            for attempt in range(max_retries):
-                prompt = [
-                    {
-                        "role": "system",
-                        "content": MLM_SYS_PROMPT,
-                    },
-                    {
-                        "role": "user",
-                        "content": MLM_USER_PROMPT.replace("{{num_records}}", str(current_batch_size)).replace("{{domain}}", self.domain),
-                    }
-                ]
-                logger.debug(f"Prompt (batch {generated // batch_size + 1}, attempt {attempt+1}):\n{json.dumps(prompt, indent=2)}")
-                def call_llm():
-                    return self.model.generate_response(prompt)
-                try:
-                    response = backoff_retry(
-                        call_llm,
-                        max_retries=max_retries,
-                        base_delay=1,
-                        max_delay=8,
-                        exceptions=(Exception,),
-                        logger=logger
-                    )
-                    logger.debug(f"Raw LLM response (batch {generated // batch_size + 1}, attempt {attempt+1}):\n{response}")
-                    batch_sentences = eval(response)
-                    if isinstance(batch_sentences, list) and all(isinstance(s, str) for s in batch_sentences):
-                        sentences = batch_sentences
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                while generated < total:
+                    remaining = ceil((total - generated) / self.masker.num_variants)  # sentences still needed
+                    while len(pending) < self.concurrency and requested < remaining:
+                        current_batch_size = min(self.batch_sizer.size(), remaining - requested)
+                        batch_no += 1
+                        future = executor.submit(self._request_sentences, current_batch_size, batch_no)
+                        pending.append((future, current_batch_size))
+                        requested += current_batch_size
+
+                    future, current_batch_size = pending.popleft()
+                    requested -= current_batch_size
+                    batch_generated = 0
+                    sentences = future.result()
+                    if self.dedup is not None:
+                        sentences = self.dedup.filter(sentences)
+                    # Only add up to the number of records needed
+                    for sentence, variants in zip(sentences, self.masker.mask_batch(sentences)):
+                        for masked in variants:
+                            if generated >= total:
+                                break
+                            generated += 1
+                            batch_generated += 1
+                            yield {
+                                "text": sentence,
+                                "masked_text": masked,
+                            }
+                    stale_batches = 0 if batch_generated else stale_batches + 1
+                    if stale_batches >= self.max_stale_batches:
+                        logger.warning(f"{stale_batches} consecutive batches produced no new sentences. Generated {generated} records out of {total}.")
+                        break
+            finally:
+                for future, _ in pending:
+                    future.cancel()
+        if self.dedup is not None:
+            logger.info(f"Dedup: {self.dedup.stats()}")
+        logger.info(f"Batch size: {self.batch_sizer.stats()}")
+
+    def build_requests(self, oversample: float = 1.0) -> Iterator[Dict]:
+        """
+        Yields the sentence requests of the whole run for batch execution, at the current batch size.
+
+        Args:
+            oversample (float): Factor applied to the number of sentences requested, to make up
+                for duplicates and unusable responses.
+
+        Yields:
+            Dict: A request with ``custom_id``, ``messages`` and ``metadata`` keys.
+        """
+        remaining = ceil(self.num_records / self.masker.num_variants * oversample)
+        batch_size = self.batch_sizer.size()
+        batch_no = 0
+        while remaining > 0:
+            current_batch_size = min(batch_size, remaining)
+            batch_no += 1
+            yield {
+                "custom_id": f"mlm-{batch_no}",
+                "messages": self._prompt(current_batch_size),
+                "metadata": {"batch_size": current_batch_size},
+                "cache": False,
+            }
+            remaining -= current_batch_size
+
+    def parse_responses(self, results: Iterable[Dict]) -> Iterator[Dict]:
+        """
+        Yields MLM records from the results of a batch job, deduplicating and masking each
+        response like `iter_data` does, until ``num_records`` records were produced.
+
+        Args:
+            results (Iterable[Dict]): Batch results with ``custom_id``, ``response`` and ``error`` keys.
+
+        Yields:
+            Dict: A record with ``text`` and ``masked_text`` keys.
+        """
+        generated = 0
+        failed = 0
+        for result in results:
+            if generated >= self.num_records:
+                break
+            parsed = parse_json_array(result.get("response") or "", item_type=str)
+            if not parsed:
+                failed += 1
+                logger.warning(f"Request {result.get('custom_id')} gave no sentences: {result.get('error') or 'no JSON array of sentences in the response'}")
+                continue
+            sentences = parsed.items
+            if self.dedup is not None:
+                sentences = self.dedup.filter(sentences)
+            for sentence, variants in zip(sentences, self.masker.mask_batch(sentences)):
+                for masked in variants:
+                    if generated >= self.num_records:
                         break
-                except Exception as e:
-                    logger.warning(f"Batch {generated // batch_size + 1}, attempt {attempt+1} failed: {e}")
-                    sentences = []
-            # Only add up to the number of records needed
-            for sentence in sentences:
-                if generated >= total:
-                    break
-                masked, original = self.mask_text(sentence)
-                if masked:
-                    results.append({
-                        "text": original,
-                        "masked_text": masked,
-                    })
                     generated += 1
-        return results
+                    yield {
+                        "text": sentence,
+                        "masked_text": masked,
+                    }
+        if generated < self.num_records:
+            logger.warning(f"The batch results gave {generated} records out of {self.num_records} ({failed} requests failed). Raise execution.oversample to request more.")
+        if self.dedup is not None:
+            logger.info(f"Dedup: {self.dedup.stats()}")
+
+    def plan_units(self, oversample: float = 1.0) -> List[Dict]:
+        """
+        Splits the run into sentence batches for the distributed work queue, one LLM request each.
+
+        Args:
+            oversample (float): Factor applied to the number of sentences requested, to make up
+                for duplicates across workers and failed batches.
+
+        Returns:
+            List[Dict]: Units with ``batch_no`` and ``batch_size`` keys.
+        """
+        return [
+            {"batch_no": batch_no, "batch_size": request["metadata"]["batch_size"]}
+            for batch_no, request in enumerate(self.build_requests(oversample=oversample), start=1)
+        ]
+
+    def run_unit(self, unit: Dict) -> List[Dict]:
+        """
+        Generates and masks one batch of sentences planned by `plan_units`.
+        Duplicates are dropped within the worker; the merge step drops those across workers.
+
+        Args:
+            unit (Dict): A unit with ``batch_no`` and ``batch_size`` keys.
+
+        Returns:
+            List[Dict]: Records with ``text`` and ``masked_text`` keys.
+        """
+        sentences = self._request_sentences(unit["batch_size"], unit["batch_no"])
+        if self.dedup is not None:
+            sentences = self.dedup.filter(sentences)
+        return [
+            {"text": sentence, "masked_text": masked}
+            for sentence, variants in zip(sentences, self.masker.mask_batch(sentences))
+            for masked in variants
+        ]
+
+    def state_dict(self) -> Dict:
+        """
+        Returns the current batch size and masking generator state, so a resumed run neither
+        tunes the batch size again nor repeats the masks already drawn.
+        """
+        return {"batch": self.batch_sizer.state_dict(), "masker": self.masker.state_dict()}
+
+    def load_state_dict(self, state: Dict) -> None:
+        """
+        Restores the batch size and masking generator state saved by `state_dict`.
+        """
+        self.batch_sizer.load_state_dict(state.get("batch", {}))
+        self.masker.load_state_dict(state.get("masker", {}))
+
+    def load_output(self, records: Iterable[Dict]) -> None:
+        """
+        Adds the sentences of already written records to the dedup index, so a resumed run
+        does not generate them again.
+        """
+        if self.dedup is None:
+            return
+        # Every masked variant of a sentence repeats its text; index each sentence once
+        for text in dict.fromkeys(record.get(self.dedup_field) for record in records):
+            if isinstance(text, str):
+                self.dedup.add(text)
+
+    def generate_data(self) -> List[Dict]:
+        """
+        Generates MLM data using the provided LLM model.
+
+        Returns:
+            List[Dict]: List of structured data samples, each as a dictionary.
+        """
+        return list(self.iter_data())
@@ -0,0 +1,150 @@
+import statistics
+import threading
+from collections import deque
+from typing import Dict, Optional, Union
+
+
+class AdaptiveBatchSizer:
+    """
+    Tunes the number of items requested per LLM call from the outcome of previous calls.
+
+    Uses additive-increase/multiplicative-decrease: every complete batch that delivers
+    (nearly) everything it asked for within the latency target grows the size by `step`,
+    while an unparseable response halves it and a truncated one drops it just below the
+    number of items that fit. When the model consistently returns fewer items than
+    requested, the size moves toward what it actually delivers.
+    The size always stays within [`min_size`, `max_size`]. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        initial: int = 50,
+        min_size: int = 5,
+        max_size: int = 200,
+        step: int = 5,
+        decrease: float = 0.5,
+        target_latency: Optional[float] = None,
+        window: int = 10,
+    ):
+        """
+        Args:
+            initial: Starting batch size.
+            min_size: Smallest batch size.
+            max_size: Largest batch size.
+            step: Amount added after a successful batch.
+            decrease: Factor applied after a failed batch; also the largest cut after a truncated one.
+            target_latency: Optional seconds per call; slower calls shrink the batch.
+            window: Number of recent batches used for the converged size.
+        """
+        if not 1 <= min_size <= max_size:
+            raise ValueError(f"Invalid batch size bounds: min_size={min_size}, max_size={max_size}")
+        if not 0 < decrease < 1:
+            raise ValueError(f"decrease must be in (0, 1), got {decrease}")
+        self.min_size = int(min_size)
+        self.max_size = int(max_size)
+        self.step = max(1, int(step))
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self._size = float(self._clamp(initial))
+        self._recent = deque(maxlen=max(1, int(window)))
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.truncated = 0
+        self.failed = 0
+        self.requested = 0
+        self.received = 0
+        self.latency = 0.0
+
+    @classmethod
+    def from_config(cls, batch_cfg: Union[int, Dict, None], default: int = 50) -> "AdaptiveBatchSizer":
+        """
+        Builds a sizer from the `batch` task option.
+
+        Args:
+            batch_cfg: An int for a fixed batch size, a dict of constructor arguments
+                (`initial`, `min_size`, `max_size`, ...), or None for the defaults.
+            default: Initial size used when the config does not set one.
+
+        Returns:
+            AdaptiveBatchSizer: The sizer.
+        """
+        if isinstance(batch_cfg, int) and not isinstance(batch_cfg, bool):
+            return cls(initial=batch_cfg, min_size=batch_cfg, max_size=batch_cfg)
+        batch_cfg = dict(batch_cfg or {})
+        batch_cfg.setdefault("initial", default)
+        return cls(**batch_cfg)
+
+    def _clamp(self, size: float) -> float:
+        return min(self.max_size, max(self.min_size, size))
+
+    def size(self) -> int:
+        """The batch size to request next."""
+        with self._lock:
+            return int(self._size)
+
+    def record(self, requested: int, received: int, complete: bool = True, latency: Optional[float] = None) -> None:
+        """
+        Updates the batch size from the outcome of one call.
+
+        Args:
+            requested: Number of items asked for.
+            received: Number of usable items parsed from the response (0 if it could not be parsed).
+            complete: False if the response was cut off before the end of the array.
+            latency: Seconds the call took.
+        """
+        with self._lock:
+            self.batches += 1
+            self.requested += requested
+            self.received += received
+            if latency is not None:
+                self.latency += latency
+            if received == 0:
+                self.failed += 1
+                self._size *= self.decrease
+            elif not complete:
+                self.truncated += 1
+                # The model ran out of output room after `received` items: drop just below that,
+                # or by `decrease` if it delivered less than that fraction of the batch
+                self._size = max(self._size * self.decrease, min(self._size, received * 0.9))
+            elif self.target_latency is not None and latency is not None and latency > self.target_latency:
+                self._size *= max(self.decrease, self.target_latency / latency)
+            elif received < 0.9 * requested:
+                # Complete but short: the model returns fewer items than asked, so ask for about that many
+                self._size = (self._size + received) / 2
+            elif requested >= int(self._size):
+                # Only grow when the full current size was actually tried
+                self._size += self.step
+            self._size = self._clamp(self._size)
+            self._recent.append(int(self._size))
+
+    def converged_size(self) -> int:
+        """Median batch size over the most recent batches."""
+        with self._lock:
+            return int(statistics.median(self._recent)) if self._recent else int(self._size)
+
+    def stats(self) -> Dict[str, float]:
+        """Current and converged batch size, outcome counters, mean yield and items per second of call time."""
+        converged = self.converged_size()
+        with self._lock:
+            return {
+                "size": int(self._size),
+                "converged_size": converged,
+                "batches": self.batches,
+                "truncated": self.truncated,
+                "failed": self.failed,
+                "yield": self.received / self.requested if self.requested else 0.0,
+                "items_per_second": self.received / self.latency if self.latency else 0.0,
+            }
+
+    def state_dict(self) -> Dict:
+        """The current size, so a resumed run starts from it."""
+        with self._lock:
+            return {"size": self._size}
+
+    def load_state_dict(self, state: Dict) -> None:
+        with self._lock:
+            if "size" in state:
+                self._size = self._clamp(float(state["size"]))
+
+    def __repr__(self):
+        return f"AdaptiveBatchSizer(size={self.size()}, min_size={self.min_size}, max_size={self.max_size})"
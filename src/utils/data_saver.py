@@ -1,7 +1,37 @@
+import gzip
+import importlib
 import json
 import os
-from typing import Any, List, Dict, Union
-import pandas as pd
+from typing import Any, Iterable, List, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+_ORJSON_OPTIONS = (orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+COMPRESSION_SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _require(module: str, extra: str) -> None:
+    """Fails early, with the install command, when an optional dependency is missing."""
+    try:
+        importlib.import_module(module)
+    except ImportError as e:
+        raise ImportError(f"{module} is not installed; install it with `pip install datagen[{extra}]` or `pip install {module}`.") from e
+
+
+def dumps_line(record: Any) -> bytes:
+    """
+    Serializes a record as one UTF-8 JSONL line, with orjson when it is installed.
+    Records orjson cannot encode (e.g. integers above 64 bits) fall back to the json module.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(record, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
 
 def save_data(
     data: Union[List[Dict], List[List], Dict, List[Any]],
@@ -22,23 +52,333 @@ def save_data(
     path = os.path.join(folder, filename)
 
     if format == "jsonl":
-        with open(path, "w", encoding="utf-8") as f:
-            if isinstance(data, list):
-                for record in data:
-                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
-            else:
-                f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        writer = JsonlWriter(path)
+        writer.write(data if isinstance(data, list) else [data])
+        writer.close()
     elif format == "csv":
+        import pandas as pd  # Only tabular formats need pandas
         try:
             df = pd.DataFrame(data)
         except Exception:
             df = pd.DataFrame([data])
         df.to_csv(path, index=False)
     elif format == "parquet":
-        try:
-            df = pd.DataFrame(data)
-        except Exception:
-            df = pd.DataFrame([data])
-        df.to_parquet(path, index=False)
+        records = data if isinstance(data, list) else [data]
+        if all(isinstance(record, dict) for record in records):
+            # Written in row groups rather than through one DataFrame of everything
+            with DataWriter(folder, filename, format="parquet") as writer:
+                writer.write_many(records)
+            return
+        import pandas as pd
+        pd.DataFrame(records).to_parquet(path, index=False)
     else:
         raise ValueError(f"Unsupported format: {format}")
+
+
+class JsonlWriter:
+    """
+    Writes JSONL with large buffered writes, optionally compressed with gzip or zstd and
+    split into numbered shards.
+
+    Without sharding the output is `<name>.jsonl` (plus `.gz` or `.zst`). With
+    `max_shard_records` or `max_shard_bytes` set, records go to `<name>-00000.jsonl`,
+    `<name>-00001.jsonl`, ... and a `<name>.shards.json` manifest lists every shard with its
+    record count and size; it is rewritten on each rotation, so it also describes a partial run.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        append: bool = False,
+        compression: str = "none",
+        level: Optional[int] = None,
+        threads: int = 0,
+        max_shard_records: Optional[int] = None,
+        max_shard_bytes: Optional[int] = None,
+        buffer_size: int = 1 << 20,
+    ):
+        """
+        Args:
+            path: Output path of the uncompressed, unsharded file, e.g. `output/data.jsonl`.
+            append: Append to an existing file. Only plain, unsharded output can be appended.
+            compression: 'none', 'gzip' or 'zstd' (requires `zstandard`).
+            level: Compression level; defaults to 6 for gzip and 3 for zstd.
+            threads: zstd worker threads; 0 compresses on the writing thread, -1 uses every core.
+            max_shard_records: Records per shard before rotating to the next one.
+            max_shard_bytes: Uncompressed bytes per shard before rotating to the next one.
+            buffer_size: Size of the file write buffer in bytes.
+        """
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}. Available: {sorted(COMPRESSION_SUFFIXES)}")
+        if compression == "zstd":
+            _require("zstandard", "zstd")
+        self.sharded = bool(max_shard_records or max_shard_bytes)
+        if append and (self.sharded or compression != "none"):
+            raise ValueError("Appending is only supported for uncompressed, unsharded JSONL.")
+        self.base, self.extension = os.path.splitext(path)
+        self.compression = compression
+        self.level = level
+        self.threads = threads
+        self.max_shard_records = max_shard_records
+        self.max_shard_bytes = max_shard_bytes
+        self.buffer_size = max(1 << 12, int(buffer_size))
+        self.append = append
+        self.shards: List[Dict[str, Any]] = []
+        self._raw = None
+        self._stream = None
+        self._shard_records = 0
+        self._shard_bytes = 0
+        self.path = f"{self.base}.shards.json" if self.sharded else f"{path}{COMPRESSION_SUFFIXES[compression]}"
+        if not self.sharded:
+            self._open(self.path)
+
+    def _open(self, path: str) -> None:
+        compressor = None
+        if self.compression == "zstd":
+            import zstandard  # Only zstd output needs zstandard
+
+            compressor = zstandard.ZstdCompressor(level=3 if self.level is None else self.level, threads=self.threads)
+        self._raw = open(path, "ab" if self.append else "wb", buffering=self.buffer_size)
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6 if self.level is None else self.level)
+        elif compressor is not None:
+            self._stream = compressor.stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+        self._shard_records = 0
+        self._shard_bytes = 0
+        if self.sharded:
+            self.shards.append({"path": os.path.basename(path), "records": 0, "bytes": 0})
+
+    def _close_shard(self) -> None:
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+        if self.sharded:
+            self.shards[-1]["records"] = self._shard_records
+            self.shards[-1]["bytes"] = self._shard_bytes
+            self.shards[-1]["size"] = os.path.getsize(os.path.join(os.path.dirname(self.path), self.shards[-1]["path"]))
+            self._write_manifest()
+        self._raw = self._stream = None
+
+    def _next_shard(self) -> None:
+        if self._raw is not None:
+            self._close_shard()
+        self._open(f"{self.base}-{len(self.shards):05d}{self.extension}{COMPRESSION_SUFFIXES[self.compression]}")
+
+    def _shard_full(self) -> bool:
+        return (self.max_shard_records and self._shard_records >= self.max_shard_records) or (
+            self.max_shard_bytes and self._shard_bytes >= self.max_shard_bytes
+        )
+
+    def _write_manifest(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "format": "jsonl",
+                "compression": self.compression,
+                "records": sum(shard["records"] for shard in self.shards),
+                "shards": self.shards,
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def write(self, records: Iterable[Any]) -> None:
+        """Serializes and writes records, rotating to a new shard whenever the current one is full."""
+        lines: List[bytes] = []
+        for record in records:
+            if self.sharded and (self._raw is None or self._shard_full()):
+                if lines:
+                    self._stream.write(b"".join(lines))
+                    lines = []
+                self._next_shard()
+            line = dumps_line(record)
+            lines.append(line)
+            self._shard_records += 1
+            self._shard_bytes += len(line)
+        if lines:
+            self._stream.write(b"".join(lines))
+
+    def flush(self) -> None:
+        """
+        Pushes buffered lines of plain output to the operating system. Compressed output is
+        left to the compressor, since flushing it mid-stream costs ratio; it is complete once closed.
+        """
+        if self._raw is not None and self._stream is self._raw:
+            self._raw.flush()
+
+    def close(self) -> None:
+        """Closes the current file and, when sharding, writes the final manifest."""
+        if self._raw is not None:
+            self._close_shard()
+        elif self.sharded and not self.shards:
+            self._write_manifest()
+
+    def __repr__(self):
+        return f"JsonlWriter(path={self.path}, compression={self.compression}, shards={len(self.shards)})"
+
+
+class DataWriter:
+    """
+    Streams records to disk, appending and flushing them in chunks as they arrive.
+    JSONL and CSV are appended chunk by chunk; JSONL can also be compressed and sharded,
+    see `JsonlWriter`. Parquet is written with pyarrow's
+    `ParquetWriter`, one row group per `row_group_size` records, so memory stays bounded
+    however many records are written. A Parquet file is only readable once the writer is
+    closed and has written its footer: Ctrl-C and SIGTERM unwind through `close()`, but a
+    crash or SIGKILL leaves a file that cannot be read.
+
+    Usage:
+        with DataWriter("output", "data.jsonl", format="jsonl") as writer:
+            for record in records:
+                writer.write(record)
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        filename: str,
+        format: str = "jsonl",
+        chunk_size: int = 1000,
+        append: bool = False,
+        schema: Optional[Dict[str, str]] = None,
+        parquet: Optional[Dict[str, Any]] = None,
+        jsonl: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            folder: The output folder path.
+            filename: The output file name.
+            format: One of 'jsonl', 'csv', or 'parquet'.
+            chunk_size: Number of buffered records that triggers a flush to disk.
+            append: Append to an existing file instead of overwriting it.
+            schema: Optional column name to type mapping (Arrow type names such as 'string'
+                or 'int64'), e.g. a task's `output_schema`. It fixes the Parquet schema and the
+                CSV columns; without it they are inferred from the first chunk.
+            parquet: Parquet settings: `row_group_size` (records per row group, defaults to
+                `chunk_size`), `compression` (default 'snappy') and `use_dictionary` (default True).
+            jsonl: JSONL settings: `compression` ('none', 'gzip' or 'zstd'), `level`, `threads`
+                (zstd), `max_shard_records`, `max_shard_mb` and `buffer_size`. `path` then names the
+                compressed file, or the shard manifest when sharding.
+        """
+        if format not in ("jsonl", "csv", "parquet"):
+            raise ValueError(f"Unsupported format: {format}")
+        if format == "parquet" and append:
+            raise ValueError("Appending is not supported for the parquet format.")
+        if format == "parquet":
+            _require("pyarrow", "parquet")
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, filename)
+        self.format = format
+        self.chunk_size = max(1, int(chunk_size))
+        self.records_written = 0
+        self.schema = schema
+        parquet = parquet or {}
+        self.row_group_size = max(1, int(parquet.get("row_group_size", self.chunk_size)))
+        self.compression = parquet.get("compression", "snappy")
+        self.use_dictionary = parquet.get("use_dictionary", True)
+        self._buffer: List[Any] = []
+        self._columns = list(schema) if schema else None
+        self._file = None
+        self._parquet_writer = None
+        self._header_written = append and os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        if format == "jsonl":
+            jsonl = dict(jsonl or {})
+            max_shard_mb = jsonl.pop("max_shard_mb", None)
+            self._file = JsonlWriter(
+                self.path,
+                append=append,
+                max_shard_bytes=int(max_shard_mb * 1024 * 1024) if max_shard_mb else None,
+                **jsonl,
+            )
+            self.path = self._file.path
+        elif format == "csv" and not append:
+            open(self.path, "w").close()
+
+    @staticmethod
+    def can_append(format: str, jsonl: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Whether output in this format can be appended to, which resuming a run requires:
+        CSV and plain, unsharded JSONL can; Parquet, compressed and sharded JSONL cannot.
+        """
+        if format == "csv":
+            return True
+        if format == "jsonl":
+            jsonl = jsonl or {}
+            return jsonl.get("compression", "none") == "none" and not (jsonl.get("max_shard_records") or jsonl.get("max_shard_mb"))
+        return False
+
+    def write(self, record: Any) -> None:
+        """Buffers a record, flushing to disk once `chunk_size` (Parquet: `row_group_size`) records are pending."""
+        self._buffer.append(record)
+        if len(self._buffer) >= (self.row_group_size if self.format == "parquet" else self.chunk_size):
+            self.flush()
+
+    def write_many(self, records: Iterable[Any]) -> None:
+        """Buffers several records."""
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        """Writes all buffered records to disk."""
+        if not self._buffer:
+            return
+        if self.format == "parquet":
+            self._write_row_group()
+        elif self.format == "jsonl":
+            self._file.write(self._buffer)
+            self._file.flush()
+        elif self.format == "csv":
+            import pandas as pd  # Only tabular formats need pandas
+            df = pd.DataFrame(self._buffer)
+            if self._columns is None:
+                self._columns = list(df.columns)
+            else:
+                df = df.reindex(columns=self._columns)
+            df.to_csv(self.path, mode="a", header=not self._header_written, index=False)
+            self._header_written = True
+        self.records_written += len(self._buffer)
+        self._buffer = []
+
+    def _open_parquet(self):
+        """Opens the Parquet writer with the explicit schema, or the one inferred from the buffered records."""
+        import pyarrow as pa  # Only the parquet format needs pyarrow
+        import pyarrow.parquet as pq
+
+        if self.schema:
+            arrow_schema = pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in self.schema.items()])
+        else:
+            arrow_schema = pa.Table.from_pylist(self._buffer).schema
+        self._parquet_writer = pq.ParquetWriter(
+            self.path,
+            arrow_schema,
+            compression=self.compression,
+            use_dictionary=self.use_dictionary,
+        )
+
+    def _write_row_group(self) -> None:
+        """Writes the buffered records as one Parquet row group."""
+        import pyarrow as pa
+
+        if self._parquet_writer is None:
+            self._open_parquet()
+        # Fields missing from a record are written as nulls; fields outside the schema are dropped
+        table = pa.Table.from_pylist(self._buffer, schema=self._parquet_writer.schema)
+        self._parquet_writer.write_table(table, row_group_size=self.row_group_size)
+
+    def close(self) -> None:
+        """Flushes remaining records and closes the output file."""
+        self.flush()
+        if self.format == "parquet" and self._parquet_writer is None and self.schema:
+            self._open_parquet()  # A run without records still gets a file with the task's schema
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self) -> "DataWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,175 @@
+import hashlib
+import random
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases `text`, drops punctuation and collapses whitespace."""
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+
+def _hash32(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+class DedupIndex:
+    """
+    Incremental index that rejects exact and near-duplicate texts.
+
+    Exact duplicates (after normalization) are caught with a set of hashes. Near duplicates
+    are caught with MinHash signatures over character shingles, bucketed with locality-sensitive
+    hashing (LSH): a text is only compared with the texts that share at least one band of its
+    signature, so each lookup costs about the same however large the index grows.
+    All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        near: bool = True,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity at or above which two texts are near duplicates.
+            num_perm: Number of MinHash permutations (signature length).
+            bands: Number of LSH bands; `num_perm` must be divisible by it. More bands find more
+                candidates at lower similarities.
+            shingle_size: Length of the character shingles.
+            near: Detect near duplicates. When False only exact duplicates are rejected.
+            seed: Seed of the MinHash permutations.
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = max(1, int(shingle_size))
+        self.near = near
+        rng = random.Random(seed)
+        # a, b < 2**32 keep a * h + b within uint64 for 32-bit shingle hashes
+        self._a = np.array([rng.randrange(1, 1 << 32) for _ in range(num_perm)], dtype=np.uint64)
+        self._b = np.array([rng.randrange(0, 1 << 32) for _ in range(num_perm)], dtype=np.uint64)
+        self._exact = set()
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(bands)]
+        self._signatures: List[Tuple[int, ...]] = []
+        self._lock = threading.Lock()
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+
+    @classmethod
+    def from_config(cls, dedup_cfg: Union[bool, Dict, None]) -> Optional["DedupIndex"]:
+        """
+        Builds an index from the `dedup` task option.
+
+        Args:
+            dedup_cfg: False to disable deduplication, True or None for the defaults,
+                or a dict of constructor arguments.
+
+        Returns:
+            Optional[DedupIndex]: The index, or None if deduplication is disabled.
+        """
+        if dedup_cfg is False:
+            return None
+        if dedup_cfg is None or dedup_cfg is True:
+            return cls()
+        return cls(**dedup_cfg)
+
+    def _shingles(self, normalized: str) -> set:
+        k = self.shingle_size
+        if len(normalized) <= k:
+            return {normalized}
+        return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        Computes the MinHash signature of `text`.
+
+        Args:
+            text: The text to hash.
+
+        Returns:
+            Tuple[int, ...]: `num_perm` minimum hash values.
+        """
+        hashes = np.fromiter((_hash32(shingle) for shingle in self._shingles(normalize_text(text))), dtype=np.uint64)
+        # One row per permutation, one column per shingle
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        return tuple(permuted.min(axis=1).tolist())
+
+    def _similarity(self, sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(sig_a, sig_b)) / self.num_perm
+
+    def _band_keys(self, sig: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        return [sig[i * self.rows:(i + 1) * self.rows] for i in range(self.bands)]
+
+    def add(self, text: str) -> bool:
+        """
+        Adds `text` to the index unless it duplicates a text already indexed.
+
+        Args:
+            text: The candidate text.
+
+        Returns:
+            bool: True if the text is new and was added, False if it was rejected as a duplicate.
+        """
+        normalized = normalize_text(text)
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        # Signatures are computed outside the lock; they only depend on the text
+        sig = self.signature(text) if self.near and normalized else None
+        with self._lock:
+            if digest in self._exact:
+                self.exact_duplicates += 1
+                return False
+            if sig is not None:
+                keys = self._band_keys(sig)
+                candidates = set()
+                for band, key in enumerate(keys):
+                    candidates.update(self._buckets[band].get(key, ()))
+                for idx in candidates:
+                    if self._similarity(sig, self._signatures[idx]) >= self.threshold:
+                        self.near_duplicates += 1
+                        return False
+                idx = len(self._signatures)
+                self._signatures.append(sig)
+                for band, key in enumerate(keys):
+                    self._buckets[band].setdefault(key, []).append(idx)
+            self._exact.add(digest)
+            return True
+
+    def filter(self, texts: Iterable[str]) -> List[str]:
+        """
+        Adds each text in turn and returns the ones that were accepted, in order.
+        Duplicates within `texts` itself are rejected too.
+        """
+        return [text for text in texts if self.add(text)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._exact)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of indexed texts and of rejected exact and near duplicates."""
+        with self._lock:
+            return {
+                "unique": len(self._exact),
+                "exact_duplicates": self.exact_duplicates,
+                "near_duplicates": self.near_duplicates,
+            }
+
+    def __repr__(self):
+        return f"DedupIndex(threshold={self.threshold}, num_perm={self.num_perm}, bands={self.bands}, near={self.near})"
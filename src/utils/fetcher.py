@@ -0,0 +1,89 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.page_cache import PageCache
+from src.utils.utils import fetch_and_parse
+
+
+class PageFetcher:
+    """
+    Fetches and parses web pages over a pooled `requests.Session`, and is safe to call from
+    several threads, e.g. the workers of a `StagePipeline` fetch stage.
+
+    Connections are kept alive and reused, so repeated requests to a host skip the
+    DNS, TCP and TLS handshakes. Requests in flight are capped globally (`concurrency`),
+    however many threads call `fetch`, and per host (`per_host`). With a `cache`, pages are
+    served from and stored in an on-disk `PageCache`.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        per_host: int = 2,
+        timeout: float = 10,
+        user_agent: Optional[str] = None,
+        cache: Optional[Dict] = None,
+    ):
+        """
+        Args:
+            concurrency: Maximum number of requests in flight; also the size of the connection pool.
+            per_host: Maximum number of concurrent requests to a single host.
+            timeout: Request timeout in seconds.
+            user_agent: Optional User-Agent header sent with every request.
+            cache: Optional page cache settings (`path`, `ttl`, `max_size_mb`).
+        """
+        self.concurrency = max(1, int(concurrency))
+        self.per_host = max(1, int(per_host))
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        self.cache = PageCache(**cache) if cache else None
+        self._global_slot = threading.BoundedSemaphore(self.concurrency)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Returns the semaphore limiting concurrent requests to the host of `url`."""
+        host = urlsplit(url).netloc.lower()
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    @contextmanager
+    def _request_slot(self, url: str) -> Iterator[None]:
+        """Holds a slot of the host of `url`, then a global one, for the duration of a request."""
+        # The host slot comes first, so a thread waiting on a busy host holds no global slot
+        with self._host_slot(url), self._global_slot:
+            yield
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        Fetches a single page and extracts its main text.
+
+        Args:
+            url: The URL to fetch.
+
+        Returns:
+            The main textual content of the page, or None if it could not be fetched or parsed.
+        """
+        # The limits cover the request only; fresh cache hits skip them
+        return fetch_and_parse(url, session=self.session, timeout=self.timeout, cache=self.cache, slot=self._request_slot(url))
+
+    def close(self) -> None:
+        """Closes pooled connections."""
+        self.session.close()
+
+    def __repr__(self):
+        return f"PageFetcher(concurrency={self.concurrency}, per_host={self.per_host}, timeout={self.timeout})"
@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# List of common stopwords to avoid masking
+STOPWORDS = {
+    "is", "am", "are", "was", "were", "be", "been", "being",
+    "the", "a", "an", "and", "or", "but", "if", "then", "else",
+    "for", "nor", "so", "yet", "to", "of", "in", "on", "at", "by",
+    "with", "about", "against", "between", "into", "through", "during",
+    "before", "after", "above", "below", "from", "up", "down", "out",
+    "off", "over", "under", "again", "further", "once", "here", "there",
+    "when", "where", "why", "how", "all", "any", "both", "each", "few",
+    "more", "most", "other", "some", "such", "no", "nor", "not", "only",
+    "own", "same", "so", "than", "too", "very", "can", "will", "just",
+    "don't", "should", "now"
+}
+
+MASK_STRATEGIES = ("whole_word", "span")
+
+
+class BatchMasker:
+    """
+    Masks a whole batch of sentences at once with NumPy.
+
+    Sentences are split on whitespace and flattened into one array of word ids over the
+    batch vocabulary. A word is eligible for masking if it is alphabetic, longer than two
+    characters and not a stopword; eligibility is decided once per distinct word and
+    gathered for every position, and the random choice of masked words is made for all
+    sentences and all variants in a few vectorized operations. Each sentence gets `num_variants`
+    independently drawn masks from a seeded generator.
+
+    Strategies:
+        - ``whole_word``: masks `mask_pct` of the eligible words of a sentence (at least one).
+        - ``span``: masks runs of `span_length` consecutive words, each starting at an eligible
+          word, with about the same total number of masked words.
+    """
+
+    def __init__(
+        self,
+        mask_pct: float = 0.15,
+        num_variants: int = 1,
+        strategy: str = "whole_word",
+        span_length: int = 3,
+        seed: Optional[int] = None,
+        mask_token: str = "[MASK]",
+        stopwords: Optional[set] = None,
+    ):
+        """
+        Args:
+            mask_pct: Fraction of eligible words to mask.
+            num_variants: Number of masked variants drawn per sentence.
+            strategy: 'whole_word' or 'span'.
+            span_length: Words per masked span for the 'span' strategy.
+            seed: Seed of the random generator; None for a fresh one.
+            mask_token: Replacement for masked words.
+            stopwords: Words never chosen for masking. Defaults to `STOPWORDS`.
+        """
+        if strategy not in MASK_STRATEGIES:
+            raise ValueError(f"Unsupported mask strategy: {strategy}. Choose one of {MASK_STRATEGIES}.")
+        self.mask_pct = mask_pct
+        self.num_variants = max(1, int(num_variants))
+        self.strategy = strategy
+        self.span_length = max(1, int(span_length))
+        self.mask_token = mask_token
+        self.stopwords = STOPWORDS if stopwords is None else set(stopwords)
+        self.rng = np.random.default_rng(seed)
+
+    def is_eligible(self, word: str) -> bool:
+        """Whether `word` may be masked: alphabetic, longer than two characters and not a stopword."""
+        return word.isalpha() and len(word) > 2 and word.lower() not in self.stopwords
+
+    def mask_batch(self, sentences: List[str], num_variants: Optional[int] = None, mask_pct: Optional[float] = None) -> List[List[str]]:
+        """
+        Draws masked variants of every sentence.
+
+        Args:
+            sentences: The sentences to mask.
+            num_variants: Overrides the number of variants per sentence.
+            mask_pct: Overrides the fraction of eligible words to mask.
+
+        Returns:
+            List[List[str]]: For each sentence, its distinct masked variants. Empty for sentences
+            without any eligible word.
+        """
+        num_variants = self.num_variants if num_variants is None else max(1, int(num_variants))
+        mask_pct = self.mask_pct if mask_pct is None else mask_pct
+        tokenized = [sentence.split() for sentence in sentences]
+        lengths = np.array([len(words) for words in tokenized], dtype=np.int64)
+        if not lengths.sum():
+            return [[] for _ in sentences]
+        vocab: Dict[str, int] = {}
+        ids = np.fromiter(
+            (vocab.setdefault(word, len(vocab)) for words in tokenized for word in words),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+        # The mask token gets the id right after the batch vocabulary
+        lexicon = np.array(list(vocab) + [self.mask_token], dtype=object)
+        mask_id = len(vocab)
+        seg = np.repeat(np.arange(len(sentences)), lengths)  # sentence index of every word
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        eligible = np.fromiter((self.is_eligible(word) for word in vocab), dtype=bool, count=len(vocab))[ids]
+        eligible_count = np.bincount(seg, weights=eligible, minlength=len(sentences)).astype(np.int64)
+        num_to_mask = np.minimum(np.maximum(1, (eligible_count * mask_pct).astype(np.int64)), eligible_count)
+        if self.strategy == "span":
+            num_to_mask = np.minimum(np.maximum(1, np.rint(num_to_mask / self.span_length).astype(np.int64)), eligible_count)
+
+        # Random keys, with ineligible words sorted last; sorting by (sentence, key) and keeping
+        # the first `num_to_mask` words of each sentence picks a uniform random subset per sentence
+        keys = self.rng.random((num_variants, len(ids)))
+        keys[:, ~eligible] = 2.0
+        order = np.argsort(seg * 4.0 + keys, axis=1, kind="stable")
+        rank = np.arange(len(ids)) - starts[seg]
+        chosen = np.zeros((num_variants, len(ids)), dtype=bool)
+        np.put_along_axis(chosen, order, np.broadcast_to(rank < num_to_mask[seg], order.shape), axis=1)
+
+        if self.strategy == "span":
+            mask = chosen.copy()
+            for offset in range(1, self.span_length):
+                same_sentence = seg[offset:] == seg[:-offset]
+                mask[:, offset:] |= chosen[:, :-offset] & same_sentence
+        else:
+            mask = chosen
+
+        # Dicts keep the distinct variants of each sentence in the order they were drawn
+        results: List[Dict[str, None]] = [{} for _ in sentences]
+        bounds = [(i, start, length) for i, (start, length, count) in enumerate(zip(starts.tolist(), lengths.tolist(), eligible_count.tolist())) if count]
+        for variant in range(num_variants):
+            masked_words = lexicon[np.where(mask[variant], mask_id, ids)].tolist()
+            for i, start, length in bounds:
+                results[i][" ".join(masked_words[start:start + length])] = None
+        return [list(variants) for variants in results]
+
+    def state_dict(self) -> Dict:
+        """The state of the random generator."""
+        return {"rng": self.rng.bit_generator.state}
+
+    def load_state_dict(self, state: Dict) -> None:
+        if "rng" in state:
+            self.rng.bit_generator.state = state["rng"]
+
+    def __repr__(self):
+        return f"BatchMasker(mask_pct={self.mask_pct}, num_variants={self.num_variants}, strategy={self.strategy})"
@@ -0,0 +1,311 @@
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Upper bounds in seconds, suited to LLM calls and page fetches
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, math.inf)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (
+        f'{name}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _label_str(key: LabelKey) -> str:
+    """Compact label rendering used as the key in JSON summaries."""
+    return ",".join(f"{name}={value}" for name, value in key)
+
+
+class Counter:
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def total(self) -> float:
+        """Sum over all label sets."""
+        with self._lock:
+            return sum(self._values.values())
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            return {_label_str(key): value for key, value in self._values.items()}
+
+    def prometheus(self) -> Iterable[str]:
+        with self._lock:
+            for key, value in self._values.items():
+                yield f"{self.name}{_format_labels(key)} {value}"
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "sum", "count", "min", "max")
+
+    def __init__(self, num_buckets: int):
+        self.counts = [0] * num_buckets
+        self.sum = 0.0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+
+class Histogram:
+    """Distribution of observed values per label set, in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != math.inf:
+            self.buckets += (math.inf,)
+        self._series: Dict[LabelKey, _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.counts[i] += 1
+                    break
+            series.sum += value
+            series.count += 1
+            series.min = min(series.min, value)
+            series.max = max(series.max, value)
+
+    def time(self, **labels: Any) -> "_Timer":
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def _quantile(self, series: _HistogramSeries, q: float) -> float:
+        """Estimates a quantile by linear interpolation inside the bucket that contains it."""
+        rank = q * series.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, series.counts):
+            if count and seen + count >= rank:
+                upper = series.max if bound == math.inf else min(bound, series.max)
+                lower = max(lower, series.min)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return series.max
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            return self._quantile(series, q) if series and series.count else None
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                _label_str(key): {
+                    "count": series.count,
+                    "sum": series.sum,
+                    "mean": series.sum / series.count,
+                    "min": series.min,
+                    "max": series.max,
+                    "p50": self._quantile(series, 0.5),
+                    "p95": self._quantile(series, 0.95),
+                    "p99": self._quantile(series, 0.99),
+                }
+                for key, series in self._series.items()
+                if series.count
+            }
+
+    def prometheus(self) -> Iterable[str]:
+        with self._lock:
+            for key, series in self._series.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, series.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else repr(float(bound))
+                    yield f"{self.name}_bucket{_format_labels(key, {'le': le})} {cumulative}"
+                yield f"{self.name}_sum{_format_labels(key)} {series.sum}"
+                yield f"{self.name}_count{_format_labels(key)} {series.count}"
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Process-wide collection of named counters, gauges and histograms.
+    Metrics are created on first use, so instrumented code only needs the registry.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls) or (cls is Counter and isinstance(metric, Gauge)):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}.")
+            return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Any]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def reset(self) -> None:
+        """Drops every metric, e.g. at the start of a run."""
+        with self._lock:
+            self._metrics = {}
+
+    def summary(self) -> Dict[str, Any]:
+        """All metrics as a JSON-serializable dict: name -> {labels -> value or histogram stats}."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.summary() for metric in sorted(metrics, key=lambda m: m.name)}
+
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.prometheus())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _atomic_write(path: str, text: str) -> None:
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_json_summary(path: str, extra: Optional[Dict[str, Any]] = None, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Writes the registry summary, plus any `extra` run-level fields, as JSON.
+
+    Args:
+        path: Destination file.
+        extra: Fields merged at the top level (e.g. run id, duration).
+        registry: The registry to dump.
+    """
+    data = dict(extra or {})
+    data["metrics"] = registry.summary()
+    _atomic_write(path, json.dumps(data, indent=2, default=str))
+
+
+class PrometheusFileExporter:
+    """
+    Periodically writes the registry in Prometheus text format to a file, e.g. for the
+    node_exporter textfile collector. Writes are atomic, so scrapers never see a partial file.
+    """
+
+    def __init__(self, path: str, interval: float = 15, registry: MetricsRegistry = REGISTRY):
+        """
+        Args:
+            path: Destination file (conventionally ending in `.prom`).
+            interval: Seconds between writes.
+            registry: The registry to export.
+        """
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        _atomic_write(self.path, self.registry.to_prometheus())
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError:
+                pass
+
+    def start(self) -> "PrometheusFileExporter":
+        self._thread = threading.Thread(target=self._loop, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the background writer and writes the final values."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+        self.write()
+
+    def __repr__(self):
+        return f"PrometheusFileExporter(path={self.path}, interval={self.interval})"
@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.utils.disk_cache import DiskCache
+
+
+class PageCache:
+    """
+    On-disk cache of fetched web pages, storing the raw body and the extracted text.
+
+    Entries younger than `ttl` seconds are served without touching the network. Older
+    entries are revalidated with `If-None-Match`/`If-Modified-Since` when the server sent
+    an ETag or Last-Modified header, so an unchanged page costs only a 304 response.
+    """
+
+    def __init__(self, path: str = ".cache/pages.sqlite", ttl: float = 86400, max_size_mb: Optional[float] = 1024):
+        """
+        Args:
+            path: Path of the SQLite database file.
+            ttl: Seconds an entry is served without revalidation.
+            max_size_mb: Size cap of the cache; least recently used pages are evicted first.
+        """
+        self.ttl = ttl
+        self.store = DiskCache(path, max_size_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else None)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached entry for `url`, or None if the page was never cached.
+        """
+        value = self.store.get(url)
+        return json.loads(value) if value is not None else None
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """Whether `entry` is still within its TTL."""
+        return time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    @staticmethod
+    def revalidation_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Conditional request headers for a stale `entry`."""
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store_response(self, url: str, response: Any, text: Optional[str]) -> None:
+        """
+        Caches a successful response and the text extracted from it.
+        """
+        entry = {
+            "body": response.text,
+            "text": text,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self.store.set(url, json.dumps(entry, ensure_ascii=False))
+
+    def refresh(self, url: str, entry: Dict[str, Any]) -> None:
+        """
+        Restarts the TTL of an entry after the server confirmed it is unchanged.
+        """
+        entry["fetched_at"] = time.time()
+        self.store.set(url, json.dumps(entry, ensure_ascii=False))
+
+    def record(self, outcome: str) -> None:
+        """Counts a lookup outcome: 'hit', 'revalidated' or 'miss'."""
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "revalidated":
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit counters and the size of the cache.
+        A revalidated page counts as a hit because its body was not downloaded again.
+        """
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.misses
+            stats = {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            }
+        store_stats = self.store.stats()
+        stats["entries"] = store_stats["entries"]
+        stats["size_bytes"] = store_stats["size_bytes"]
+        return stats
+
+    def __repr__(self):
+        return f"PageCache(path={self.store.path}, ttl={self.ttl})"
@@ -0,0 +1,138 @@
+import ast
+import json
+import re
+from typing import Any, List, Optional, Tuple, Type, Union
+
+from src.utils.metrics import REGISTRY
+
+_DECODER = json.JSONDecoder()
+_FENCE_OPEN = re.compile(r"```[\w-]*[ \t]*\n?")
+
+
+class ParseResult:
+    """
+    Items recovered from an LLM response.
+
+    Attributes:
+        items: The parsed items, in order.
+        salvaged: Number of items recovered from an incomplete (e.g. truncated) array; 0 if it was complete.
+        complete: Whether the whole array was parsed.
+    """
+
+    def __init__(self, items: List[Any], salvaged: int = 0, complete: bool = True):
+        self.items = items
+        self.salvaged = salvaged
+        self.complete = complete
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+    def __repr__(self):
+        return f"ParseResult(items={len(self.items)}, salvaged={self.salvaged}, complete={self.complete})"
+
+
+def fenced_block(text: str) -> Optional[str]:
+    """
+    Returns the body of the first markdown code block in `text`, or None if there is none.
+    A block whose closing fence is missing (a truncated response) runs to the end of the text.
+    """
+    match = _FENCE_OPEN.search(text)
+    if match is None:
+        return None
+    end = text.find("```", match.end())
+    return text[match.end():] if end == -1 else text[match.end():end]
+
+
+def _candidates(text: str) -> List[str]:
+    """The fenced block first, if any, then the whole text."""
+    body = fenced_block(text)
+    return [body, text] if body is not None else [text]
+
+
+def _salvage_array(text: str, start: int) -> Tuple[List[Any], bool]:
+    """
+    Decodes the items of the JSON array opening at `text[start]` one at a time, stopping
+    at the first item that cannot be decoded.
+
+    Returns:
+        Tuple[List[Any], bool]: The decoded items and whether the closing bracket was reached.
+    """
+    items = []
+    pos = start + 1
+    length = len(text)
+    while pos < length:
+        char = text[pos]
+        if char in " \t\r\n,":
+            pos += 1
+            continue
+        if char == "]":
+            return items, True
+        try:
+            item, pos = _DECODER.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        items.append(item)
+    return items, False
+
+
+def _literal_array(text: str, start: int) -> Optional[list]:
+    """Parses a Python list literal (e.g. single-quoted strings) opening at `text[start]`."""
+    end = text.rfind("]")
+    if end <= start:
+        return None
+    try:
+        value = ast.literal_eval(text[start:end + 1])
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None
+    return value if isinstance(value, list) else None
+
+
+def parse_json_array(text: str, item_type: Union[Type, Tuple[Type, ...], None] = None) -> ParseResult:
+    """
+    Parses a JSON array from an LLM response without evaluating it.
+
+    Handles a bare array, an array in a markdown code block, an array surrounded by prose,
+    a Python list literal, and an array cut off mid-way: in the last case every complete
+    item before the cut is kept and counted as salvaged.
+
+    Args:
+        text: The raw response.
+        item_type: If given, items that are not instances of this type are dropped.
+
+    Returns:
+        ParseResult: The recovered items. Empty if no array was found.
+    """
+    result = _parse_json_array(text, item_type)
+    outcome = "empty" if not result else ("complete" if result.complete else "salvaged")
+    REGISTRY.counter("datagen_parse_results_total", "Parsed LLM responses by outcome.").inc(outcome=outcome)
+    if result.salvaged:
+        REGISTRY.counter("datagen_parse_salvaged_items_total", "Items recovered from incomplete responses.").inc(result.salvaged)
+    return result
+
+
+def _parse_json_array(text: str, item_type: Union[Type, Tuple[Type, ...], None]) -> ParseResult:
+    if not text:
+        return ParseResult([], complete=False)
+    for candidate in _candidates(text):
+        start = candidate.find("[")
+        while start != -1:
+            try:
+                value, _ = _DECODER.raw_decode(candidate, start)
+            except json.JSONDecodeError:
+                value = _literal_array(candidate, start)
+            if isinstance(value, list):
+                items, closed = _filter(value, item_type), True
+            else:
+                items, closed = _salvage_array(candidate, start)
+                items = _filter(items, item_type)
+            # Brackets in prose (e.g. "[1]") yield nothing usable; keep looking after them
+            if items:
+                return ParseResult(items, salvaged=0 if closed else len(items), complete=closed)
+            start = candidate.find("[", start + 1)
+    return ParseResult([], complete=False)
+
+
+def _filter(items: List[Any], item_type: Union[Type, Tuple[Type, ...], None]) -> List[Any]:
+    if item_type is None:
+        return items
+    return [item for item in items if isinstance(item, item_type)]
@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+def estimate_tokens(messages: List[Dict[Any, Any]], **kwargs) -> int:
+    """
+    Roughly estimates the number of tokens a request will consume.
+    Uses ~4 characters per token for the prompt plus the requested output budget, if any.
+
+    Args:
+        messages: The chat messages sent to the model.
+        **kwargs: Generation arguments; `max_tokens`, `max_new_tokens` or `max_output_tokens` are counted.
+
+    Returns:
+        int: Estimated number of tokens.
+    """
+    prompt_chars = sum(len(str(msg.get("content", ""))) for msg in messages)
+    output_tokens = 0
+    for key in ("max_tokens", "max_new_tokens", "max_output_tokens"):
+        if kwargs.get(key):
+            output_tokens = int(kwargs[key])
+            break
+    return max(1, prompt_chars // 4) + output_tokens
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate_per_minute`.
+    Reservations may drive the balance negative; the caller then waits until it is repaid,
+    which paces concurrent callers in the order they arrived.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive.")
+        self.rate = rate_per_minute / 60.0
+        # Default burst is ten seconds' worth of quota
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Takes `amount` tokens from the bucket.
+
+        Returns:
+            float: Seconds the caller must wait before the reservation is covered.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """
+    Client-side limiter enforcing requests-per-minute and tokens-per-minute quotas.
+    A single instance is safe to share between threads and event loops.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        request_burst: Optional[float] = None,
+        token_burst: Optional[float] = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute, request_burst) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, token_burst) if tokens_per_minute else None
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Reserves capacity for one request of `tokens` tokens.
+
+        Returns:
+            float: Seconds to wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None and tokens:
+                wait = max(wait, self.tokens.reserve(tokens, now))
+            return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Blocks the calling thread until the request fits within the quota."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        """Suspends the calling coroutine until the request fits within the quota."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def __repr__(self):
+        rpm = self.requests.rate * 60 if self.requests else None
+        tpm = self.tokens.rate * 60 if self.tokens else None
+        return f"RateLimiter(requests_per_minute={rpm}, tokens_per_minute={tpm})"
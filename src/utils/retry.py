@@ -0,0 +1,372 @@
+import email.utils
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.metrics import REGISTRY
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+# Errors that retrying the same request cannot fix, unless they carry a retryable status
+FATAL_ERRORS = (
+    ValueError, TypeError, KeyError, AttributeError, NotImplementedError,
+    PermissionError, FileNotFoundError, IsADirectoryError, NotADirectoryError,
+)
+# Network errors without an HTTP status that are worth retrying
+TRANSIENT_ERRORS = (TimeoutError, ConnectionError, socket.gaierror, socket.herror)
+# Longest server-requested delay that is honoured as is
+MAX_RETRY_AFTER = 600.0
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """
+    Finds the HTTP status of a provider error: `status_code`/`code` on the exception
+    (google-api-core, google-genai) or on its `response` (requests, huggingface_hub).
+
+    Args:
+        error: The raised exception.
+
+    Returns:
+        Optional[int]: The status, or None if the error does not carry one.
+    """
+    for source in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "code", "status"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int) and not isinstance(value, bool) and 100 <= value < 600:
+                return value
+    return None
+
+
+def parse_delay(value: Any) -> Optional[float]:
+    """Seconds from a Retry-After value: a number of seconds, an HTTP date or e.g. '12s'."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value[:-1] if value.endswith("s") else value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    The delay requested by the server, from a `retry_after` attribute or the `Retry-After`
+    header of the error's response.
+
+    Args:
+        error: The raised exception.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the server did not say.
+    """
+    delay = parse_delay(getattr(error, "retry_after", None))
+    if delay is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers is not None:
+            try:
+                delay = parse_delay(headers.get("Retry-After") or headers.get("retry-after"))
+            except AttributeError:
+                delay = None
+    return delay
+
+
+def classify_error(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Decides whether a failed call is worth retrying.
+
+    Errors with an HTTP status are retryable for timeouts, conflicts, rate limits and
+    server errors, and fatal otherwise (bad request, auth, not found). Without a status,
+    timeouts, connection and socket errors are retryable, and programming, input and local
+    file errors (`FATAL_ERRORS`, e.g. a missing service-account file) are fatal. Anything
+    else is retried, as SDKs often raise generic exceptions for transient failures.
+
+    Args:
+        error: The raised exception.
+
+    Returns:
+        Tuple[bool, Optional[float]]: Whether to retry, and the server-requested delay in seconds.
+    """
+    status = status_code(error)
+    if status is not None:
+        retryable = status in RETRYABLE_STATUS or (status >= 500 and status != 501)
+    elif isinstance(error, TRANSIENT_ERRORS):
+        retryable = True
+    else:
+        retryable = not isinstance(error, FATAL_ERRORS)
+    return retryable, retry_after(error)
+
+
+class CircuitBreaker:
+    """
+    Pauses every caller of one provider during an outage.
+
+    After `failure_threshold` consecutive retryable failures the circuit opens and callers
+    block in `acquire` for `recovery_time` seconds. Then a single probe call is let through:
+    if it succeeds the circuit closes, otherwise it stays open for twice as long (up to
+    `max_recovery_time`). A server-requested delay (`hold`) pauses callers the same way.
+    Thread-safe.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_time: float = 30.0, max_recovery_time: float = 300.0, logger=None):
+        """
+        Args:
+            name: Provider the breaker protects, for logs and metrics.
+            failure_threshold: Consecutive retryable failures that open the circuit.
+            recovery_time: Seconds the circuit stays open before a probe.
+            max_recovery_time: Upper bound of the doubling recovery time.
+            logger: Optional logger for state changes.
+        """
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.recovery_time = recovery_time
+        self.max_recovery_time = max_recovery_time
+        self.logger = logger
+        self.state = "closed"
+        self.failures = 0
+        self.opened = 0
+        self._open_for = recovery_time
+        self._reopen_at = 0.0
+        self._held_until = 0.0
+        self._probe_started = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Blocks while the circuit is open or held, then returns once the call may proceed."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now < self._held_until:
+                    self._cond.wait(self._held_until - now)
+                elif self.state == "closed":
+                    return
+                elif self.state == "open" and now >= self._reopen_at:
+                    self.state = "half_open"
+                    self._probe_started = now
+                    return
+                elif self.state == "half_open" and now - self._probe_started >= self._open_for:
+                    # The probe never reported back (e.g. a hung call): let another one through
+                    self._probe_started = now
+                    return
+                else:
+                    wake = self._reopen_at if self.state == "open" else self._probe_started + self._open_for
+                    self._cond.wait(max(0.01, wake - now))
+
+    def record_success(self) -> None:
+        """Records a call that reached the provider, closing the circuit."""
+        with self._cond:
+            if self.state != "closed" and self.logger:
+                self.logger.info(f"Circuit for {self.name} closed; resuming calls.")
+            self.state = "closed"
+            self.failures = 0
+            self._open_for = self.recovery_time
+            self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        """Records a retryable failure, opening the circuit once the threshold is reached."""
+        with self._cond:
+            self.failures += 1
+            if self.state == "half_open":
+                self._open_for = min(self.max_recovery_time, self._open_for * 2)
+            elif self.state == "open" or self.failures < self.failure_threshold:
+                return
+            self.state = "open"
+            self.opened += 1
+            self._reopen_at = time.monotonic() + self._open_for
+            REGISTRY.counter("datagen_circuit_opened_total", "Times a provider circuit breaker opened.").inc(provider=self.name)
+            if self.logger:
+                self.logger.warning(f"{self.failures} consecutive failures from {self.name}; pausing calls for {self._open_for:.0f}s.")
+            self._cond.notify_all()
+
+    def hold(self, seconds: float) -> None:
+        """Pauses all callers for `seconds`, e.g. for a server-requested Retry-After."""
+        with self._cond:
+            self._held_until = max(self._held_until, time.monotonic() + seconds)
+
+    def __repr__(self):
+        return f"CircuitBreaker(name={self.name}, state={self.state}, failure_threshold={self.failure_threshold}, recovery_time={self.recovery_time})"
+
+
+class RetryBudget:
+    """
+    Run-wide cap on retries: at most `min_retries` plus `ratio` times the number of first
+    attempts, so a failing endpoint cannot multiply the number of calls a run makes.
+    Thread-safe.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        """
+        Args:
+            ratio: Retries allowed per first attempt.
+            min_retries: Retries always allowed, so short runs can still retry.
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.denied = 0
+
+    def record_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+
+    def try_spend(self) -> bool:
+        """Takes one retry from the budget; False if it is used up."""
+        with self._lock:
+            if self.retries + 1 > self.min_retries + self.ratio * self.calls:
+                self.denied += 1
+                return False
+            self.retries += 1
+            return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = self.retries = self.denied = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "retries": self.retries, "denied": self.denied}
+
+    def __repr__(self):
+        return f"RetryBudget(ratio={self.ratio}, min_retries={self.min_retries})"
+
+
+RETRY_BUDGET = RetryBudget()
+_breakers: Dict[str, CircuitBreaker] = {}
+_breaker_settings: Dict[str, Any] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(key: str, logger=None) -> CircuitBreaker:
+    """
+    Returns the shared circuit breaker for `key`, creating it on first use.
+
+    Args:
+        key: Usually the provider name.
+        logger: Optional logger for state changes, used when the breaker is created.
+
+    Returns:
+        CircuitBreaker: The shared breaker.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(key, logger=logger, **_breaker_settings)
+        return breaker
+
+
+def configure_retries(retry_cfg: Optional[Dict[str, Any]]) -> None:
+    """
+    Applies the `retry` config section: `budget` (ratio of retries to calls, default `0.2`),
+    `min_retries` (default `10`) and `circuit_breaker` settings (`failure_threshold`,
+    `recovery_time`, `max_recovery_time`). Existing breakers are replaced.
+
+    Args:
+        retry_cfg: The config section, or None for the defaults.
+    """
+    retry_cfg = retry_cfg or {}
+    RETRY_BUDGET.ratio = retry_cfg.get("budget", 0.2)
+    RETRY_BUDGET.min_retries = retry_cfg.get("min_retries", 10)
+    RETRY_BUDGET.reset()
+    with _breakers_lock:
+        _breaker_settings.clear()
+        _breaker_settings.update(retry_cfg.get("circuit_breaker") or {})
+        _breakers.clear()
+
+
+def retry_call(
+    func: Callable,
+    *args: Any,
+    max_retries: int = 3,
+    base_delay: float = 1,
+    max_delay: float = 10,
+    exceptions: Tuple = (Exception,),
+    classify: Optional[Callable[[BaseException], Tuple[bool, Optional[float]]]] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    budget: Optional[RetryBudget] = RETRY_BUDGET,
+    logger=None,
+    **kwargs: Any,
+) -> Any:
+    """
+    Calls `func`, retrying retryable failures with jittered exponential backoff.
+
+    Fatal errors are raised at once. A server-requested delay replaces the backoff delay and
+    pauses every caller sharing `breaker`. Each retry is taken from `budget`; when it is used
+    up the error is raised instead of retried.
+
+    Args:
+        func: The function to call.
+        *args, **kwargs: Arguments to pass to func.
+        max_retries: Maximum number of attempts.
+        base_delay: Initial delay in seconds.
+        max_delay: Maximum backoff delay in seconds.
+        exceptions: Exception classes that are considered for retrying; others propagate.
+        classify: Maps an error to (retryable, retry_after). Defaults to `classify_error`.
+        breaker: Optional circuit breaker of the called provider.
+        budget: Optional run-wide retry budget.
+        logger: Optional logger for warnings.
+
+    Returns:
+        The result of func(*args, **kwargs) if successful.
+
+    Raises:
+        The last exception if the error is fatal, the retries or the budget are used up.
+    """
+    classify = classify or classify_error
+    name = getattr(func, "__qualname__", type(func).__name__)
+    if budget is not None:
+        budget.record_call()
+    for attempt in range(1, max_retries + 1):
+        if breaker is not None:
+            breaker.acquire()
+        try:
+            result = func(*args, **kwargs)
+        except exceptions as e:
+            retryable, server_delay = classify(e)
+            if breaker is not None and retryable:
+                breaker.record_failure()
+            elif breaker is not None:
+                # A fatal error still means the provider answered
+                breaker.record_success()
+            if not retryable:
+                REGISTRY.counter("datagen_retries_denied_total", "Failed calls not retried, by reason.").inc(function=name, reason="fatal")
+                if logger:
+                    logger.error(f"Not retrying {type(e).__name__}: {e}")
+                raise
+            if attempt == max_retries:
+                REGISTRY.counter("datagen_retries_exhausted_total", "Calls that failed after every retry.").inc(function=name)
+                if logger:
+                    logger.error(f"Max retries reached. Raising exception: {e}")
+                raise
+            if budget is not None and not budget.try_spend():
+                REGISTRY.counter("datagen_retries_denied_total", "Failed calls not retried, by reason.").inc(function=name, reason="budget")
+                if logger:
+                    logger.error(f"Retry budget of the run is used up. Raising exception: {e}")
+                raise
+            REGISTRY.counter("datagen_retries_total", "Retried attempts in backoff_retry.").inc(function=name, error=type(e).__name__)
+            if server_delay is not None:
+                delay = min(server_delay, MAX_RETRY_AFTER)
+                if breaker is not None:
+                    breaker.hold(delay)
+            else:
+                backoff = min(base_delay * 2 ** (attempt - 1), max_delay)
+                delay = random.uniform(backoff / 2, backoff)
+            if logger:
+                logger.warning(f"Attempt {attempt} failed: {e}. Retrying in {delay:.1f}s...")
+            time.sleep(delay)
+        else:
+            if breaker is not None:
+                breaker.record_success()
+            return result
@@ -0,0 +1,184 @@
+from html.parser import HTMLParser
+from typing import List, Optional, Union
+
+try:
+    from lxml import etree as _lxml_etree
+except ImportError:  # pragma: no cover - optional dependency
+    _lxml_etree = None
+
+# Elements whose text is never part of the main content
+SKIP_TAGS = {
+    "script", "style", "noscript", "head", "title", "meta", "template", "svg",
+    "header", "footer", "nav", "aside",
+}
+# Elements that never have children or an end tag
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+}
+# Semantic containers preferred over any <div>, in order of preference
+SEMANTIC_TAGS = ("article", "main")
+
+
+class _Element:
+    __slots__ = ("tag", "start", "text_len", "link_len", "skip", "in_link")
+
+    def __init__(self, tag: str, start: int, skip: bool, in_link: bool):
+        self.tag = tag
+        self.start = start
+        self.text_len = 0
+        self.link_len = 0
+        self.skip = skip
+        self.in_link = in_link
+
+
+class MainTextBuilder:
+    """
+    Parser target that picks the main content of a page in a single pass.
+
+    Visible text is appended once to a flat list of segments. Every open element records
+    where its segments start and accumulates its text and link-text lengths, which are
+    added to the parent when it closes, so the cost is linear in the page size however
+    deeply elements are nested. Implements the lxml target interface
+    (`start`, `end`, `data`, `close`) and is driven by `html.parser` otherwise.
+    """
+
+    def __init__(self):
+        self.segments: List[str] = []
+        self._stack = [_Element("[document]", 0, False, False)]
+        self._semantic = {}  # tag -> (start, end) of the first occurrence
+        self._best_div = None  # (score, start, end)
+        self._pending: List[str] = []  # adjacent text events, e.g. split at entity references
+
+    def start(self, tag: str, attrib=None) -> None:
+        self._flush_text()
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in VOID_TAGS:
+            return
+        parent = self._stack[-1]
+        self._stack.append(_Element(tag, len(self.segments), parent.skip or tag in SKIP_TAGS, parent.in_link or tag == "a"))
+
+    def end(self, tag: str) -> None:
+        self._flush_text()
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in VOID_TAGS:
+            return
+        # Close implicitly open elements up to the matching start tag, ignoring stray end tags
+        for depth in range(len(self._stack) - 1, 0, -1):
+            if self._stack[depth].tag == tag:
+                while len(self._stack) > depth:
+                    self._close_top()
+                return
+
+    def data(self, text: str) -> None:
+        if not self._stack[-1].skip:
+            self._pending.append(text)
+
+    def _flush_text(self) -> None:
+        if not self._pending:
+            return
+        element = self._stack[-1]
+        text = "".join(self._pending).strip()
+        self._pending = []
+        if not text:
+            return
+        self.segments.append(text)
+        element.text_len += len(text)
+        if element.in_link:
+            element.link_len += len(text)
+
+    def _close_top(self) -> None:
+        element = self._stack.pop()
+        parent = self._stack[-1]
+        parent.text_len += element.text_len
+        parent.link_len += element.link_len
+        if element.skip:
+            return
+        end = len(self.segments)
+        if element.tag in SEMANTIC_TAGS and element.tag not in self._semantic:
+            self._semantic[element.tag] = (element.start, end)
+        elif element.tag == "div":
+            # Text density score: visible text that is not link text
+            score = element.text_len - element.link_len
+            if self._best_div is None or score > self._best_div[0] or (score == self._best_div[0] and element.start < self._best_div[1]):
+                self._best_div = (score, element.start, end)
+
+    def close(self) -> str:
+        self._flush_text()
+        while len(self._stack) > 1:
+            self._close_top()
+        for tag in SEMANTIC_TAGS:
+            if tag in self._semantic:
+                start, end = self._semantic[tag]
+                return "\n".join(self.segments[start:end])
+        if self._best_div is not None:
+            _, start, end = self._best_div
+            return "\n".join(self.segments[start:end])
+        return ""
+
+
+class _StdlibDriver(HTMLParser):
+    """Feeds `html.parser` events into a `MainTextBuilder`."""
+
+    def __init__(self, target: MainTextBuilder):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag)
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def _decode(content: bytes) -> str:
+    for encoding in ("utf-8", "cp1252"):
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return content.decode("latin-1")
+
+
+def default_parser() -> str:
+    """Returns the fastest available backend: 'lxml' if installed, else 'html.parser'."""
+    return "lxml" if _lxml_etree is not None else "html.parser"
+
+
+def extract_main_text(html: Union[str, bytes], parser: Optional[str] = None) -> str:
+    """
+    Extracts the main textual content of an HTML page in a single pass.
+    Prefers the first <article>, then the first <main>, then the <div> with the most
+    visible non-link text. Scripts, styles, headers, footers, navigation and asides are ignored.
+
+    Args:
+        html: The page markup.
+        parser: 'lxml' or 'html.parser'. Defaults to lxml when it is installed.
+
+    Returns:
+        The extracted text with one text fragment per line, or '' if nothing was found.
+    """
+    parser = parser or default_parser()
+    builder = MainTextBuilder()
+    if parser == "lxml":
+        if _lxml_etree is None:
+            raise ValueError("The 'lxml' parser backend requires lxml to be installed.")
+        encoding = None
+        if isinstance(html, str):
+            html, encoding = html.encode("utf-8"), "utf-8"
+        lxml_parser = _lxml_etree.HTMLParser(target=builder, encoding=encoding, remove_comments=True, remove_pis=True)
+        lxml_parser.feed(html)
+        return lxml_parser.close()
+    if parser == "html.parser":
+        driver = _StdlibDriver(builder)
+        driver.feed(_decode(html) if isinstance(html, bytes) else html)
+        driver.close()
+        return builder.close()
+    raise ValueError(f"Unsupported parser backend: {parser}")
@@ -1,17 +1,24 @@
-import time
-import random
 import requests
 import json
-import re
-from bs4 import BeautifulSoup, Comment
+from contextlib import nullcontext
+from src.utils.text_extraction import extract_main_text
+from src.utils.parsing import fenced_block
+from src.utils.metrics import REGISTRY
+from src.utils.retry import get_circuit_breaker, retry_call
 
 def backoff_retry(func, max_retries=3, base_delay=1, max_delay=10, exceptions=(Exception,), logger=None, *args, **kwargs):
     """
-    Retry a function with exponential backoff.
+    Retry a function with exponential backoff, retrying only errors worth retrying.
+
+    When `func` is a bound method, its owner's `classify_error` (see `BaseLLM.classify_error`)
+    decides which errors are retryable, and calls are paused by the circuit breaker shared by
+    every caller of the same provider (keyed on `provider_name`, else the owner's class name).
+    Server-requested delays (Retry-After) are honoured, and every retry is taken from the
+    run-wide retry budget. See `src.utils.retry.retry_call`.
 
     Args:
         func: The function to call.
-        max_retries: Maximum number of retries.
+        max_retries: Maximum number of attempts.
         base_delay: Initial delay in seconds.
         max_delay: Maximum delay in seconds.
         exceptions: Tuple of exception classes to catch.
@@ -22,96 +29,100 @@ def backoff_retry(func, max_retries=3, base_delay=1, max_delay=10, exceptions=(E
         The result of func(*args, **kwargs) if successful.
 
     Raises:
-        The last exception if all retries fail.
+        The last exception if the error is fatal or all retries fail.
     """
-    delay = base_delay
-    for attempt in range(1, max_retries + 1):
-        try:
-            return func(*args, **kwargs)
-        except exceptions as e:
-            if attempt == max_retries:
-                if logger:
-                    logger.error(f"Max retries reached. Raising exception: {e}")
-                raise
-            if logger:
-                logger.warning(f"Attempt {attempt} failed: {e}. Retrying in {delay:.1f}s...")
-            time.sleep(delay + random.uniform(0, 0.5))
-            delay = min(delay * 2, max_delay)
-
+    owner = getattr(func, "__self__", None)
+    classify = getattr(owner, "classify_error", None) if owner is not None else None
+    breaker = None
+    if owner is not None:
+        breaker = get_circuit_breaker(getattr(owner, "provider_name", type(owner).__name__), logger=logger)
+    return retry_call(
+        func,
+        *args,
+        max_retries=max_retries,
+        base_delay=base_delay,
+        max_delay=max_delay,
+        exceptions=exceptions,
+        classify=classify if callable(classify) else None,
+        breaker=breaker,
+        logger=logger,
+        **kwargs,
+    )
 
-def is_visible_text(element):
-    """Filter function to exclude invisible or script/style text."""
-    if element.parent.name in ['style', 'script', 'head', 'title', 'meta', '[document]']:
-        return False
-    if isinstance(element, Comment):
-        return False
-    return True
 
-def extract_main_text(soup):
-    """
-    Attempts to extract the main textual content from a parsed HTML soup.
-    Prioritizes <article>, <main>, and the largest div by text content.
+def parse_main_text(content, parser=None):
     """
-    # Try common semantic containers
-    for tag in ['article', 'main']:
-        section = soup.find(tag)
-        if section:
-            texts = section.find_all(string=True)
-            visible_texts = filter(is_visible_text, texts)
-            return '\n'.join(t.strip() for t in visible_texts if t.strip())
+    Parses HTML content and extracts meaningful text.
 
-    # Fallback: choose the <div> with the most visible text
-    divs = soup.find_all('div')
-    max_text = ''
-    for div in divs:
-        texts = div.find_all(string=True)
-        visible_texts = list(filter(is_visible_text, texts))
-        combined = '\n'.join(t.strip() for t in visible_texts if t.strip())
-        if len(combined) > len(max_text):
-            max_text = combined
+    Args:
+        content: The raw HTML (bytes or str).
+        parser: Optional parser backend ('lxml' or 'html.parser'); lxml is used when installed.
 
-    return max_text
+    Returns:
+        A string containing the main textual content of the page, or None if nothing was found.
+    """
+    text_content = extract_main_text(content, parser=parser)
+    return text_content if text_content.strip() else None
 
-def fetch_and_parse(url):
+def fetch_and_parse(url, session=None, timeout=10, cache=None, slot=None):
     """
-    Fetches the content of a URL, parses it using BeautifulSoup, and extracts meaningful text.
+    Fetches the content of a URL, parses it, and extracts meaningful text.
 
     Args:
         url: The URL to fetch.
+        session: Optional `requests.Session` to reuse pooled connections.
+        timeout: Request timeout in seconds.
+        cache: Optional `PageCache`. Fresh entries are returned without a request and
+            stale ones are revalidated with their ETag/Last-Modified validators.
+        slot: Optional context manager (e.g. a per-host semaphore) held around the request
+            only, so fresh cache hits never wait for it.
 
     Returns:
         A string containing the main textual content of the page, or None if an error occurs.
     """
+    fetches = REGISTRY.counter("datagen_fetch_requests_total", "Page fetches by outcome.")
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Remove unwanted elements
-        for tag in soup(['script', 'style', 'noscript', 'header', 'footer', 'nav', 'aside']):
-            tag.decompose()
+        entry = cache.lookup(url) if cache is not None else None
+        if entry is not None and cache.is_fresh(entry):
+            cache.record("hit")
+            fetches.inc(outcome="cache_hit")
+            return entry["text"]
 
-        text_content = extract_main_text(soup)
-        return text_content if text_content.strip() else None
+        headers = cache.revalidation_headers(entry) if cache is not None else {}
+        with slot or nullcontext(), REGISTRY.histogram("datagen_fetch_latency_seconds", "Latency of page downloads.").time():
+            response = (session or requests).get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            cache.refresh(url, entry)
+            cache.record("revalidated")
+            fetches.inc(outcome="revalidated")
+            return entry["text"]
+        response.raise_for_status()
+        with REGISTRY.histogram("datagen_parse_page_seconds", "Time spent extracting the main text of a page.").time():
+            text_content = parse_main_text(response.content)
+        if cache is not None:
+            cache.store_response(url, response, text_content)
+            cache.record("miss")
+        fetches.inc(outcome="ok")
+        return text_content
 
     except requests.exceptions.RequestException as e:
+        fetches.inc(outcome="fetch_error")
         print(f"Error fetching URL: {e}")
         return None
     except Exception as e:
+        fetches.inc(outcome="parse_error")
         print(f"Error parsing content: {e}")
         return None
     
 def extract_json_from_markdown(md_text):
     """
     Extract JSON content from a markdown-formatted code block.
+    Kept for backwards compatibility; new code should use `src.utils.parsing`.
     """
-    # Use regex to remove triple backticks and optional language identifier
-    match = re.search(r"```(?:json)?\s*(.*?)```", md_text, re.DOTALL)
-    if match:
-        json_str = match.group(1).strip()
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON format: {e}")
-    else:
-        return None
\ No newline at end of file
+    json_str = fenced_block(md_text)
+    if json_str is None:
+        return None
+    try:
+        return json.loads(json_str.strip())
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON format: {e}")
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from duckduckgo_search import DDGS
+
+from src.utils.disk_cache import DiskCache
+from src.utils.utils import backoff_retry
+
+
+class WebSearcher:
+    """
+    Runs DuckDuckGo text searches, with an optional persistent query-to-results cache.
+    It is safe to call from several threads, e.g. the workers of a `StagePipeline` search
+    stage, each of which gets its own DDGS client.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_results: int = 1,
+        max_retries: int = 3,
+        cache: Optional[Dict] = None,
+        logger=None,
+    ):
+        """
+        Args:
+            concurrency: Number of searches callers run at once.
+            max_results: Number of results requested per query.
+            max_retries: Attempts per query before giving up on it.
+            cache: Optional cache settings (`path`, `ttl` in seconds, `max_size_mb`).
+            logger: Optional logger for warnings.
+        """
+        self.concurrency = max(1, int(concurrency))
+        self.max_results = max_results
+        self.max_retries = max_retries
+        self.logger = logger
+        self.ttl = None
+        self.cache = None
+        if cache:
+            max_size_mb = cache.get("max_size_mb")
+            self.cache = DiskCache(
+                cache.get("path", ".cache/search.sqlite"),
+                max_size_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else None,
+            )
+            self.ttl = cache.get("ttl", 7 * 24 * 3600)
+        self._local = threading.local()
+
+    def _engine(self) -> "DDGS":
+        """One DDGS client per worker thread."""
+        engine = getattr(self._local, "engine", None)
+        if engine is None:
+            # Imported on first search, so runs served entirely from the cache never load it
+            from duckduckgo_search import DDGS
+            engine = DDGS()
+            self._local.engine = engine
+        return engine
+
+    def search(self, query: str) -> List[Dict]:
+        """
+        Searches a single query, serving it from the cache when possible.
+
+        Args:
+            query: The search query.
+
+        Returns:
+            List[Dict]: Search results with `title`, `href` and `body` keys.
+        """
+        key = f"{self.max_results}:{query}"
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                entry = json.loads(cached)
+                if self.ttl is None or time.time() - entry["searched_at"] < self.ttl:
+                    return entry["results"]
+        results = backoff_retry(
+            self._engine().text,
+            max_retries=self.max_retries,
+            base_delay=1,
+            max_delay=8,
+            exceptions=(Exception,),
+            logger=self.logger,
+            keywords=query,
+            max_results=self.max_results,
+        ) or []
+        if self.cache is not None:
+            self.cache.set(key, json.dumps({"results": results, "searched_at": time.time()}, ensure_ascii=False))
+        return results
+
+    def stats(self) -> Optional[Dict]:
+        """Hit/miss counters of the search cache, or None if caching is off."""
+        return self.cache.stats() if self.cache is not None else None
+
+    def __repr__(self):
+        return f"WebSearcher(concurrency={self.concurrency}, max_results={self.max_results})"
+
+
+def deduplicate_urls(query_results: List[Dict], seen: Optional[set] = None) -> List[Dict]:
+    """
+    Drops results whose URL was already returned for an earlier query, so each page
+    is fetched and prompted at most once.
+
+    Args:
+        query_results: `{"query", "results"}` dicts, `results` as returned by `WebSearcher.search`.
+        seen: Optional set of URLs already used; it is updated in place, which allows
+            deduplicating results incrementally as they arrive.
+
+    Returns:
+        List[Dict]: The same queries with duplicate results removed.
+    """
+    seen = set() if seen is None else seen
+    deduplicated = []
+    for item in query_results:
+        unique = []
+        for result in item.get("results", []):
+            url = result.get("href", "")
+            if url and url in seen:
+                continue
+            seen.add(url)
+            unique.append(result)
+        deduplicated.append({**item, "results": unique})
+    return deduplicated
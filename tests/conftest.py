@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture
+def mock_config(tmp_path):
+    """
+    Returns a factory for run configs on the mock provider that write to `tmp_path`.
+    Each keyword names a config section whose keys override the defaults, e.g.
+    `mock_config(model={"error_rate": 1.0}, output={"format": "csv"})`.
+    """
+
+    def make(**sections):
+        config = {
+            "model": {"provider": "mock", "model_name": "mock", "seed": 1},
+            "task": {"type": "mlm", "domain": "AI", "num_records": 20},
+            "output": {"folder": str(tmp_path), "format": "jsonl"},
+        }
+        for section, overrides in sections.items():
+            config[section] = {**config.get(section, {}), **overrides}
+        return config
+
+    return make
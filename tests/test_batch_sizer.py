@@ -0,0 +1,88 @@
+from src.utils.batch_sizer import AdaptiveBatchSizer
+
+
+def test_complete_batches_grow_additively():
+    sizer = AdaptiveBatchSizer(initial=10, step=5, max_size=30)
+    for expected in (15, 20, 25, 30, 30):
+        sizer.record(sizer.size(), sizer.size())
+        assert sizer.size() == expected
+    # A batch smaller than the current size does not prove the size works
+    sizer = AdaptiveBatchSizer(initial=20, step=5)
+    sizer.record(10, 10)
+    assert sizer.size() == 20
+
+
+def test_failed_batches_back_off_multiplicatively():
+    sizer = AdaptiveBatchSizer(initial=40, min_size=5, decrease=0.5)
+    sizer.record(40, 0)
+    assert sizer.size() == 20
+    for _ in range(5):
+        sizer.record(sizer.size(), 0)
+    assert sizer.size() == 5
+    assert sizer.stats()["failed"] == 6
+
+
+def test_truncated_batches_drop_below_what_fit():
+    sizer = AdaptiveBatchSizer(initial=50, decrease=0.5)
+    sizer.record(50, 30, complete=False)
+    assert sizer.size() == 27
+    # Less than half of the batch fit: cut by `decrease` instead
+    sizer = AdaptiveBatchSizer(initial=50, decrease=0.5)
+    sizer.record(50, 10, complete=False)
+    assert sizer.size() == 25
+    assert sizer.stats()["truncated"] == 1
+
+    # Growth resumes once batches complete again
+    sizer.record(25, 25)
+    assert sizer.size() == 30
+
+
+def test_short_and_slow_batches_shrink():
+    sizer = AdaptiveBatchSizer(initial=50)
+    sizer.record(50, 20)
+    assert sizer.size() == 35
+
+    sizer = AdaptiveBatchSizer(initial=40, target_latency=1.0, decrease=0.5)
+    sizer.record(40, 40, latency=1.25)
+    assert sizer.size() == 32
+    sizer.record(32, 32, latency=10.0)
+    assert sizer.size() == 16
+
+
+def test_converged_size_and_stats():
+    sizer = AdaptiveBatchSizer(initial=20, step=5, window=3)
+    # Sizes after each batch: 25, 12, 17, 16
+    for received in (20, 0, 15, 15):
+        sizer.record(sizer.size(), received)
+    assert sizer.converged_size() == 16
+    stats = sizer.stats()
+    assert stats["batches"] == 4
+    assert stats["yield"] == 50 / 74
+
+
+def test_state_dict_round_trip():
+    sizer = AdaptiveBatchSizer(initial=50)
+    sizer.record(50, 30, complete=False)
+    restored = AdaptiveBatchSizer(initial=50)
+    restored.load_state_dict(sizer.state_dict())
+    assert restored.size() == sizer.size() == 27
+    restored.record(27, 27)
+    sizer.record(27, 27)
+    assert restored.state_dict() == sizer.state_dict()
+
+    # A saved size outside the configured bounds is clamped
+    narrow = AdaptiveBatchSizer(initial=10, min_size=5, max_size=20)
+    narrow.load_state_dict(sizer.state_dict())
+    assert narrow.size() == 20
+    narrow.load_state_dict({})
+    assert narrow.size() == 20
+
+
+def test_from_config():
+    fixed = AdaptiveBatchSizer.from_config(30)
+    fixed.record(30, 30)
+    fixed.record(30, 0)
+    assert fixed.size() == 30
+    assert AdaptiveBatchSizer.from_config(None, default=40).size() == 40
+    sizer = AdaptiveBatchSizer.from_config({"min_size": 10, "max_size": 60}, default=80)
+    assert (sizer.size(), sizer.min_size, sizer.max_size) == (60, 10, 60)
@@ -0,0 +1,64 @@
+from src.core import AutoModel, BaseLLM
+from src.core.cached_llm import CachedLLM
+from src.core.hedged_llm import HedgedLLM
+from src.core.pipeline import Pipeline
+from src.prompts.mlm_prompts import MLM_SYS_PROMPT
+from src.utils.disk_cache import DiskCache
+
+MESSAGES = [
+    {"role": "system", "content": MLM_SYS_PROMPT},
+    {"role": "user", "content": "Generate 5 sentences about AI."},
+]
+
+
+class RecordingLLM(BaseLLM):
+    def __init__(self):
+        self.calls = []
+
+    def generate_response(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        return f"response {len(self.calls)}"
+
+
+def cached_mock(tmp_path):
+    return CachedLLM(AutoModel.get_model("mock:mock", seed=1), DiskCache(str(tmp_path / "llm.sqlite")))
+
+
+def test_repeated_calls_are_served_from_cache(tmp_path):
+    model = cached_mock(tmp_path)
+    assert model.generate_response(MESSAGES) == model.generate_response(MESSAGES)
+    assert model.stats()["hits"] == 1
+
+
+def test_sampling_calls_do_not_share_a_cache_entry(tmp_path):
+    model = cached_mock(tmp_path)
+    first = model.generate_response(MESSAGES, cache=False)
+    second = model.generate_response(MESSAGES, cache=False)
+    assert first != second
+    stats = model.stats()
+    assert stats["entries"] == 0
+    assert stats["hits"] == stats["misses"] == 0
+
+
+def test_cache_option_is_not_passed_to_the_provider(tmp_path):
+    provider = RecordingLLM()
+    model = CachedLLM(provider, DiskCache(str(tmp_path / "llm.sqlite")))
+    model.generate_response(MESSAGES, cache=False, temperature=0.5)
+    provider.generate_response(MESSAGES, cache=True)
+    assert provider.calls == [{"temperature": 0.5}, {}]
+
+
+def test_mlm_run_with_cache_reaches_num_records(tmp_path, mock_config):
+    config = mock_config(model={"cache": {"path": str(tmp_path / "llm.sqlite")}}, task={"num_records": 200, "batch": 20})
+    pipeline = Pipeline.build("mlm:mock:mock", config=config)
+    assert len(pipeline.task.generate_data()) == 200
+
+
+def test_wrappers_delegate_to_the_provider(tmp_path):
+    provider = AutoModel.get_model("mock:mock", seed=1)
+    model = CachedLLM(HedgedLLM(provider, deadline=5), DiskCache(str(tmp_path / "llm.sqlite")))
+    assert model.provider_name == provider.provider_name
+    assert model.model_name == provider.model_name
+    assert model.classify_error(TimeoutError()) == provider.classify_error(TimeoutError())
+    assert model.generate_response(MESSAGES) == model.generate_response(MESSAGES)
+    assert model.model.stats()["requests"] == 1
@@ -0,0 +1,46 @@
+import json
+
+from src.core.checkpoint import restore_credentials, strip_credentials
+from src.core.pipeline import Pipeline
+from src.core.work_queue import WorkQueue
+
+CONFIG = {
+    "model": {
+        "provider": "pool",
+        "model_name": "keys",
+        "api_key": "top-secret",
+        "backends": [
+            {"provider": "google", "model_name": "gemini", "api_key": "first-key", "weight": 2},
+            {"provider": "google", "model_name": "gemini", "service_account_json": "/keys/sa.json"},
+        ],
+    },
+    "task": {"type": "mlm", "num_records": 10},
+}
+
+
+def test_strip_credentials_drops_nested_keys():
+    stripped = strip_credentials(CONFIG)
+    for secret in ("top-secret", "first-key", "/keys/sa.json"):
+        assert secret not in json.dumps(stripped)
+    assert stripped["model"]["backends"][0] == {"provider": "google", "model_name": "gemini", "weight": 2}
+    assert CONFIG["model"]["api_key"] == "top-secret"
+
+
+def test_restore_credentials_takes_them_from_the_live_config():
+    assert restore_credentials(strip_credentials(CONFIG), CONFIG) == CONFIG
+    assert restore_credentials(strip_credentials(CONFIG), {}) == strip_credentials(CONFIG)
+
+
+def test_manifest_and_queue_store_no_credentials(tmp_path):
+    config = {
+        "model": {"provider": "mock", "model_name": "mock", "api_key": "top-secret"},
+        "task": {"type": "mlm", "domain": "AI", "num_records": 4},
+        "output": {"folder": str(tmp_path), "format": "jsonl"},
+    }
+    pipeline = Pipeline.build("mlm:mock:mock", config={**config, "model": {"provider": "mock", "model_name": "mock"}})
+    pipeline.config = config
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    run_id = pipeline.enqueue(queue)
+    with open(tmp_path / f"{run_id}.manifest.json") as f:
+        assert "top-secret" not in f.read()
+    assert "top-secret" not in json.dumps(queue.get_run(run_id)["config"])
@@ -0,0 +1,102 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from src.tasks.mlm_task import MLMTask
+from src.utils.data_saver import DataWriter, JsonlWriter, dumps_line
+
+RECORDS = [{"text": f"Sentence number {i} about data.", "masked_text": f"Sentence number {i} about [MASK]."} for i in range(25)]
+
+
+def read_lines(path, compression):
+    if compression == "gzip":
+        with gzip.open(path, "rb") as f:
+            data = f.read()
+    elif compression == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        with open(path, "rb") as f:
+            data = zstandard.ZstdDecompressor().stream_reader(f).read()
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+    return [json.loads(line) for line in io.BytesIO(data)]
+
+
+def write(tmp_path, chunk_size=7, **jsonl):
+    with DataWriter(str(tmp_path), "run.jsonl", chunk_size=chunk_size, jsonl=jsonl) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    return writer
+
+
+@pytest.mark.parametrize("compression, suffix", [("none", ".jsonl"), ("gzip", ".jsonl.gz"), ("zstd", ".jsonl.zst")])
+def test_compressed_round_trip(tmp_path, compression, suffix):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    writer = write(tmp_path, compression=compression)
+    assert writer.path == str(tmp_path / f"run{suffix}")
+    assert writer.records_written == len(RECORDS)
+    assert read_lines(writer.path, compression) == RECORDS
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_shards_rotate_by_record_count(tmp_path, compression):
+    writer = write(tmp_path, compression=compression, max_shard_records=10)
+    assert writer.path == str(tmp_path / "run.shards.json")
+    with open(writer.path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["records"] == len(RECORDS)
+    assert manifest["compression"] == compression
+    suffix = ".gz" if compression == "gzip" else ""
+    assert [shard["path"] for shard in manifest["shards"]] == [f"run-{i:05d}.jsonl{suffix}" for i in range(3)]
+    assert [shard["records"] for shard in manifest["shards"]] == [10, 10, 5]
+    records = []
+    for shard in manifest["shards"]:
+        assert shard["size"] == (tmp_path / shard["path"]).stat().st_size
+        shard_records = read_lines(tmp_path / shard["path"], compression)
+        assert len(shard_records) == shard["records"]
+        records.extend(shard_records)
+    assert records == RECORDS
+
+
+def test_shards_rotate_by_size(tmp_path):
+    line_bytes = len(dumps_line(RECORDS[0]))
+    max_bytes = 4 * line_bytes
+    writer = JsonlWriter(str(tmp_path / "run.jsonl"), max_shard_bytes=max_bytes)
+    writer.write(RECORDS)
+    writer.close()
+    with open(writer.path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    shards = manifest["shards"]
+    assert manifest["records"] == sum(shard["records"] for shard in shards) == len(RECORDS)
+    # A shard is closed by the first record that takes it to the size limit
+    for shard in shards[:-1]:
+        assert max_bytes <= shard["bytes"] < max_bytes + line_bytes + 2
+    assert all(shard["bytes"] == shard["size"] for shard in shards)
+
+
+def test_sharded_run_without_records_still_writes_a_manifest(tmp_path):
+    writer = JsonlWriter(str(tmp_path / "run.jsonl"), max_shard_records=10)
+    writer.close()
+    with open(writer.path, encoding="utf-8") as f:
+        assert json.load(f) == {"format": "jsonl", "compression": "none", "records": 0, "shards": []}
+
+
+def test_parquet_row_groups_follow_the_task_schema(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    with DataWriter(str(tmp_path), "run.parquet", format="parquet", schema=MLMTask.output_schema, parquet={"row_group_size": 10}) as writer:
+        for record in RECORDS:
+            writer.write({**record, "extra": 1})
+    parquet_file = pq.ParquetFile(writer.path)
+    assert [parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)] == [10, 10, 5]
+    assert parquet_file.schema_arrow == pa.schema([("text", pa.string()), ("masked_text", pa.string())])
+    assert parquet_file.read().to_pylist() == RECORDS
+
+    with DataWriter(str(tmp_path), "empty.parquet", format="parquet", schema=MLMTask.output_schema):
+        pass
+    empty = pq.ParquetFile(str(tmp_path / "empty.parquet"))
+    assert empty.metadata.num_rows == 0
+    assert empty.schema_arrow.names == ["text", "masked_text"]
@@ -0,0 +1,67 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.fetcher import PageFetcher
+
+PAGE = b"<html><body><article><p>" + b"Connection pooling keeps sockets open between requests. " * 20 + b"</p></article></body></html>"
+
+
+class FakeResponse:
+    status_code = 200
+    content = PAGE
+    text = PAGE.decode()
+    headers = {}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = 0
+
+    def get(self, url, timeout=None, headers=None):
+        self.requests += 1
+        return FakeResponse()
+
+
+def test_fetch_reads_the_cache_once_per_page(tmp_path):
+    fetcher = PageFetcher(cache={"path": str(tmp_path / "pages.sqlite")})
+    fetcher.session = FakeSession()
+    lookups = []
+    lookup = fetcher.cache.lookup
+    fetcher.cache.lookup = lambda url: lookups.append(url) or lookup(url)
+
+    text = fetcher.fetch("https://example.com/a")
+    assert text and "Connection pooling" in text
+    assert fetcher.fetch("https://example.com/a") == text
+    assert lookups == ["https://example.com/a"] * 2
+    assert fetcher.session.requests == 1
+    assert (fetcher.cache.misses, fetcher.cache.hits) == (1, 1)
+
+
+class SlowSession(FakeSession):
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=None, headers=None):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.02)
+        with self._lock:
+            self.in_flight -= 1
+        return super().get(url, timeout=timeout, headers=headers)
+
+
+def test_concurrency_caps_requests_across_threads():
+    fetcher = PageFetcher(concurrency=2, per_host=4)
+    fetcher.session = SlowSession()
+    urls = [f"https://host{i % 3}.example.com/{i}" for i in range(12)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(fetcher.fetch, urls))
+    assert fetcher.session.peak == 2
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.core.hedged_llm import HedgedLLM
+from src.models.mock_llm import MockLLM
+
+MESSAGES = [{"role": "user", "content": "Say hello."}]
+
+
+class ScriptedMock(MockLLM):
+    """Mock provider whose calls take the given latencies in turn."""
+
+    def __init__(self, latencies):
+        super().__init__(seed=1)
+        self.latencies = list(latencies)
+
+    def sample_latency(self):
+        with self._lock:
+            return self.latencies.pop(0) if self.latencies else 0.0
+
+
+def request_threads():
+    return sum(thread.name == "llm-request" for thread in threading.enumerate())
+
+
+def test_deadline_raises_timeout_error():
+    model = HedgedLLM(MockLLM(latency=1.0), deadline=0.05)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        model.generate_response(MESSAGES)
+    assert time.monotonic() - started < 0.5
+    assert model.stats()["deadline_exceeded"] == 1
+
+
+def test_async_deadline_raises_timeout_error():
+    model = HedgedLLM(MockLLM(latency=1.0), deadline=0.05)
+    with pytest.raises(TimeoutError):
+        asyncio.run(model.agenerate_response(MESSAGES))
+
+
+def test_hedge_answers_a_slow_call():
+    model = HedgedLLM(ScriptedMock([1.0, 0.0]), hedge=True, delay=0.05, budget=1.0)
+    started = time.monotonic()
+    assert model.generate_response(MESSAGES)
+    assert time.monotonic() - started < 0.5
+    stats = model.stats()
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_hedges_stay_within_budget():
+    model = HedgedLLM(MockLLM(latency=0.01), hedge=True, delay=0.001, budget=0.1)
+    for _ in range(40):
+        model.generate_response(MESSAGES)
+    stats = model.stats()
+    assert stats["hedges"] >= 1
+    assert stats["hedges"] <= 0.1 * stats["requests"]
+
+
+def test_abandoned_calls_are_capped():
+    model = HedgedLLM(MockLLM(latency=0.5), deadline=0.02, max_in_flight=2)
+    before = request_threads()
+    for _ in range(5):
+        with pytest.raises(TimeoutError):
+            model.generate_response(MESSAGES)
+    assert request_threads() - before <= 2
+    assert model.stats()["deadline_exceeded"] == 5
+
+
+def test_native_timeout_runs_unhedged_calls_inline():
+    # The provider enforces the deadline itself, so the wrapper does not abandon the call
+    model = HedgedLLM(MockLLM(latency=0.1), deadline=0.05, native_timeout=True)
+    assert model.generate_response(MESSAGES)
+    assert model.stats()["deadline_exceeded"] == 0
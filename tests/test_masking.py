@@ -0,0 +1,85 @@
+import pytest
+
+from src.utils.masking import BatchMasker
+
+WORDS = (
+    "alpha bravo charlie delta echo foxtrot golf hotel india juliet "
+    "kilo lima mike november oscar papa quebec romeo sierra tango"
+).split()
+SENTENCE = " ".join(WORDS)
+
+
+def masked_positions(variant):
+    return [i for i, word in enumerate(variant.split()) if word == "[MASK]"]
+
+
+def test_whole_word_masks_the_requested_share_of_eligible_words():
+    masker = BatchMasker(mask_pct=0.25, num_variants=5, seed=0)
+    long, short = masker.mask_batch([SENTENCE, "the cat is on the mat with a dog"])
+    assert len(long) == 5
+    assert all(len(masked_positions(variant)) == 5 for variant in long)
+    # 25% of three eligible words rounds down to none, but at least one is masked;
+    # stopwords and short words never are
+    assert short and set(short) <= {
+        "the [MASK] is on the mat with a dog",
+        "the cat is on the [MASK] with a dog",
+        "the cat is on the mat with a [MASK]",
+    }
+
+
+def test_span_masks_consecutive_runs():
+    masker = BatchMasker(mask_pct=0.25, num_variants=20, strategy="span", span_length=3, seed=0)
+    [variants] = masker.mask_batch([SENTENCE])
+    for variant in variants:
+        positions = masked_positions(variant)
+        # 5 words to mask make round(5 / 3) = 2 spans of up to 3 words
+        assert 3 <= len(positions) <= 6
+        runs = [p for p in positions if p - 1 not in positions]
+        assert 1 <= len(runs) <= 2
+    assert any(len(masked_positions(variant)) == 6 for variant in variants)
+
+
+def test_spans_stay_within_their_sentence():
+    masker = BatchMasker(mask_pct=0.5, num_variants=20, strategy="span", span_length=3, seed=0)
+    for variants in masker.mask_batch(["alpha bravo", "charlie delta echo foxtrot golf hotel"]):
+        for variant in variants:
+            # One span per sentence, cut off at the end of its sentence rather than running into the next
+            positions = masked_positions(variant)
+            length = len(variant.split())
+            assert positions == list(range(positions[0], min(positions[0] + 3, length)))
+
+
+def test_variants_are_distinct_and_reproducible():
+    sentences = [SENTENCE, "masking several variants per sentence"]
+    first = BatchMasker(mask_pct=0.15, num_variants=4, seed=7).mask_batch(sentences)
+    second = BatchMasker(mask_pct=0.15, num_variants=4, seed=7).mask_batch(sentences)
+    assert first == second
+    for variants in first:
+        assert len(variants) == len(set(variants))
+    assert len(first[0]) == 4
+    assert first != BatchMasker(mask_pct=0.15, num_variants=4, seed=8).mask_batch(sentences)
+
+
+def test_overrides_and_sentences_without_eligible_words():
+    masker = BatchMasker(mask_pct=0.15, num_variants=1, seed=0)
+    variants = masker.mask_batch([SENTENCE, "it is a", ""], num_variants=3, mask_pct=0.5)
+    assert len(variants[0]) == 3
+    assert all(len(masked_positions(variant)) == 10 for variant in variants[0])
+    assert variants[1:] == [[], []]
+    assert masker.mask_batch([]) == []
+
+
+def test_state_dict_round_trip():
+    masker = BatchMasker(num_variants=3, seed=3)
+    masker.mask_batch([SENTENCE])
+    state = masker.state_dict()
+    expected = masker.mask_batch([SENTENCE])
+
+    restored = BatchMasker(num_variants=3, seed=99)
+    restored.load_state_dict(state)
+    assert restored.mask_batch([SENTENCE]) == expected
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        BatchMasker(strategy="random")
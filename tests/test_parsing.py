@@ -0,0 +1,31 @@
+from src.utils.parsing import parse_json_array
+
+
+def test_complete_array_in_a_code_block():
+    result = parse_json_array('Here you go:\n```json\n["one", "two", 3]\n```', item_type=str)
+    assert result.items == ["one", "two"]
+    assert result.complete
+    assert result.salvaged == 0
+
+
+def test_array_in_prose_skips_bracketed_references():
+    result = parse_json_array('As shown in [1], the sentences are ["a [masked] word", "b"].', item_type=str)
+    assert result.items == ["a [masked] word", "b"]
+
+
+def test_python_list_literal():
+    assert parse_json_array("['single', 'quoted']").items == ["single", "quoted"]
+
+
+def test_truncated_array_keeps_complete_items():
+    result = parse_json_array('```json\n[{"query": "q1"}, {"query": "q2"}, {"query": "q', item_type=dict)
+    assert result.items == [{"query": "q1"}, {"query": "q2"}]
+    assert not result.complete
+    assert result.salvaged == 2
+
+
+def test_no_array():
+    result = parse_json_array("I cannot help with that.")
+    assert not result
+    assert result.items == []
+    assert not result.complete
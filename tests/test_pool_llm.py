@@ -0,0 +1,43 @@
+import pytest
+
+from src.core import AutoModel
+
+MESSAGES = [{"role": "user", "content": "Say hello."}]
+
+
+def pool(*backends, **kwargs):
+    return AutoModel.get_model("pool:pool", backends=[{"provider": "mock", "model_name": "mock", "seed": 1, **backend} for backend in backends], **kwargs)
+
+
+def test_least_outstanding_relative_to_weight():
+    model = pool({"name": "big", "weight": 2}, {"name": "small", "weight": 1})
+    picked = [model._acquire(set()).name for _ in range(6)]
+    assert picked[0] == "big"
+    assert picked.count("big") == 4
+    assert picked.count("small") == 2
+    assert model.stats()["big"]["outstanding"] == 4
+
+
+def test_fails_over_to_a_healthy_backend():
+    # The failing backend has the larger weight, so it is always tried first while healthy
+    model = pool({"name": "bad", "weight": 2, "error_rate": 1.0}, {"name": "good"})
+    assert model.generate_response(MESSAGES)
+    stats = model.stats()
+    assert stats["bad"]["failures"] == 1
+    assert stats["good"]["requests"] == 1
+
+
+def test_backend_cools_down_after_max_failures():
+    model = pool({"name": "bad", "weight": 2, "error_rate": 1.0}, {"name": "good"}, max_failures=2, cooldown=60)
+    for _ in range(5):
+        assert model.generate_response(MESSAGES)
+    stats = model.stats()
+    assert stats["bad"] == {"weight": 2.0, "outstanding": 0, "requests": 2, "failures": 2, "healthy": False}
+    assert stats["good"]["requests"] == 5
+
+
+def test_raises_when_every_backend_fails():
+    model = pool({"name": "a", "error_rate": 1.0}, {"name": "b", "error_rate": 1.0})
+    with pytest.raises(RuntimeError, match="Simulated provider error"):
+        model.generate_response(MESSAGES)
+    assert model.stats()["a"]["failures"] == model.stats()["b"]["failures"] == 1
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from src.core.checkpoint import RunManifest
+from src.core.pipeline import Pipeline
+
+
+@pytest.mark.parametrize("output, resumable", [
+    ({}, True),
+    ({"format": "csv"}, True),
+    ({"format": "parquet"}, False),
+    ({"jsonl": {"compression": "gzip"}}, False),
+    ({"jsonl": {"max_shard_records": 10}}, False),
+])
+def test_resumable_formats(mock_config, output, resumable):
+    assert (Pipeline._not_resumable(mock_config(output=output)) is None) == resumable
+
+
+def test_resume_refuses_before_building(tmp_path, mock_config):
+    config = mock_config(output={"jsonl": {"compression": "gzip"}})
+    manifest = RunManifest("run", "mlm:unknown:model", config, str(tmp_path / "run.jsonl"), "jsonl", 20)
+    manifest.save()
+    # The provider does not exist, so building would fail with another error
+    with pytest.raises(ValueError, match="cannot be resumed"):
+        Pipeline.resume("run", folder=str(tmp_path))
+
+
+def test_resume_continues_plain_jsonl(tmp_path, mock_config):
+    pipeline = Pipeline.build("mlm:mock:mock", config=mock_config())
+    pipeline.run()
+    manifest = RunManifest.load(str(next(tmp_path.glob("*.manifest.json"))))
+    with open(manifest.output_path, "rb") as f:
+        lines = f.readlines()
+    # As if the run had been interrupted after its first 10 records
+    manifest.records_written = 10
+    manifest.output_bytes = sum(len(line) for line in lines[:10])
+    manifest.status = "interrupted"
+    manifest.save()
+    Pipeline.resume(manifest.run_id, folder=str(tmp_path))
+    assert RunManifest.load(manifest.run_id, str(tmp_path)).records_written == 20
+    with open(manifest.output_path, "rb") as f:
+        texts = [json.loads(line)["text"] for line in f]
+    assert len(texts) == 20
+    assert len(set(texts)) == 20
+
+
+def test_checkpoint_never_records_offsets_of_gzip_output(tmp_path, mock_config):
+    pipeline = Pipeline.build("mlm:mock:mock", config=mock_config(output={"jsonl": {"compression": "gzip"}}))
+    pipeline.run()
+    manifest = RunManifest.load(str(next(tmp_path.glob("*.manifest.json"))))
+    assert manifest.records_written == 20
+    assert manifest.output_bytes == 0
+    output = next(tmp_path.glob("*.gz"))
+    size = output.stat().st_size
+    pipeline._restore(manifest)
+    assert output.stat().st_size == size
@@ -0,0 +1,103 @@
+import socket
+import time
+
+import pytest
+
+from src.utils.retry import CircuitBreaker, RetryBudget, classify_error, retry_call
+
+RECOVERY = 0.05
+
+
+class Flaky:
+    def __init__(self, failures, error=ConnectionError):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error("provider unavailable")
+        return "ok"
+
+
+def test_circuit_opens_probes_and_closes():
+    breaker = CircuitBreaker("mock", failure_threshold=2, recovery_time=RECOVERY)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    started = time.monotonic()
+    breaker.acquire()
+    assert time.monotonic() - started >= RECOVERY * 0.9
+    assert breaker.state == "half_open"
+
+    # A failed probe reopens the circuit for twice as long
+    breaker.record_failure()
+    assert breaker.state == "open"
+    started = time.monotonic()
+    breaker.acquire()
+    assert time.monotonic() - started >= RECOVERY * 1.8
+    assert breaker.state == "half_open"
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.opened == 2
+    started = time.monotonic()
+    breaker.acquire()
+    assert time.monotonic() - started < RECOVERY
+
+
+def test_retry_call_recovers_through_the_breaker():
+    breaker = CircuitBreaker("mock", failure_threshold=2, recovery_time=RECOVERY)
+    budget = RetryBudget(ratio=0, min_retries=5)
+    func = Flaky(failures=2)
+    assert retry_call(func, max_retries=5, base_delay=0, breaker=breaker, budget=budget) == "ok"
+    assert func.calls == 3
+    assert breaker.state == "closed"
+    assert budget.stats() == {"calls": 1, "retries": 2, "denied": 0}
+
+
+def test_retry_budget_denies_retries_once_used_up():
+    budget = RetryBudget(ratio=0, min_retries=1)
+    func = Flaky(failures=10)
+    with pytest.raises(ConnectionError):
+        retry_call(func, max_retries=5, base_delay=0, budget=budget)
+    assert func.calls == 2
+    assert budget.stats() == {"calls": 1, "retries": 1, "denied": 1}
+
+
+def test_fatal_errors_are_not_retried():
+    budget = RetryBudget()
+    func = Flaky(failures=1, error=ValueError)
+    with pytest.raises(ValueError):
+        retry_call(func, max_retries=5, base_delay=0, budget=budget)
+    assert func.calls == 1
+    assert budget.stats()["retries"] == 0
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (TimeoutError(), True),
+    (ConnectionResetError(), True),
+    (socket.gaierror(), True),
+    (RuntimeError("SDK failure"), True),
+    (FileNotFoundError("service-account.json"), False),
+    (IsADirectoryError(), False),
+    (NotADirectoryError(), False),
+    (PermissionError(), False),
+    (ValueError(), False),
+])
+def test_classify_error(error, retryable):
+    assert classify_error(error) == (retryable, None)
+
+
+def test_local_file_errors_do_not_count_against_the_breaker():
+    breaker = CircuitBreaker("mock", failure_threshold=1, recovery_time=RECOVERY)
+    budget = RetryBudget()
+    func = Flaky(failures=1, error=FileNotFoundError)
+    with pytest.raises(FileNotFoundError):
+        retry_call(func, max_retries=5, base_delay=0, breaker=breaker, budget=budget)
+    assert func.calls == 1
+    assert breaker.state == "closed"
+    assert budget.stats()["retries"] == 0
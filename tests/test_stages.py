@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from src.core.stages import Stage, StagePipeline
+
+
+class CountingSource:
+    """An endless source that counts the items taken from it."""
+
+    def __init__(self):
+        self.produced = 0
+
+    def __iter__(self):
+        while True:
+            self.produced += 1
+            yield self.produced
+
+
+def stage_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith("stage-")]
+
+
+def test_single_workers_keep_source_order():
+    pipeline = StagePipeline(range(50), [Stage("double", lambda x: [x * 2]), Stage("inc", lambda x: [x + 1])])
+    assert list(pipeline) == [x * 2 + 1 for x in range(50)]
+
+
+def test_several_workers_complete_every_item():
+    def slow_fan_out(x):
+        time.sleep(0.001 * (x % 3))
+        return [x, -x] if x % 5 else []
+
+    pipeline = StagePipeline(range(100), [Stage("fan-out", slow_fan_out, workers=4), Stage("square", lambda x: [x * x], workers=3)], queue_size=4)
+    assert sorted(pipeline) == sorted(x * x for x in range(100) if x % 5 for _ in range(2))
+
+
+def test_stage_error_is_raised_in_the_consumer():
+    def fail_on_seven(x):
+        if x == 7:
+            raise ValueError("bad item")
+        return [x]
+
+    with pytest.raises(ValueError, match="bad item"):
+        list(StagePipeline(range(20), [Stage("check", fail_on_seven, workers=2)]))
+    time.sleep(0.3)
+    assert not stage_threads()
+
+
+def test_closing_early_stops_source_and_workers():
+    source = CountingSource()
+    items = iter(StagePipeline(source, [Stage("pass", lambda x: [x], workers=3), Stage("pass-2", lambda x: [x], workers=2)], queue_size=2))
+    assert len([next(items) for _ in range(5)]) == 5
+    items.close()
+    time.sleep(0.3)
+    assert not stage_threads()
+    produced = source.produced
+    time.sleep(0.2)
+    assert source.produced == produced
+
+
+def test_full_queues_block_the_source():
+    source = CountingSource()
+    queue_size = 2
+    items = iter(StagePipeline(source, [Stage("pass", lambda x: [x])], queue_size=queue_size))
+    next(items)
+    time.sleep(0.3)
+    # One item taken, two full queues, and one item held by the source and by the worker
+    assert source.produced <= 1 + 2 * queue_size + 2
+    items.close()
@@ -0,0 +1,58 @@
+import pytest
+
+from src.core.checkpoint import RunManifest
+from src.core.pipeline import Pipeline
+
+
+def failing_config(mock_config, task_type="mlm"):
+    return mock_config(
+        model={"error_rate": 1.0},
+        task={"type": task_type},
+        # No retries, so failing calls fail at once
+        retry={"budget": 0, "min_retries": 0},
+    )
+
+
+@pytest.mark.parametrize("task_type", ["mlm", "doc_retrieval"])
+def test_provider_failures_raise_instead_of_ending_as_stale(mock_config, task_type):
+    pipeline = Pipeline.build(f"{task_type}:mock:mock", config=failing_config(mock_config, task_type))
+    with pytest.raises(RuntimeError, match="failed"):
+        pipeline.task.generate_data()
+
+
+def test_failed_run_is_marked_failed(tmp_path, mock_config):
+    pipeline = Pipeline.build("mlm:mock:mock", config=failing_config(mock_config))
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+    manifest = RunManifest.load(str(next(tmp_path.glob("*.manifest.json"))))
+    assert manifest.status == "failed"
+
+
+def test_mlm_run_reaches_num_records(mock_config):
+    pipeline = Pipeline.build("mlm:mock:mock", config=mock_config(task={"num_records": 40, "batch": 10}))
+    assert len(pipeline.task.generate_data()) == 40
+
+
+class StubFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    def fetch(self, url):
+        self.fetched.append(url)
+        return self.pages.get(url)
+
+
+def test_fetch_falls_back_to_the_next_search_result(mock_config):
+    pipeline = Pipeline.build("doc_retrieval:mock:mock", config=mock_config(task={"type": "doc_retrieval"}))
+    task = pipeline.task
+    task.fetcher = StubFetcher({"https://c.example.com": "Main text of the third page."})
+    results = [{"href": "https://a.example.com", "body": "A"}, {"href": "", "body": "no link"}, {"href": "https://c.example.com", "body": "C"}]
+    [(web_rel, main_text)] = task._fetch({"query": "q", "results": results})
+    assert task.fetcher.fetched == ["https://a.example.com", "https://c.example.com"]
+    assert main_text == "Main text of the third page."
+    assert web_rel == {"query": "q", "results": [results[2]]}
+    assert "C\n\nMain text" in task._document_prompt((web_rel, main_text))[1]["content"]
+
+    task.fetcher = StubFetcher({})
+    assert task._fetch({"query": "q", "results": results}) == []
@@ -0,0 +1,72 @@
+import json
+import time
+
+from src.core.pipeline import Pipeline
+from src.core.work_queue import WorkQueue
+
+LEASE = 0.05
+
+
+def queue_with_units(tmp_path, config, units=1, max_attempts=3, target_records=10):
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"), lease_seconds=LEASE, max_attempts=max_attempts)
+    queue.add_run("run", "mlm:mock:mock", config, str(tmp_path / "run.jsonl"), "jsonl", target_records, [{"seq": seq} for seq in range(units)])
+    return queue
+
+
+def test_expired_lease_goes_to_another_worker(tmp_path, mock_config):
+    queue = queue_with_units(tmp_path, mock_config())
+    unit = queue.lease("a")
+    assert queue.lease("b") is None
+    time.sleep(LEASE * 2)
+    released = queue.lease("b")
+    assert released["unit_id"] == unit["unit_id"]
+    assert released["attempts"] == 2
+    assert not queue.extend(unit["unit_id"], "a")
+    assert queue.extend(released["unit_id"], "b")
+
+
+def test_unit_fails_after_max_attempts(tmp_path, mock_config):
+    queue = queue_with_units(tmp_path, mock_config(), max_attempts=2)
+    unit = queue.lease("a")
+    queue.nack(unit["unit_id"], "a", "RuntimeError: boom")
+    assert queue.counts("run")["pending"] == 1
+    assert queue.lease("b")["attempts"] == 2
+    time.sleep(LEASE * 2)
+    # The second lease expired too, so the unit is out of attempts
+    assert queue.lease("c") is None
+    assert queue.counts("run") == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+
+
+def test_late_ack_after_losing_the_lease(tmp_path, mock_config):
+    queue = queue_with_units(tmp_path, mock_config())
+    unit = queue.lease("a")
+    time.sleep(LEASE * 2)
+    assert queue.lease("b")["unit_id"] == unit["unit_id"]
+    assert queue.ack(unit["unit_id"], "a", 5) is False
+    assert queue.counts("run")["done"] == 1
+    # The new owner's nack is ignored once the unit is done
+    queue.nack(unit["unit_id"], "b", "RuntimeError: late")
+    assert queue.counts("run")["done"] == 1
+
+
+def test_merge_drops_duplicates_and_caps_records(tmp_path, mock_config):
+    queue = queue_with_units(tmp_path, mock_config(), units=3, target_records=3)
+    texts = [["a", "b"], ["b", "c"], ["d", "e"]]
+    for records in texts:
+        unit = queue.lease("worker")
+        Pipeline._write_unit(str(tmp_path / "run.jsonl"), unit["unit_id"], [{"text": text, "masked_text": text} for text in records])
+        assert queue.ack(unit["unit_id"], "worker", len(records))
+    path = Pipeline.merge(queue, "run")
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["text"] for line in f] == ["a", "b", "c"]
+
+
+def test_workers_generate_a_queued_run(tmp_path, mock_config):
+    pipeline = Pipeline.build("mlm:mock:mock", config=mock_config())
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    run_id = pipeline.enqueue(queue, oversample=1.5)
+    assert Pipeline.work(queue, run_id, poll_interval=0.01, worker_id="test") == queue.counts(run_id)["done"]
+    with open(Pipeline.merge(queue, run_id), encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f]
+    assert len(texts) == 20
+    assert len(set(texts)) == 20